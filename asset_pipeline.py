@@ -0,0 +1,192 @@
+"""Docstring for asset_pipeline.py module.
+
+This module contains the functions of the asset stage of the static site generator: the minification of
+the scripts and the styles, their copy under a name containing the hash of their content (so the browser
+can keep them in cache until they change) and the pre-compressed (.gz, .br) siblings of the text files.
+
+The minifiers rjsmin and rcssmin and the brotli compression are used if they are installed, without
+rjsmin the scripts are copied without being minified.
+
+"""
+
+import gzip
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from logger import logger
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+# the files which are worth compressing, the images and videos are already compressed
+COMPRESSIBLE_SUFFIXES = [".js", ".css", ".svg", ".html", ".json"]
+COMPRESSION_SUFFIXES = [".gz", ".br"]
+
+# the relative references between files of the same folder: `import ... from './x.js'` and `url('x.css')`
+JS_IMPORT_PATTERN = re.compile(r"""(\bfrom\s*|\bimport\s*\(?\s*)(['"])\./([\w.-]+)\2""")
+CSS_IMPORT_PATTERN = re.compile(r"""(url\()(['"]?)([\w.-]+)\2(\))""")
+
+
+def MinifyJs(source: str) -> str:
+    """Minify a script with rjsmin.
+
+    Without rjsmin the script is kept as it is, the comments and the spaces can't be removed safely
+    without a tokenizer (strings, template strings, regular expressions). It is still hashed and compressed.
+    """
+    if rjsmin is None:
+        return source
+    return rjsmin.jsmin(source)
+
+
+def MinifyCss(source: str) -> str:
+    """Minify a style sheet: remove the comments and the spaces around the separators."""
+    if rcssmin is not None:
+        return rcssmin.cssmin(source)
+    source = re.sub(r"/\*.*?\*/", "", source, flags=re.DOTALL)
+    source = re.sub(r"\s+", " ", source)
+    source = re.sub(r"\s*([{};,>])\s*", r"\1", source)
+    return source.replace(";}", "}").strip() + "\n"
+
+
+def CompressFile(path) -> None:
+    """Write the compressed siblings (path.gz and path.br if brotli is installed) of a text file."""
+    path = Path(path)
+    if path.suffix not in COMPRESSIBLE_SUFFIXES:
+        return
+    content = path.read_bytes()
+    # mtime=0 : the same content always gives the same compressed file
+    path.with_name(path.name + ".gz").write_bytes(gzip.compress(content, 9, mtime=0))
+    if brotli is not None:
+        path.with_name(path.name + ".br").write_bytes(brotli.compress(content))
+
+
+def WriteFile(path, content) -> None:
+    """Write a file (str or bytes) and its compressed siblings."""
+    path = Path(path)
+    if isinstance(content, str):
+        content = content.encode()
+    path.write_bytes(content)
+    CompressFile(path)
+
+
+def UncompressedPath(path) -> Path:
+    """The path of the file a compressed sibling comes from, the path itself otherwise."""
+    path = Path(path)
+    if path.suffix in COMPRESSION_SUFFIXES:
+        return path.with_suffix("")
+    return path
+
+
+def BuildAssets(sourceFolders: dict[str, str], outputFolder: str) -> dict[str, str]:
+    """Copy the assets under a name containing the hash of their content.
+
+    The scripts and the styles are minified and their references to the other files of their folder
+    are replaced by the hashed names first, the hash of a file changes if one of the files it imports
+    changes. The hashed files which are not used anymore are removed.
+
+    Parameters
+    ----------
+    sourceFolders : dict of str
+        The folders of the assets by the name used to refer to them in the pages (script, style, ...).
+        The files of these folders are never modified.
+    outputFolder : str
+        The folder of the hashed assets, it contains one sub-folder per source folder and the manifest.
+
+    Returns
+    -------
+    dict of str
+        The manifest, for each asset (`<folder name>/<file name>`) the path of its hashed copy relative to
+        the parent of the output folder.
+    """
+    outputFolder = Path(outputFolder)
+    manifest = {}
+    producedFiles = set()
+    sourceBytes = 0
+    outputBytes = 0
+
+    for folderName, sourceFolder in sourceFolders.items():
+        sourceFolder = Path(sourceFolder)
+        (outputFolder / folderName).mkdir(parents=True, exist_ok=True)
+        hashedNames = {}
+
+        def Fingerprint(name: str, visiting: frozenset = frozenset()) -> str:
+            nonlocal sourceBytes, outputBytes
+            if name in hashedNames:
+                return hashedNames[name]
+            source = sourceFolder / name
+            content = source.read_bytes()
+            sourceBytes += len(content)
+
+            def Reference(match) -> str:
+                reference = match.group(3)
+                if (sourceFolder / reference).is_file() and reference not in visiting:
+                    reference = Fingerprint(reference, visiting | {name})
+                return match.group(0).replace(match.group(3), reference)
+
+            if source.suffix == ".js":
+                content = JS_IMPORT_PATTERN.sub(
+                    Reference, MinifyJs(content.decode())
+                ).encode()
+            elif source.suffix == ".css":
+                content = CSS_IMPORT_PATTERN.sub(
+                    Reference, MinifyCss(content.decode())
+                ).encode()
+
+            hashedName = f"{source.stem}.{hashlib.sha256(content).hexdigest()[:12]}{source.suffix}"
+            hashedPath = outputFolder / folderName / hashedName
+            if not hashedPath.exists():
+                WriteFile(hashedPath, content)
+            outputBytes += len(content)
+            producedFiles.add(hashedPath)
+            hashedNames[name] = hashedName
+            return hashedName
+
+        for source in sorted(sourceFolder.iterdir()):
+            if source.is_file():
+                manifest[
+                    f"{folderName}/{source.name}"
+                ] = f"{outputFolder.name}/{folderName}/{Fingerprint(source.name)}"
+
+        for path in (outputFolder / folderName).iterdir():
+            if path.is_file() and UncompressedPath(path) not in producedFiles:
+                path.unlink()
+
+    with open(outputFolder / "manifest.json", "w") as file:
+        json.dump(manifest, file, indent=4)
+    logger.info(
+        f"{len(manifest)} assets fingerprinted in {outputFolder} ({sourceBytes} bytes minified to {outputBytes} bytes)"
+    )
+    return manifest
+
+
+def AssetReferencePattern(manifest: dict[str, str]):
+    """The regular expression matching the references to the assets of the manifest in a page."""
+    if len(manifest) == 0:
+        return None
+    references = sorted(manifest.keys(), key=len, reverse=True)
+    return re.compile(
+        r"(?<![\w.-])("
+        + "|".join(re.escape(reference) for reference in references)
+        + r")(?![\w.-])"
+    )
+
+
+def RewriteReferences(html: str, manifest: dict[str, str], pattern) -> str:
+    """Replace the references to the assets by their hashed path, `../script/x.js` become `../static/script/x.<hash>.js`."""
+    if pattern is None:
+        return html
+    return pattern.sub(lambda match: manifest[match.group(1)], html)
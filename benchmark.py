@@ -1,12 +1,18 @@
 import os
 import subprocess
-import time
 import json
 import numpy as np
 import ast
 from tqdm import tqdm
 from logger import logger
 from structure_test import StructureTest
+from scheduler import AdaptiveCell, Cell, Job, Scheduler, TaskPolicy
+from harness import HARNESS_PATH, ParseHarnessAnswer
+from worker_pool import RecyclePolicy, WarmWorkerPool
+from fingerprint import FileHasher, Fingerprint, GetLibraryVersion
+from checkpoint import Checkpoint, WriteJsonAtomic
+from results_store import STATUS_BY_VALUE, STATUS_ERROR, STATUS_OK, ResultStore
+from resource_usage import DEFAULT_TIMELINE_POINTS, RunCommand
 from pathlib import Path
 
 
@@ -33,6 +39,23 @@ class Benchmark:
         value that will be used in the json file if the task has not been run
     ERROR_VALUE : str or int
         value that will be used in the json file if an error occured during the task
+    TIMING_PROCESS, TIMING_HARNESS, TIMING_WARM : str
+        values of the `timing` key of a task or target config file. With `process` (default) the whole
+        process of the script is timed, with `harness` the script is run by `harness.py` that only time
+        its measured body and with `warm` the script is run the same way by a long-lived harness process
+        of the library (see `worker_pool.py`). The measured body is the call to the `run` function of the
+        script, a script without it is timed as a whole with its imports and a warning is logged. The warm
+        workers are recycled after `warm_max_jobs` jobs or when their memory grew more than
+        `warm_max_memory` MB (keys of the target config file)
+    SAMPLING_FIXED, SAMPLING_ADAPTIVE : str
+        values of the `sampling` key of a task config file. With `fixed` (default) each argument is run
+        `nb_runs` times, with `adaptive` the runs stop once the relative half-width of the confidence
+        interval (`confidence`, default 0.95) of the mean runtime is under `target_relative_ci`, with
+        between `min_runs` and `max_runs` runs or once `time_budget` seconds have been spent on the argument
+    TIMELINE_INTERVAL, TIMELINE_POINTS : str
+        keys of a task config file. If `timeline_interval` (in seconds) is given, the resident memory and
+        the I/O of each run script are sampled at this interval and stored downsampled to `timeline_points`
+        points with the sample (see `resource_usage.TimelineSampler`)
     """
 
     NOT_RUN_VALUE = "NotRun"
@@ -41,9 +64,49 @@ class Benchmark:
     TIMEOUT_VALUE = "Timeout"
     DEFAULT_TIMEOUT = 40
     DEFAULT_NB_RUNS = 1
+    DEFAULT_NB_WORKERS = 1
+    DEFAULT_WARM_MAX_JOBS = 100
+    SAMPLING_FIXED = "fixed"
+    SAMPLING_ADAPTIVE = "adaptive"
+    DEFAULT_MIN_RUNS = 3
+    DEFAULT_MAX_RUNS = 30
+    DEFAULT_TARGET_RELATIVE_CI = 0.05
+    DEFAULT_CONFIDENCE = 0.95
+    # keys of the config files that change the measures, only those are part of the fingerprint
+    # (the argument is part of it on its own, the descriptions and the sampling keys are not)
+    FINGERPRINT_TASK_KEYS = [
+        "timeout",
+        "timing",
+        "file_used",
+        "before_script",
+        "before_function",
+        "before_task_arguments",
+        "evaluation_script",
+        "evaluation_function",
+    ]
+    FINGERPRINT_LIBRARY_KEYS = [
+        "language",
+        "timing",
+        "before_build",
+    ]
+    TIMELINE_INTERVAL = "timeline_interval"
+    TIMELINE_POINTS = "timeline_points"
+    TIMING_PROCESS = "process"
+    TIMING_HARNESS = "harness"
+    TIMING_WARM = "warm"
     DEBUG = False
 
-    def __init__(self, pathToInfrastructure: str, baseResult=None) -> None:
+    def __init__(
+        self,
+        pathToInfrastructure: str,
+        baseResult=None,
+        nbWorkers: int = DEFAULT_NB_WORKERS,
+        coresPerJob: int = None,
+        incremental: bool = False,
+        resultStore: str = None,
+        checkpointFilename: str = None,
+        resume: bool = False,
+    ) -> None:
         """
         We initialize the class by reading the config file and getting the list of library and task.
         We also initialize the results dictionary and keep the path to the infrastructure
@@ -52,6 +115,24 @@ class Benchmark:
         ----------
         pathToInfrastructure : str
             path to the infrastructure
+        baseResult : str, optional
+            path to a previous json file of results to complete
+        nbWorkers : int, optional
+            number of jobs (library, task, argument, run) running at the same time
+        coresPerJob : int, optional
+            number of cores each job is pinned to, by default the cores are evenly shared between the workers
+        incremental : bool, optional
+            if True, the (library, task, argument) already measured with the same inputs are not run again
+        resultStore : str, optional
+            path to a result store (see `results_store.py`) where the samples are appended as soon as
+            a (library, task, argument) is finished. If the store is not empty and no `baseResult` is
+            given, the previous results are read from it
+        checkpointFilename : str, optional
+            path to the checkpoint file, the result of each (library, task, argument) is appended to it as soon as
+            it is finished
+        resume : bool, optional
+            if True and the checkpoint file exists, the benchmark continue from it: the results are read from
+            the checkpoint and the (library, task, argument) already completed are not run again
 
         Attributes
         ----------
@@ -67,6 +148,20 @@ class Benchmark:
             dictionary that associate a theme to a list of task
         dictonaryThemeInTask : dict of str
             dictionary that associate a task to a theme
+        scheduler : Scheduler
+            the scheduler that run the jobs on the workers
+        warmPool : WarmWorkerPool
+            the long-lived processes of the libraries using the `warm` timing
+        fingerprints : dict of tuple and str
+            the fingerprint of the inputs of each (library, task, argument)
+        store : ResultStore or None
+            the append-only store of the samples
+        checkpoint : Checkpoint or None
+            the checkpoint of the benchmark
+        completedCells : set of tuple
+            the (library, task, argument) completed since the beginning of the benchmark
+        wholeScriptTimed : set of str
+            the scripts without `run` function timed as a whole by the harness, a warning is logged once for each
         """
 
         self.pathToInfrastructure = Path(pathToInfrastructure)
@@ -96,10 +191,54 @@ class Benchmark:
             for taskName in self.dictionaryTaskInTheme[themeName]:
                 self.dictonaryThemeInTask[taskName] = themeName
 
-        if baseResult is None:
-            self.results = self.create_base_json()
-        else:
+        self.scheduler = Scheduler(nbWorkers=nbWorkers, coresPerJob=coresPerJob)
+        self.warmPool = WarmWorkerPool()
+        self.incremental = incremental
+        self.fileHasher = FileHasher()
+        self.fingerprints = {
+            (libraryName, taskName, arg): self.ComputeFingerprint(
+                libraryName, taskName, arg
+            )
+            for libraryName in self.libraryNames
+            for taskName in self.taskNames
+            for arg in self.taskConfig[taskName].get("arguments").split(",")
+        }
+
+        self.store = ResultStore(resultStore) if resultStore is not None else None
+
+        self.checkpoint = (
+            Checkpoint(checkpointFilename) if checkpointFilename is not None else None
+        )
+        self.completedCells = set()
+        self.wholeScriptTimed = set()
+
+        if resume and (self.checkpoint is None or not self.checkpoint.Exists()):
+            logger.warning("No checkpoint to resume from, the benchmark start over")
+            resume = False
+
+        if resume:
+            results, completedCells = self.checkpoint.Load()
+            self.results = self.MergeResults(results)
+            self.InvalidateChangedCells()
+            # the cells whose inputs changed since the checkpoint have to be run again
+            self.completedCells = {
+                key
+                for key in completedCells
+                if key in self.fingerprints
+                and self.results[key[0]][key[1]]["results"][key[2]].get("fingerprint")
+                == self.fingerprints[key]
+            }
+        elif baseResult is not None:
             self.results = self.get_result_from_json(baseResult)
+            self.InvalidateChangedCells()
+        elif self.store is not None and not self.store.IsEmpty():
+            self.results = self.MergeResults(self.store.ToDict())
+            self.InvalidateChangedCells()
+        else:
+            self.results = self.create_base_json()
+
+        if self.store is not None:
+            self.SyncStore()
 
         logger.debug(f"{self.dictionaryTaskInTheme = }")
         logger.debug(f"{self.dictonaryThemeInTask = }")
@@ -124,10 +263,130 @@ class Benchmark:
             return self.create_base_json()
 
         with open(json_file, "r") as f:
-            results = json.load(f)
+            previousResults = json.load(f)
+
+        return self.MergeResults(previousResults)
+
+    def MergeResults(self, previousResults: dict) -> dict:
+        """
+        Put previous results in the structure of the current infrastructure
+        """
+        # the previous results are put in the current structure, the tasks, libraries and arguments
+        # that don't exist anymore are dropped and the new ones are added
+        results = self.create_base_json()
+        for libraryName, tasks in results.items():
+            for taskName, task in tasks.items():
+                previousTask = previousResults.get(libraryName, {}).get(taskName, {})
+                for arg in task["results"].keys():
+                    if arg in previousTask.get("results", {}):
+                        task["results"][arg] = previousTask["results"][arg]
 
         return results
 
+    def ComputeFingerprint(self, libraryName: str, taskName: str, arg: str) -> str:
+        """
+        Compute the fingerprint of the declared inputs of a (library, task, argument): the run and before run
+        scripts of the library, the evaluation script, the data file used, the keys of the config of the task and
+        of the target that change the measures (`FINGERPRINT_TASK_KEYS` and `FINGERPRINT_LIBRARY_KEYS`) and the
+        version of the library. The other files of the task folder are not hashed, they can be written by the
+        scripts during the run. The other keys (the list of the arguments, the descriptions, the sampling) can
+        change without invalidating the measured cells
+        """
+        taskPath = self.GetTaskPath(taskName)
+        patterns = [f"{libraryName}_run.*", f"{libraryName}_before_run.*"]
+        evaluationScript = self.taskConfig[taskName].get("evaluation_script", None)
+        if evaluationScript is not None:
+            # the evaluation script is given as a module name
+            patterns.append(f"{evaluationScript}.*")
+        files = {
+            path.name: self.fileHasher.Hash(path)
+            for pattern in patterns
+            for path in sorted(taskPath.glob(pattern))
+            if path.is_file() and path.suffix not in [".pyc", ".class"]
+        }
+
+        fileUsed = self.taskConfig[taskName].get("file_used", "")
+        if fileUsed != "":
+            files["file_used"] = self.fileHasher.Hash(
+                taskPath / fileUsed
+                if (taskPath / fileUsed).exists()
+                else self.pathToInfrastructure / fileUsed
+            )
+
+        taskConfig = self.taskConfig[taskName]
+        libraryConfig = self.libraryConfig[libraryName]
+        return Fingerprint(
+            arg,
+            files,
+            {
+                k: taskConfig[k]
+                for k in Benchmark.FINGERPRINT_TASK_KEYS
+                if k in taskConfig
+            },
+            {
+                k: libraryConfig[k]
+                for k in Benchmark.FINGERPRINT_LIBRARY_KEYS
+                if k in libraryConfig
+            },
+            GetLibraryVersion(libraryName, self.libraryConfig[libraryName]),
+        )
+
+    def InvalidateChangedCells(self):
+        """
+        Remove the results of the (library, task, argument) whose inputs have changed since they were measured.
+        The results measured before the fingerprints existed (without `fingerprint` key) are removed too, their
+        scripts may have changed since, so these cells are run again once
+        """
+        for (libraryName, taskName, arg), fingerprint in self.fingerprints.items():
+            results = self.results[libraryName][taskName]["results"]
+            previous = results[arg].get("fingerprint")
+            if previous == fingerprint:
+                continue
+            if len(results[arg]["runtime"]) > 0:
+                if previous is None:
+                    logger.info(
+                        f"The results of {taskName} for {libraryName} with {arg} have no fingerprint, they are removed"
+                    )
+                else:
+                    logger.info(
+                        f"The inputs of {taskName} for {libraryName} with {arg} have changed, the results are removed"
+                    )
+            results[arg] = {"runtime": [], "fingerprint": fingerprint}
+
+    def IsUpToDate(self, libraryName: str, taskName: str, arg: str) -> bool:
+        """
+        Check if a (library, task, argument) has already been measured with the current inputs
+        """
+        result = self.results[libraryName][taskName]["results"][arg]
+        return (
+            result.get("fingerprint") == self.fingerprints[(libraryName, taskName, arg)]
+            and len(result["runtime"]) > 0
+        )
+
+    def SyncStore(self):
+        """
+        Import the results in the store if it is empty and update the fingerprint of each (library, task, argument)
+        in the store, the samples measured with another fingerprint are then ignored by the store
+        """
+        if self.store.IsEmpty():
+            logger.info(f"Import the results in the store {self.store.path}")
+            self.store.ImportResults(self.results)
+
+        for libraryName, tasks in self.results.items():
+            for taskName, task in tasks.items():
+                for position, (arg, result) in enumerate(task["results"].items()):
+                    self.store.SetCell(
+                        libraryName,
+                        taskName,
+                        arg,
+                        position,
+                        task["theme"],
+                        self.fingerprints[(libraryName, taskName, arg)],
+                        STATUS_BY_VALUE.get(result["runtime"], STATUS_ERROR)
+                        if isinstance(result["runtime"], str)
+                        else STATUS_OK,
+                    )
+
     def create_base_json(self):
         return {
             libraryName: {
@@ -265,20 +524,31 @@ class Benchmark:
 
         return valueEvaluation
 
-    def RunProcess(self, command, timeout, getOutput=False):
+    def RunProcess(
+        self,
+        command,
+        timeout,
+        getOutput=False,
+        resources: dict = None,
+        timeline: dict = None,
+        timelineConfig: tuple = None,
+    ):
+        """
+        Run a command and return its runtime in seconds (or its output if `getOutput`), a string if an error occured.
+        If `resources` is given, it is filled with the resources used by the process (see `resource_usage.py`).
+        If `timelineConfig` (interval, points) is given, `timeline` is filled with the timeline of the process
+        """
         logger.debug(f"RunProcess with the command {command}")
         if Benchmark.DEBUG:
             return np.random.randint(5) * 1.0
 
-        start = time.perf_counter()
         try:
-            process = subprocess.run(
-                command, shell=True, capture_output=True, text=True, timeout=timeout
+            process = RunCommand(
+                command, timeout, *(timelineConfig or (None, DEFAULT_TIMELINE_POINTS))
             )
         except subprocess.TimeoutExpired:
             logger.warning(f"Timeout expired for the {command} command")
             return Benchmark.TIMEOUT_VALUE
-        end = time.perf_counter()
 
         logger.debug(f"{process.stdout = }")
         logger.debug(f"{process.stderr = }")
@@ -298,10 +568,15 @@ class Benchmark:
             logger.debug(f"{process.stderr = }")
             return Benchmark.NOT_RUN_VALUE
 
+        if resources is not None and process.resources is not None:
+            resources.update(process.resources)
+        if timeline is not None and process.timeline is not None:
+            timeline.update(process.timeline)
+
         if getOutput:
             return process.stdout
 
-        return end - start
+        return process.elapsed
 
     def CreateScriptName(self, libraryName: str, nameComplement="") -> str:
         """
@@ -317,23 +592,49 @@ class Benchmark:
         script = Path(scriptPath) / scriptName
         return script.exists() and script.is_file()
 
-    def RunTask(self, taskName: str):
+    def GetTaskPath(self, taskName: str) -> Path:
         """
-        Run the task for each library and save the results in the results dictionary
+        Get the path to the folder of a task
         """
-        path = (
+        return (
             self.pathToInfrastructure
             / "themes"
             / self.dictonaryThemeInTask[taskName]
             / taskName
         )
 
-        #    We check if the before task command/script exist if not we do nothing
-        beforeTaskModule = self.taskConfig[taskName].get("before_script", None)
-        if beforeTaskModule is not None:
-            self.BeforeTask(path, taskName)
-        else:
-            logger.info(f"No before task command/script for {taskName}")
+    def GetTaskPolicy(self, taskName: str) -> TaskPolicy:
+        """
+        Get the admission rules of the jobs of a task from the `max_parallel`, `exclusive` and `parallel_runs`
+        keys of its config file
+        """
+        maxParallel = self.taskConfig[taskName].get("max_parallel", None)
+        if maxParallel is not None:
+            maxParallel = max(1, int(maxParallel))
+        exclusive = self.taskConfig[taskName].get("exclusive", "false").lower() in [
+            "true",
+            "yes",
+            "on",
+            "1",
+        ]
+        parallelRuns = self.taskConfig[taskName].get(
+            "parallel_runs", "false"
+        ).lower() in ["true", "yes", "on", "1"]
+        return TaskPolicy(
+            maxParallel=maxParallel, exclusive=exclusive, parallelRuns=parallelRuns
+        )
+
+    def RunTask(self, taskName: str):
+        """
+        Run the task for each library and save the results in the results dictionary
+        """
+        self.RunCells(self.CreateTaskCells(taskName))
+
+    def CreateTaskCells(self, taskName: str) -> list[Cell]:
+        """
+        Create the cells of a task for each library
+        """
+        path = self.GetTaskPath(taskName)
 
         # The timeout of the task is the timeout in the config file or the default timeout
         # the timeout is in seconds
@@ -341,121 +642,442 @@ class Benchmark:
             self.taskConfig[taskName].get("timeout", Benchmark.DEFAULT_TIMEOUT)
         )
 
+        cells = []
         for libraryName in self.libraryNames:
-            # self.results[libraryName][taskName] = {}
-            # self.results[libraryName][taskName]["theme"] = self.dictonaryThemeInTask[
-            #     taskName
-            # ]
-            # self.results[libraryName][taskName]["results"] = {}
-
-            self.progressBar.set_description(
-                f"Run task {taskName} for library {libraryName}"
-            )
+            cells += self.CreateCells(libraryName, taskName, path, timeout=taskTimeout)
+        return cells
 
-            self.RunTaskForLibrary(libraryName, taskName, path, timeout=taskTimeout)
-
-    def RunTaskForLibrary(
+    def CreateCells(
         self, libraryName: str, taskName: str, taskPath: str, timeout: int
-    ):
+    ) -> list[Cell]:
+        """
+        Create a cell for each argument of the task if the library support the task.
+        If the library doesn't support the task, the results are directly set to `NOT_RUN_VALUE`
+        """
         arguments = self.taskConfig[taskName].get("arguments").split(",")
+        nbRuns = self.GetNbRuns(taskName)
 
         # we check if the library support the task
         if not self.ScriptExist(taskPath, self.CreateScriptName(libraryName, "_run")):
             self.results[libraryName][taskName]["results"] = {
-                arg: {"runtime": Benchmark.NOT_RUN_VALUE} for arg in arguments
+                arg: {
+                    "runtime": Benchmark.NOT_RUN_VALUE,
+                    "fingerprint": self.fingerprints[(libraryName, taskName, arg)],
+                }
+                for arg in arguments
             }
+            if self.store is not None:
+                for position, arg in enumerate(arguments):
+                    self.store.SetCell(
+                        libraryName,
+                        taskName,
+                        arg,
+                        position,
+                        self.dictonaryThemeInTask[taskName],
+                        self.fingerprints[(libraryName, taskName, arg)],
+                        STATUS_BY_VALUE[Benchmark.NOT_RUN_VALUE],
+                    )
             self.progressBar.update(
-                int(self.taskConfig[taskName].get("nb_runs", Benchmark.DEFAULT_NB_RUNS))
-                * len(arguments)
-                * 2
+                nbRuns * len(arguments) * 2
             )  # *2 because we have before and after run script
-            return
-        logger.info(f"Run task {taskName} for library {libraryName}")
+            return []
 
-        # we check if there is a before run script
-        beforeRunScriptExist = self.ScriptExist(
-            taskPath, self.CreateScriptName(libraryName, "_before_run")
+        if self.incremental:
+            upToDate = [
+                arg for arg in arguments if self.IsUpToDate(libraryName, taskName, arg)
+            ]
+            if len(upToDate) > 0:
+                logger.info(
+                    f"Skip {taskName} for {libraryName} with {upToDate}, the inputs have not changed"
+                )
+            self.progressBar.update(nbRuns * len(upToDate) * 2)
+            arguments = [arg for arg in arguments if arg not in upToDate]
+
+        completed = [
+            arg
+            for arg in arguments
+            if (libraryName, taskName, arg) in self.completedCells
+        ]
+        if len(completed) > 0:
+            logger.info(
+                f"Skip {taskName} for {libraryName} with {completed}, already completed before the checkpoint"
+            )
+            self.progressBar.update(nbRuns * len(completed) * 2)
+            arguments = [arg for arg in arguments if arg not in completed]
+
+        config = self.taskConfig[taskName]
+        if (
+            config.get("sampling", Benchmark.SAMPLING_FIXED)
+            == Benchmark.SAMPLING_ADAPTIVE
+        ):
+            timeBudget = config.get("time_budget", None)
+            return [
+                AdaptiveCell(
+                    libraryName,
+                    taskName,
+                    arg,
+                    Path(taskPath),
+                    timeout,
+                    nbRuns,
+                    minRuns=int(config.get("min_runs", Benchmark.DEFAULT_MIN_RUNS)),
+                    targetRelativeCI=float(
+                        config.get(
+                            "target_relative_ci", Benchmark.DEFAULT_TARGET_RELATIVE_CI
+                        )
+                    ),
+                    confidence=float(
+                        config.get("confidence", Benchmark.DEFAULT_CONFIDENCE)
+                    ),
+                    timeBudget=float(timeBudget) if timeBudget is not None else None,
+                )
+                for arg in arguments
+            ]
+
+        return [
+            Cell(libraryName, taskName, arg, Path(taskPath), timeout, nbRuns)
+            for arg in arguments
+        ]
+
+    def GetNbRuns(self, taskName: str) -> int:
+        """
+        Get the maximum number of runs of each argument of a task
+        """
+        config = self.taskConfig[taskName]
+        if (
+            config.get("sampling", Benchmark.SAMPLING_FIXED)
+            == Benchmark.SAMPLING_ADAPTIVE
+        ):
+            return int(config.get("max_runs", Benchmark.DEFAULT_MAX_RUNS))
+        return int(config.get("nb_runs", Benchmark.DEFAULT_NB_RUNS))
+
+    def RunCells(self, cells: list[Cell]):
+        """
+        Run the jobs of the cells on the scheduler and merge the samples in the results dictionary, the
+        checkpoint is a snapshot of the results followed by the cells completed meanwhile
+        """
+        if self.checkpoint is not None:
+            self.checkpoint.Start(self.results, self.completedCells)
+        self.scheduler.Run(
+            cells,
+            self.RunJob,
+            taskPolicy={
+                taskName: self.GetTaskPolicy(taskName)
+                for taskName in {cell.taskName for cell in cells}
+            },
+            onTaskStart=self.StartTask,
+            onJobDone=self.JobDone,
+            onCellDone=self.RecordCell,
+            errorValue=Benchmark.ERROR_VALUE,
         )
-        if not beforeRunScriptExist:
-            beforeRunListTime = [0]
+        # the workers of the scheduler are gone, their warm workers are not needed anymore
+        self.warmPool.Close()
+        if self.checkpoint is not None:
+            self.checkpoint.Compact(self.results, self.completedCells)
 
-        # we check if there is a after run script
+    def StartTask(self, taskName: str):
+        """
+        Run the before task command/script of a task before its first job
+        """
+        #    We check if the before task command/script exist if not we do nothing
+        beforeTaskModule = self.taskConfig[taskName].get("before_script", None)
+        if beforeTaskModule is not None:
+            self.BeforeTask(self.GetTaskPath(taskName), taskName)
+        else:
+            logger.info(f"No before task command/script for {taskName}")
 
-        afterRunScript = self.taskConfig[taskName].get("evaluation_script", None)
+    def GetTimingMode(self, libraryName: str, taskName: str) -> str:
+        """
+        Get the timing mode of a task for a library, the `timing` key of the task config file
+        take precedence over the one of the target config file
+        """
+        timing = self.taskConfig[taskName].get(
+            "timing",
+            self.libraryConfig[libraryName].get("timing", Benchmark.TIMING_PROCESS),
+        )
+        language = self.libraryConfig[libraryName].get("language", "python")
+        if timing in [
+            Benchmark.TIMING_HARNESS,
+            Benchmark.TIMING_WARM,
+        ] and not language.startswith("python"):
+            logger.warning(
+                f"The timing harness is only available for python scripts, {libraryName} use the process timing"
+            )
+            return Benchmark.TIMING_PROCESS
+        return timing
 
-        for arg in arguments:
-            # print(f"Run task {conf.get('task_properties','name')} of library {libraryName} with argument {arg}")
+    def GetTimelineConfig(self, taskName: str) -> tuple or None:
+        """
+        Get the (interval, points) of the timelines of a task or None if they are not sampled
+        """
+        config = self.taskConfig[taskName]
+        interval = config.get(Benchmark.TIMELINE_INTERVAL, None)
+        if interval is None:
+            return None
+        return (
+            float(interval),
+            int(config.get(Benchmark.TIMELINE_POINTS, DEFAULT_TIMELINE_POINTS)),
+        )
+
+    def RunJob(self, cell: Cell, job: Job) -> list:
+        """
+        Run one repetition of a cell (before run script and run script), this method is called by the workers of the scheduler
+
+        Returns
+        -------
+        list
+            the sample [beforeRunTime, runTime], the values are strings if an error occured.
+            The resources and the timeline of the run script are stored in the cell (the warm workers measure
+            the resources of the job themselves and have no timeline)
+        """
+        language = self.libraryConfig[cell.libraryName].get("language")
+        scriptName = self.CreateScriptName(cell.libraryName, "_run")
+
+        timing = self.GetTimingMode(cell.libraryName, cell.taskName)
+        # the harness doesn't time the interpreter startup, there is nothing to substract
+        # so the before run script is not needed
+        resources, timeline = {}, {}
+        timelineConfig = self.GetTimelineConfig(cell.taskName)
+        if timing == Benchmark.TIMING_HARNESS:
+            runTime = self.RunHarness(
+                language,
+                Path(cell.taskPath, scriptName),
+                cell,
+                resources,
+                timeline,
+                timelineConfig,
+            )
+            cell.AddResources(job.runId, resources, timeline)
+            return [0, runTime]
+        if timing == Benchmark.TIMING_WARM:
+            runTime = self.RunWarm(
+                language, Path(cell.taskPath, scriptName), cell, resources
+            )
+            cell.AddResources(job.runId, resources)
+            return [0, runTime]
+
+        # Before run script
+        beforeRunTime = 0
+        beforeRunScript = self.CreateScriptName(cell.libraryName, "_before_run")
+        if self.ScriptExist(cell.taskPath, beforeRunScript):
+            command = (
+                f"{language} {Path(cell.taskPath, beforeRunScript)} {cell.argument}"
+            )
+            beforeRunTime = self.RunProcess(command=command, timeout=cell.timeout)
+            if isinstance(beforeRunTime, str):
+                return [beforeRunTime, beforeRunTime]
+
+        # Run script
+        command = (
+            f"{language} {os.path.join(cell.taskPath, scriptName)} {cell.argument}"
+        )
+        runTime = self.RunProcess(
+            command=command,
+            timeout=cell.timeout,
+            resources=resources,
+            timeline=timeline,
+            timelineConfig=timelineConfig,
+        )
+        logger.debug(f"{runTime = }")
+        cell.AddResources(job.runId, resources, timeline)
+        return [beforeRunTime, runTime]
+
+    def RunHarness(
+        self,
+        language: str,
+        scriptPath: Path,
+        cell: Cell,
+        resources: dict = None,
+        timeline: dict = None,
+        timelineConfig: tuple = None,
+    ):
+        """
+        Run a script under the timing harness and return the time of its measured body in seconds
+        or a string if an error occured, `resources` and `timeline` are filled as in `RunProcess`
+        """
+        command = f"{language} {HARNESS_PATH} {scriptPath} {cell.argument}"
+        output = self.RunProcess(
+            command=command,
+            timeout=cell.timeout,
+            getOutput=True,
+            resources=resources,
+            timeline=timeline,
+            timelineConfig=timelineConfig,
+        )
+        if isinstance(output, float) or output in [
+            Benchmark.ERROR_VALUE,
+            Benchmark.NOT_RUN_VALUE,
+            Benchmark.TIMEOUT_VALUE,
+        ]:
+            # the debug mode return a random float
+            return output
+
+        answer = ParseHarnessAnswer(output)
+        samples = answer.get("samples", [])
+        if answer.get("whole_script", False):
+            self.WarnWholeScript(scriptPath)
+        if len(samples) == 0:
+            logger.warning(f"No sample returned by the harness for {scriptPath}")
+            return Benchmark.ERROR_VALUE
+        logger.debug(f"{samples = }")
+        return samples[0] / 1e9
+
+    def RunWarm(
+        self, language: str, scriptPath: Path, cell: Cell, resources: dict = None
+    ):
+        """
+        Run a script on the warm worker of its library and return the time of its measured body in seconds
+        or a string if an error occured, `resources` is filled with the resources of the job measured by the worker
+        (left empty if the platform can't measure them)
+        """
+        logger.debug(f"RunWarm {scriptPath} {cell.argument}")
+        if Benchmark.DEBUG:
+            return np.random.randint(5) * 1.0
 
-            beforeRunListTime = []
-            listTime = []
+        maxJobs = self.libraryConfig[cell.libraryName].get(
+            "warm_max_jobs", Benchmark.DEFAULT_WARM_MAX_JOBS
+        )
+        maxMemory = self.libraryConfig[cell.libraryName].get("warm_max_memory", None)
+        policy = RecyclePolicy(
+            maxJobs=int(maxJobs) if maxJobs is not None else None,
+            maxMemoryGrowth=int(float(maxMemory) * 1024**2)
+            if maxMemory is not None
+            else None,
+        )
 
-            total_run = int(
-                self.taskConfig[taskName].get("nb_runs", Benchmark.DEFAULT_NB_RUNS)
+        try:
+            answer = self.warmPool.Run(
+                cell.libraryName,
+                language,
+                scriptPath,
+                cell.argument,
+                timeout=cell.timeout,
+                policy=policy,
             )
+        except subprocess.TimeoutExpired:
+            logger.warning(f"Timeout expired for {scriptPath} on the warm worker")
+            return Benchmark.TIMEOUT_VALUE
 
-            for nb_run in range(total_run):
-                # Before run script
-                if beforeRunScriptExist:
-                    command = f"{self.libraryConfig[libraryName].get('language')} {Path(taskPath,self.CreateScriptName(libraryName,'_before_run'))} {arg}"
-                    resultProcess = self.RunProcess(command=command, timeout=timeout)
-                    beforeRunListTime.append(resultProcess)
-                    self.progressBar.update(1)
-                    if isinstance(resultProcess, str):
-                        listTime.append(resultProcess)
-                        self.progressBar.update((total_run - nb_run) * 2 - 1)
-                        break
-
-                # Run script
-                scriptName = self.CreateScriptName(libraryName, "_run")
-                language = self.libraryConfig[libraryName].get("language")
-
-                command = f"{language} {os.path.join(taskPath,scriptName)} {arg}"
-
-                resultProcess = self.RunProcess(command=command, timeout=timeout)
-                logger.debug(f"{resultProcess = }")
-                listTime.append(resultProcess)
-                self.progressBar.update(1)
-                if isinstance(resultProcess, str):
-                    self.progressBar.update((total_run - nb_run - 1) * 2)
-                    break
-
-            valueEvaluation = [None]
-
-            # After run script
-            if afterRunScript is not None:
-                # if the script is not None, then it should be a script name or a list of script name
-                functionEvaluation = self.taskConfig[taskName].get(
-                    "evaluation_function", None
-                )
-                if functionEvaluation is not None:
-                    functionEvaluation = functionEvaluation.split(" ")
-                else:
-                    functionEvaluation = []
+        if resources is not None and answer.get("resources"):
+            resources.update(answer["resources"])
+        if answer["status"] == 2:
+            logger.warning(f"Can't run {scriptPath}")
+            return Benchmark.NOT_RUN_VALUE
+        if answer["status"] != 0 or len(answer["samples"]) == 0:
+            logger.warning(f"Error in {scriptPath} on the warm worker")
+            logger.debug(f"{answer.get('error') = }")
+            return Benchmark.ERROR_VALUE
+        if answer.get("whole_script", False):
+            self.WarnWholeScript(scriptPath)
+        return answer["samples"][0] / 1e9
 
-                logger.debug(f"{functionEvaluation = }")
+    def WarnWholeScript(self, scriptPath: Path):
+        """
+        Warn once for each script timed as a whole by the harness: without `run` function its imports and module
+        setup are part of its runtime, which is then not comparable with the runtime of the scripts timed around `run`
+        """
+        if str(scriptPath) in self.wholeScriptTimed:
+            return
+        self.wholeScriptTimed.add(str(scriptPath))
+        logger.warning(
+            f"{scriptPath} has no run function, the harness timed the whole script including its imports, "
+            "its runtime is not comparable with the scripts timed around run"
+        )
 
-                valueEvaluation = self.EvaluationAfterTask(
-                    afterRunScript,
-                    taskName,
-                    taskPath,
-                    *functionEvaluation,
-                    libraryName=libraryName,
-                    filenameBif=self.taskConfig[taskName].get("file_used", ""),
-                    arg=arg,
-                )
-                logger.debug(f"{valueEvaluation = }")
-                eval = self.results[libraryName][taskName]["results"][arg].get(
-                    "evaluation", {}
-                )
-                for i, function in enumerate(functionEvaluation):
-                    element = eval.get(function, [])
-                    eval = {**eval, function: element + [valueEvaluation[i]]}
-                self.results[libraryName][taskName]["results"][arg]["evaluation"] = eval
+    def JobDone(self, cell: Cell, job: Job, sample: list):
+        self.progressBar.set_description(
+            f"Run task {cell.taskName} for library {cell.libraryName}"
+        )
+        self.progressBar.update(2)
 
-            self.results[libraryName][taskName]["results"][arg]["runtime"].extend(
-                [b, t] for b, t in zip(beforeRunListTime, listTime)
+    def RecordCell(self, cell: Cell):
+        """
+        Run the evaluation of a finished cell and merge its samples in the results dictionary
+        """
+        libraryName, taskName, arg = cell.key
+        # the repetitions that have not been run because of an error
+        self.progressBar.update((cell.nbRuns - cell.nbSubmitted) * 2)
+
+        # After run script
+        evaluation = {}
+        afterRunScript = self.taskConfig[taskName].get("evaluation_script", None)
+        if afterRunScript is not None:
+            # if the script is not None, then it should be a script name or a list of script name
+            functionEvaluation = self.taskConfig[taskName].get(
+                "evaluation_function", None
+            )
+            if functionEvaluation is not None:
+                functionEvaluation = functionEvaluation.split(" ")
+            else:
+                functionEvaluation = []
+
+            logger.debug(f"{functionEvaluation = }")
+
+            valueEvaluation = self.EvaluationAfterTask(
+                afterRunScript,
+                taskName,
+                cell.taskPath,
+                *functionEvaluation,
+                libraryName=libraryName,
+                filenameBif=self.taskConfig[taskName].get("file_used", ""),
+                arg=arg,
             )
+            logger.debug(f"{valueEvaluation = }")
+            eval = self.results[libraryName][taskName]["results"][arg].get(
+                "evaluation", {}
+            )
+            evaluation = dict(zip(functionEvaluation, valueEvaluation))
+            for i, function in enumerate(functionEvaluation):
+                element = eval.get(function, [])
+                eval = {**eval, function: element + [valueEvaluation[i]]}
+            self.results[libraryName][taskName]["results"][arg]["evaluation"] = eval
+
+        samples = cell.GetSamples()
+        result = self.results[libraryName][taskName]["results"][arg]
+        resources = cell.GetResources()
+        timelines = cell.GetTimelines()
+        for key, values in [("resources", resources), ("timeline", timelines)]:
+            if any(value is not None for value in values) or key in result:
+                # aligned with the runtime samples, None for the samples without them
+                previous = result.setdefault(key, [])
+                previous.extend([None] * (len(result["runtime"]) - len(previous)))
+                previous.extend(values)
+        self.results[libraryName][taskName]["results"][arg]["runtime"].extend(samples)
+        self.results[libraryName][taskName]["results"][arg][
+            "fingerprint"
+        ] = self.fingerprints[cell.key]
+        # the number of samples taken by each run of the benchmark
+        self.results[libraryName][taskName]["results"][arg].setdefault(
+            "nb_samples", []
+        ).append(len(samples))
+
+        if self.store is not None:
+            self.store.AppendCell(
+                libraryName,
+                taskName,
+                arg,
+                self.fingerprints[cell.key],
+                samples,
+                evaluation,
+                resources,
+                timelines,
+            )
+
+        self.completedCells.add(cell.key)
+        if self.checkpoint is not None:
+            self.checkpoint.Append(
+                cell.key, self.results[libraryName][taskName]["results"][arg]
+            )
+
+        logger.info(f"End of the cell {cell.key}")
 
+    def RunTaskForLibrary(
+        self, libraryName: str, taskName: str, taskPath: str, timeout: int
+    ):
+        """
+        Run the task for a library and save the results in the results dictionary
+        """
+        logger.info(f"Run task {taskName} for library {libraryName}")
+        self.RunCells(self.CreateCells(libraryName, taskName, taskPath, timeout))
         logger.info(f"End task {taskName} for library {libraryName}")
 
     def CalculNumberIteration(self):
@@ -465,7 +1087,7 @@ class Benchmark:
         nbIteration = 0
         for taskName in self.taskConfig.keys():
             nbIteration += (
-                int(self.taskConfig[taskName].get("nb_runs", Benchmark.DEFAULT_NB_RUNS))
+                self.GetNbRuns(taskName)
                 * len(self.taskConfig[taskName].get("arguments").split(","))
                 * 2
                 * len(self.libraryNames)
@@ -478,10 +1100,16 @@ class Benchmark:
         """
         convert the result to a json file
         """
-        with open(outputFileName, "w") as file:
-            json.dump(self.results, file, indent=4)
+        WriteJsonAtomic(outputFileName, self.results, indent=4)
         logger.info(f"Result saved in {outputFileName}")
 
+    def RemoveCheckpoint(self):
+        """
+        Remove the checkpoint once the results are saved, the next benchmark won't resume from it
+        """
+        if self.checkpoint is not None:
+            self.checkpoint.Remove()
+
     def StartAllProcedure(self):
         if not Benchmark.DEBUG:
             self.BeforeBuildLibrary()
@@ -493,8 +1121,10 @@ class Benchmark:
             position=0,
         )
         logger.info("=======Begining of the benchmark=======")
+        cells = []
         for taskName in self.taskNames:
-            self.RunTask(taskName)
+            cells += self.CreateTaskCells(taskName)
+        self.RunCells(cells)
         logger.info("=======End of the benchmark=======")
 
 
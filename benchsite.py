@@ -1,13 +1,19 @@
-from static_site_generator import StaticSiteGenerator
+from static_site_generator import RenderJob, StaticSiteGenerator, ToJsonCompatible
 from structure_test import StructureTest
+import base64
+import json
 import os
 from pathlib import Path
 
+import numpy as np
+
 # Here you can import you're own FileReader if the format of the Json/file is different
 from logger import logger
 from json_to_python_object import FileReaderJson, readJsonFile
+from results_store import FileReaderStore
+from resource_usage import TIMELINE_SERIES
 from library import Library
-from task import Task
+from task import Task, TaskStatistics
 import ranking as rk
 from shutil import copyfile
 from collectCode import CollectCode
@@ -20,16 +26,46 @@ ABOUT_URL = "https://white-on.github.io/BenchSite/"
 
 class BenchSite:
     LEXMAX_THRESHOLD = 0
+    # the default metric of the rankings (`ranking_metric` key of the site config), see `ranking.METRICS`
+    RANKING_METRIC = "runtime"
+    STORE_SUFFIXES = [".db", ".sqlite"]
+    # the charts of the resources used by the runs (label, y label), chosen with the `resource_metrics` key of a task
+    RESOURCE_CHARTS = {
+        "cpu_time": ("CPU time", "CPU time (s)"),
+        "user_time": ("User time", "User CPU time (s)"),
+        "system_time": ("System time", "System CPU time (s)"),
+        "max_rss": ("Peak memory", "Peak resident memory (bytes)"),
+        "major_faults": ("Major page faults", "Major page faults"),
+        "minor_faults": ("Minor page faults", "Minor page faults"),
+        "voluntary_switches": (
+            "Voluntary context switches",
+            "Voluntary context switches",
+        ),
+        "involuntary_switches": (
+            "Involuntary context switches",
+            "Involuntary context switches",
+        ),
+    }
+    DEFAULT_RESOURCE_METRICS = "cpu_time max_rss major_faults minor_faults"
 
     def __init__(
-        self, inputFilename: str, outputPath="pages", structureTestPath="repository"
+        self,
+        inputFilename: str,
+        outputPath="pages",
+        structureTestPath="repository",
+        nbRenderWorkers: int = None,
     ) -> None:
         logger.info("=======Creating BenchSite=======")
         # Here to change you'r own FileReader
-        FileReaderJson(inputFilename)
+        if Path(inputFilename).suffix in BenchSite.STORE_SUFFIXES:
+            FileReaderStore(inputFilename)
+        else:
+            FileReaderJson(inputFilename)
         self.inputFilename = inputFilename
         self.outputPath = outputPath
         self.structureTestPath = structureTestPath
+        # the number of processes rendering the pages, by default the number of cores
+        self.nbRenderWorkers = nbRenderWorkers
 
         logger.debug(f"inputFilename : {inputFilename}")
         logger.debug(f"outputPath : {outputPath}")
@@ -43,10 +79,38 @@ class BenchSite:
             os.path.join(outputPath, "assets"),
             os.path.join(outputPath, "content"),
             os.path.join(outputPath, "style"),
+            dataFilePath=os.path.join(outputPath, "data"),
         )
 
         self.machineData = GetRunMachineMetadata()
         self.siteConfig = self.GetSiteConfig()
+        # with `significant_runtime` the libraries whose difference is within the noise share their rank
+        self.rankingMetric = self.siteConfig.get(
+            "ranking_metric", BenchSite.RANKING_METRIC
+        )
+        # the stability of the ranks is bootstrapped, by default only with the significance-aware ranking
+        self.rankStability = self.siteConfig.get(
+            "rank_stability", str(self.rankingMetric == "significant_runtime")
+        ).lower() in ["true", "yes", "on", "1"]
+        rk.SetSignificanceOptions(
+            alpha=float(self.siteConfig.get("significance_alpha", rk.DEFAULT_ALPHA)),
+            resamples=int(
+                self.siteConfig.get(
+                    "bootstrap_resamples", rk.DEFAULT_BOOTSTRAP_RESAMPLES
+                )
+            ),
+        )
+        # the library the speedups are relative to (`reference_library` key of the site config), by default
+        # the first one in alphabetical order so it doesn't depend on the order of the results
+        libraryNames = sorted(Library.GetAllLibraryName())
+        self.referenceLibrary = self.siteConfig.get(
+            "reference_library", libraryNames[0] if len(libraryNames) > 0 else None
+        )
+        if self.referenceLibrary not in libraryNames:
+            logger.warning(
+                f"Unknown reference library {self.referenceLibrary}, the speedups are not displayed"
+            )
+            self.referenceLibrary = None
 
     def GetLibraryConfig(self):
         strtest = StructureTest()
@@ -114,7 +178,10 @@ class BenchSite:
             [
                 f"<div class='global-card'><p>{BenchSite.MakeLink(contentfilePath + library,library)}</p></div>"
                 for rank, library in enumerate(
-                    rk.RankingLibraryGlobal(threshold=BenchSite.LEXMAX_THRESHOLD)
+                    rk.RankingLibraryGlobal(
+                        threshold=BenchSite.LEXMAX_THRESHOLD,
+                        metric=self.rankingMetric,
+                    )
                 )
             ]
         )
@@ -122,14 +189,14 @@ class BenchSite:
                             </div>"
         return HTMLGlobalRanking
 
-    @staticmethod
-    def GenerateHTMLRankingAllTheme():
+    def GenerateHTMLRankingAllTheme(self):
         HTMLThemeRanking = "<div id='theme-rank'>\
             <h1>Theme Ranking</h1>\
             <p>Here is the ranking of the best library for each theme.</p>\
                 <div class=\"grid\">"
         rankLibraryInTheme = rk.RankingLibraryByTheme(
-            threshold=BenchSite.LEXMAX_THRESHOLD
+            threshold=BenchSite.LEXMAX_THRESHOLD,
+            metric=self.rankingMetric,
         )
         # On trie le dictionnaire par nom de thème pour avoir un classement par ordre alphabétique
         rankLibraryInTheme = {
@@ -145,11 +212,11 @@ class BenchSite:
         HTMLThemeRanking += "</div></div>"
         return HTMLThemeRanking
 
-    @staticmethod
-    def GenerateHTMLRankingPerThemeName(themeName):
+    def GenerateHTMLRankingPerThemeName(self, themeName):
         HTMLThemeRanking = ""
         rankLibraryByTheme = rk.RankingLibraryByTheme(
-            threshold=BenchSite.LEXMAX_THRESHOLD
+            threshold=BenchSite.LEXMAX_THRESHOLD,
+            metric=self.rankingMetric,
         )
         # HTMLThemeRanking += f"<div class=\"theme\"><h2>{themeName}</h2><h3>{' '.join(BenchSite.MakeLink(taskName) for taskName in Task.GetTaskNameByThemeName(themeName))}</h3>"
         HTMLThemeRanking += "<div class='grid'>" + "".join(
@@ -171,7 +238,8 @@ class BenchSite:
             <p>Here is the ranking of the best library for each theme.</p>\
                 <div class=\"grid\">"
         rankLibraryInTheme = rk.RankingLibraryByTheme(
-            threshold=BenchSite.LEXMAX_THRESHOLD
+            threshold=BenchSite.LEXMAX_THRESHOLD,
+            metric=self.rankingMetric,
         )
         # On trie le dictionnaire par nom de thème pour avoir un classement par ordre alphabétique
         rankLibraryInTheme = {
@@ -206,7 +274,8 @@ class BenchSite:
         )
         HTMLTask = "<div id='task-rank' class='card'><h1> Library Per Task</h1><div class=\"grid\">"
         rankLibraryInTask = rk.RankingLibraryByTask(
-            threshold=BenchSite.LEXMAX_THRESHOLD
+            threshold=BenchSite.LEXMAX_THRESHOLD,
+            metric=self.rankingMetric,
         )
         for taskName in rankLibraryInTask.keys():
             highLightedLibrary = rankLibraryInTask[taskName][0]
@@ -230,6 +299,274 @@ class BenchSite:
     def OrderedList(listElement: list) -> str:
         return "&gt;".join([f"{element}" for element in listElement])
 
+    @staticmethod
+    def EncodeColumn(values, dtype: str = None) -> dict:
+        """Encode a numeric column as the base64 of its little endian binary representation.
+
+        Parameters
+        ----------
+        values : array_like
+            The values of the column.
+        dtype : str
+            The name of the typed array used to decode it (float32, uint8, uint16, uint32), by default the
+            smallest unsigned integer type which can hold the values.
+
+        Returns
+        -------
+        dict
+            The dtype and the base64 data, decoded by `DecodeColumn` of columnarData.js.
+        """
+        if dtype is None:
+            values = np.asarray(values)
+            dtype = np.min_scalar_type(int(values.max()) if values.size else 0).name
+        array = np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder("<"))
+        return {
+            "dtype": dtype,
+            "data": base64.b64encode(array.tobytes()).decode("ascii"),
+        }
+
+    @staticmethod
+    def ColumnarChartData(task: Task, metric: str = "runtime") -> dict:
+        """The chart payload of a metric of a task, one point per (library, argument).
+
+        The libraries and the arguments are stored once and each point refers to them by index. The
+        numeric values are typed arrays, np.nan (null once decoded as 'error') when the value is not valid.
+
+        Parameters
+        ----------
+        task : Task
+            The task.
+        metric : str, default="runtime"
+            `runtime`, a resource (see `Task.RESOURCE_METRICS`) or the name of an evaluation function.
+
+        Returns
+        -------
+        dict
+            The columnar payload, see `DecodeChartData` of columnarData.js.
+        """
+        libraries = list(Library.GetAllLibraryName())
+        nbArguments = len(task.arguments_label)
+        statistics = [task.GetStatistics(library, metric) for library in libraries]
+        column = (
+            lambda attribute: np.concatenate(
+                [getattr(stat, attribute) for stat in statistics]
+            )
+            if statistics
+            else np.zeros(0)
+        )
+
+        mean, std = column("mean"), column("std")
+        with np.errstate(invalid="ignore"):
+            if metric == "runtime":
+                # a runtime of 0 (or less) is a failure of the measure
+                isValid = np.isfinite(mean) & (mean > 0)
+                isStdValid = np.isfinite(std) & (std > 0)
+            else:
+                isValid = np.isfinite(mean)
+                isStdValid = isValid & np.isfinite(std)
+        histogram = (
+            np.concatenate([stat.histogram for stat in statistics])
+            if statistics
+            else np.zeros((0, TaskStatistics.HISTOGRAM_BINS))
+        )
+
+        return {
+            "libraries": libraries,
+            "arguments": [
+                int(arg) if arg.isnumeric() else arg for arg in task.arguments_label
+            ],
+            "libraryIndex": BenchSite.EncodeColumn(
+                np.repeat(np.arange(len(libraries)), nbArguments)
+            ),
+            "argumentIndex": BenchSite.EncodeColumn(
+                np.tile(np.arange(nbArguments), len(libraries))
+            ),
+            "runTime": BenchSite.EncodeColumn(
+                np.where(isValid, mean, np.nan), "float32"
+            ),
+            "std": BenchSite.EncodeColumn(np.where(isStdValid, std, np.nan), "float32"),
+            "min": BenchSite.EncodeColumn(column("min"), "float32"),
+            "p10": BenchSite.EncodeColumn(column("p10"), "float32"),
+            "p50": BenchSite.EncodeColumn(column("median"), "float32"),
+            "p90": BenchSite.EncodeColumn(column("p90"), "float32"),
+            "p99": BenchSite.EncodeColumn(column("p99"), "float32"),
+            "max": BenchSite.EncodeColumn(column("max"), "float32"),
+            "histogramBins": TaskStatistics.HISTOGRAM_BINS,
+            "histogram": BenchSite.EncodeColumn(histogram),
+        }
+
+    @staticmethod
+    def TimelineChartData(task: Task) -> dict or None:
+        """The payload of the timeline chart of a task, None if no timeline was sampled.
+
+        For each (library, argument) the timeline of its last sample which has one, the series are
+        typed arrays like in `ColumnarChartData`.
+
+        Returns
+        -------
+        dict or None
+            The libraries, the arguments and the list of the timelines, see `TimelineChart` of timelineChart.js.
+        """
+        libraries = list(Library.GetAllLibraryName())
+        timelines = []
+        for i, library in enumerate(libraries):
+            for j in range(len(task.arguments_label)):
+                timeline = task.GetTimeline(library, j)
+                if timeline is None:
+                    continue
+                timelines.append(
+                    {
+                        "library": i,
+                        "argument": j,
+                        **{
+                            series: BenchSite.EncodeColumn(timeline[series], "float32")
+                            for series in TIMELINE_SERIES
+                        },
+                    }
+                )
+        if len(timelines) == 0:
+            return None
+        return {
+            "libraries": libraries,
+            "arguments": task.arguments_label,
+            "timelines": timelines,
+        }
+
+    @staticmethod
+    def ParetoDescription(paretoRanking: dict[str, dict]) -> str:
+        """The text describing the front, the weighted score and the normalized metrics of each library."""
+        return "\n".join(
+            f"{library} : front {result['front'] + 1}, score {result['score']:.3f} ("
+            + ", ".join(
+                f"{metric} {value:.2f}" for metric, value in result["metrics"].items()
+            )
+            + ")"
+            for library, result in paretoRanking.items()
+        )
+
+    @staticmethod
+    def RankStabilityTable(stability: dict[str, dict]) -> str:
+        """The HTML table of the confidence interval of the rank of each library and the probability of each rank."""
+        if len(stability) == 0:
+            return ""
+        nbRanks = len(stability)
+        table = "<table><tr><th>Library</th><th>Rank interval</th>"
+        table += "".join(f"<th>P(rank {rank + 1})</th>" for rank in range(nbRanks))
+        table += "</tr>"
+        for library, result in sorted(
+            stability.items(), key=lambda item: tuple(item[1]["interval"])
+        ):
+            low, high = result["interval"] + 1
+            table += (
+                f"<tr><td>{library}</td><td>{low}"
+                + (f" - {high}" if high != low else "")
+                + "</td>"
+            )
+            table += "".join(
+                f"<td>{probability:.0%}</td>" for probability in result["probabilities"]
+            )
+            table += "</tr>"
+        return table + "</table>"
+
+    @staticmethod
+    def FormatSpeedup(result: dict) -> str:
+        """The speedup of a library with its confidence interval, `-` if nothing was compared. The number of
+        arguments or tasks compared is given when the library failed on some of those of the reference.
+        """
+        if result["count"] == 0:
+            return "-"
+        low, high = result["interval"]
+        coverage = (
+            f" ({result['count']}/{result['total']})"
+            if result["count"] < result["total"]
+            else ""
+        )
+        return f"×{result['speedup']:.3g} [{low:.3g}, {high:.3g}]{coverage}"
+
+    @staticmethod
+    def SpeedupTable(
+        speedups: dict[str, dict[str, dict]], rowLabel: str, sortRows: bool = True
+    ) -> str:
+        """The HTML table of the speedups, one column per aggregate (global, theme, task) and one row per
+        element (library, task), ordered by the speedup of the first column if `sortRows`.
+        """
+        if len(speedups) == 0:
+            return ""
+        first = next(iter(speedups.values()))
+        rows = list(
+            dict.fromkeys(row for column in speedups.values() for row in column)
+        )
+        if sortRows:
+            rows.sort(
+                key=lambda row: -np.nan_to_num(
+                    first.get(row, {}).get("speedup", np.nan), nan=-np.inf
+                )
+            )
+        table = f"<table><tr><th>{rowLabel}</th>"
+        table += "".join(
+            f"<th>{RemoveUnderscoreAndDash(column)}</th>" for column in speedups
+        )
+        table += "</tr>"
+        for row in rows:
+            table += f"<tr><td>{RemoveUnderscoreAndDash(row)}</td>"
+            for column in speedups.values():
+                result = column.get(row, {"count": 0, "total": 0})
+                faster = (
+                    " class='faster'"
+                    if result["count"] > 0 and result["speedup"] > 1
+                    else ""
+                )
+                table += f"<td{faster}>{BenchSite.FormatSpeedup(result)}</td>"
+            table += "</tr>"
+        return table + "</table>"
+
+    def SpeedupComponent(
+        self,
+        title: str,
+        chartSpeedups: dict[str, dict],
+        tableSpeedups: dict[str, dict[str, dict]],
+        rowLabel: str,
+        scriptFilePath: str,
+        sortRows: bool = True,
+    ) -> dict:
+        """The arguments of the `speedup.html` template.
+
+        Parameters
+        ----------
+        title : str
+            The title of the section.
+        chartSpeedups : dict of str and dict
+            The speedup of each bar of the chart, see `ranking.SpeedupByTask`.
+        tableSpeedups : dict of str and dict
+            The speedups of each column of the table, see `SpeedupTable`.
+        rowLabel : str
+            The header of the first column of the table.
+        scriptFilePath : str
+            The path of speedupChart.js relative to the page.
+        sortRows : bool, default=True
+            Whether the rows of the table are ordered by their speedup.
+        """
+        chartData = [
+            {
+                "name": RemoveUnderscoreAndDash(name),
+                "speedup": result["speedup"],
+                "low": result["interval"][0],
+                "high": result["interval"][1],
+                "count": result["count"],
+                "total": result["total"],
+            }
+            for name, result in chartSpeedups.items()
+        ]
+        return dict(
+            chartId="speedup",
+            title=title,
+            reference=self.referenceLibrary,
+            confidence=f"{1 - rk.significanceOptions['alpha']:.0%}",
+            table=BenchSite.SpeedupTable(tableSpeedups, rowLabel, sortRows),
+            data=json.dumps(ToJsonCompatible(chartData)),
+            scriptFilePath=scriptFilePath,
+        )
+
     @staticmethod
     def CreateScriptBalise(content="", scriptName=None, module: bool = False) -> str:
         moduleElement = "type='module'" if module else ""
@@ -255,6 +592,8 @@ class BenchSite:
         libraryConfig = self.GetLibraryConfig()
         taskConfig = self.GetTaskConfig()
         logoLibrary = self.GetLibraryLogo()
+        # the logos are copied in the assets folder, the asset stage comes after
+        staticSiteGenerator.BuildAssets()
 
         logger.info("Generate HTML Home Page")
         logger.debug(f"library config : {libraryConfig}")
@@ -268,7 +607,9 @@ class BenchSite:
             )
         )
 
-        codeLibrary = CollectCode(pathToInfrastructure=self.structureTestPath)
+        codeLibrary = CollectCode(
+            pathToInfrastructure=self.structureTestPath, libraryConfig=libraryConfig
+        )
 
         # GOOGLEANALYTICS
         HTMLGoogleAnalytics = staticSiteGenerator.CreateHTMLComponent(
@@ -315,7 +656,7 @@ class BenchSite:
             "rankBar.html",
             contentFolderPath=contentFilePath,
             dataGenerationDate=self.machineData["execution_date"],
-            data=f"const cls = {rk.RankingLibraryGlobal(threshold=BenchSite.LEXMAX_THRESHOLD,isResultList = False)}",
+            data=f"const cls = {rk.RankingLibraryGlobal(threshold=BenchSite.LEXMAX_THRESHOLD, isResultList=False, metric=self.rankingMetric)}",
             scriptFilePath=f"./{staticSiteGenerator.scriptFilePath}/rankBar.js",
         )
 
@@ -338,6 +679,22 @@ class BenchSite:
         # CLASSEMENT DES LIBRAIRIES PAR TACHES
         HTMLTaskRanking = self.GenerateHTMLBestLibraryByTask()
 
+        # SPEEDUP RELATIVE TO THE REFERENCE LIBRARY
+        HTMLSpeedup = ""
+        if self.referenceLibrary is not None:
+            speedupGlobal = rk.SpeedupGlobal(self.referenceLibrary)
+            speedupByTheme = rk.SpeedupByTheme(self.referenceLibrary)
+            HTMLSpeedup = staticSiteGenerator.CreateHTMLComponent(
+                "speedup.html",
+                **self.SpeedupComponent(
+                    f"Speedup relative to {self.referenceLibrary}",
+                    speedupGlobal,
+                    {"Global": speedupGlobal, **speedupByTheme},
+                    "Library",
+                    f"./{staticSiteGenerator.scriptFilePath}/speedupChart.js",
+                ),
+            )
+
         HTMLMainContainer = (
             "<div id='main-container'>"
             + "".join(
@@ -347,6 +704,7 @@ class BenchSite:
                     HTMLGlobalRanking,
                     HTMLThemeRanking,
                     HTMLTaskRanking,
+                    HTMLSpeedup,
                 ]
             )
             + "</div>"
@@ -367,6 +725,14 @@ class BenchSite:
             "index.html",
             manualOutputPath=os.path.split(staticSiteGenerator.contentFilePath)[0],
         )
+        # the task, theme and library pages only depend on data computed here, they are rendered
+        # together at the end, the components used by several pages are given once to the workers
+        renderJobs = []
+        sharedComponents = {
+            "googleAnalytics": HTMLGoogleAnalytics,
+            "footer": HTMLFooter,
+        }
+
         # ==================================================
         # TACHES PAGES
         # ==================================================
@@ -404,8 +770,9 @@ class BenchSite:
             ],
             assetsFilePath=f"../{staticSiteGenerator.assetsFilePath}",
         )
+        sharedComponents["navigation"] = HTMLNavigation
         # HEADER
-        HTMLHeader = staticSiteGenerator.CreateHTMLComponent(
+        sharedComponents["taskHeader"] = staticSiteGenerator.CreateHTMLComponent(
             "header.html",
             styleFilePath=f"../{staticSiteGenerator.styleFilePath}/{styleFilePath}",
             assetsFilePath=f"../{staticSiteGenerator.assetsFilePath}",
@@ -415,15 +782,48 @@ class BenchSite:
         )
 
         taskRankDico = rk.RankingLibraryByTask(
-            threshold=BenchSite.LEXMAX_THRESHOLD, isResultList=False
+            threshold=BenchSite.LEXMAX_THRESHOLD,
+            isResultList=False,
+            metric=self.rankingMetric,
+        )
+        # the tasks ranked on several metrics with their Pareto fronts
+        paretoConfigs = {
+            taskName: rk.ParetoConfig.FromTaskConfig(taskConfig[taskName])
+            for taskName in Task.GetAllTaskName()
+            if "pareto_metrics" in taskConfig[taskName]
+        }
+        paretoRankDico = rk.ParetoScoresByTask(paretoConfigs)
+        rankStability = (
+            rk.RankStabilityByTask(
+                threshold=BenchSite.LEXMAX_THRESHOLD, metric=self.rankingMetric
+            )
+            if self.rankStability
+            else {}
         )
 
         for taskName in Task.GetAllTaskName():
-            HTMLTaskRankingBar = staticSiteGenerator.CreateHTMLComponent(
+            paretoComponents = {}
+            if taskName in paretoConfigs:
+                paretoRanking = paretoRankDico[taskName]
+                paretoFronts = {
+                    library: result["front"]
+                    for library, result in paretoRanking.items()
+                }
+                paretoComponents = dict(
+                    paretoData=f"const paretoFronts = {paretoFronts}",
+                    paretoTitle=BenchSite.ParetoDescription(paretoRanking),
+                )
+            HTMLTaskRankingBar = (
                 "rankBar.html",
-                data=f"const cls = {taskRankDico[taskName]}",
-                dataGenerationDate=self.machineData["execution_date"],
-                scriptFilePath=f"../{staticSiteGenerator.scriptFilePath}/rankBar.js",
+                dict(
+                    data=f"const cls = {taskRankDico[taskName]}",
+                    dataGenerationDate=self.machineData["execution_date"],
+                    scriptFilePath=f"../{staticSiteGenerator.scriptFilePath}/rankBar.js",
+                    stabilityData=BenchSite.RankStabilityTable(
+                        rankStability.get(taskName, {})
+                    ),
+                    **paretoComponents,
+                ),
             )
 
             # CLASSEMENT DES LIBRAIRIES PAR TACHES
@@ -431,26 +831,7 @@ class BenchSite:
             # importedData = [task for task in Task.GetAllTaskByName(taskName)]
             # importedData = [[{"arg":r, "res":c} for r,c in zip(task.arguments,task.results)] for task in Task.GetAllTaskByName(taskName)]
             task = Task.GetTaskByName(taskName)
-            importedRuntime = sum(
-                [
-                    [
-                        {
-                            "arguments": int(arg) if arg.isnumeric() else arg,
-                            "runTime": runtime if runtime != float("inf") and runtime > 0 else 'error',
-                            "libraryName": library.name,
-                            "std" : std if std != float("inf") and std > 0 else 'error',
-                        }
-                        for arg, runtime, std in zip(
-                            task.arguments_label,
-                            task.mean_runtime(library.name),
-                            task.standard_deviation_runtime(library.name),
-                        )
-                        # if runtime != float("inf")
-                    ]
-                    for library in Library.GetAllLibrary()
-                ],
-                [],
-            )
+            importedRuntime = BenchSite.ColumnarChartData(task)
 
             logger.debug(f"{importedRuntime = }")
 
@@ -462,26 +843,7 @@ class BenchSite:
 
             task = Task.GetTaskByName(taskName)
             importedEvaluation = {
-                function: sum(
-                    [
-                        [
-                            {
-                                "arguments": int(arg) if arg.isnumeric() else arg,
-                                "runTime": res.get(function, 0) if res.get(function, 0) != float("inf") else 'error',
-                                "libraryName": library.name,
-                                "std": std.get(function, 0) if res.get(function, 0) != float("inf") else 'error',
-                            }
-                            for arg, res, std in zip(
-                                task.arguments_label,
-                                task.mean_evaluation(library.name),
-                                task.standard_deviation_evaluation(library.name),
-                            )
-                            # if res.get(function) != float("inf") 
-                        ]
-                        for library in Library.GetAllLibrary()
-                    ],
-                    [],
-                )
+                function: BenchSite.ColumnarChartData(task, function)
                 for function in functionEvaluation
             }
 
@@ -496,7 +858,34 @@ class BenchSite:
                 "XLabel": taskConfig[taskName].get("task_xlabel", "X-axis"),
                 "YLabel": taskConfig[taskName].get("task_ylabel", "Y-axis"),
                 "scale": taskConfig[taskName].get("task_scale", "auto"),
+                "band": taskConfig[taskName].get("task_band", "std"),
             }
+            # the resources are charted next to the runtime when they were measured
+            if task.HasResources():
+                resourceMetrics = (
+                    taskConfig[taskName]
+                    .get("resource_metrics", BenchSite.DEFAULT_RESOURCE_METRICS)
+                    .split(" ")
+                )
+                for metric in resourceMetrics:
+                    if metric not in BenchSite.RESOURCE_CHARTS:
+                        logger.warning(
+                            f"Unknown resource metric {metric} for {taskName}"
+                        )
+                        continue
+                    label, ylabel = BenchSite.RESOURCE_CHARTS[metric]
+                    chartData[metric] = {
+                        "data": BenchSite.ColumnarChartData(task, metric),
+                        "display": taskConfig[taskName].get(
+                            "task_display", "groupedBar"
+                        ),
+                        "label": label,
+                        "title": f"{label} of {RemoveUnderscoreAndDash(taskName)}",
+                        "XLabel": taskConfig[taskName].get("task_xlabel", "X-axis"),
+                        "YLabel": ylabel,
+                        "scale": "auto",
+                        "band": taskConfig[taskName].get("task_band", "std"),
+                    }
             for i, function in enumerate(functionEvaluation):
                 xlabel = taskConfig[taskName].get("post_task_xlabel", "X-axis")
                 ylabel = (
@@ -514,8 +903,16 @@ class BenchSite:
                     "XLabel": xlabel,
                     "YLabel": ylabel[i] if i < len(ylabel) else ylabel[0],
                     "scale": scale[i] if i < len(scale) else scale[0],
+                    "band": taskConfig[taskName].get("post_task_band", "std"),
                 }
 
+            timelineData = BenchSite.TimelineChartData(task)
+            timelineDataUrl = (
+                f"'../{staticSiteGenerator.dataFilePath}/{staticSiteGenerator.CreateDataFile(f'{taskName}_timeline', timelineData)}'"
+                if timelineData is not None
+                else "null"
+            )
+
             HTMLExtra = taskConfig[taskName].get("extra_html_element", None)
             if HTMLExtra is not None:
                 HTMLExtra = list(Path(self.structureTestPath).glob(f"**/{HTMLExtra}"))[
@@ -533,48 +930,50 @@ class BenchSite:
                 templateTask += f" {codeLibrary.get_code_HTML(library.name, taskName)}"
                 templateTask += f" </code>"
 
-            HTMLTaskRanking = staticSiteGenerator.CreateHTMLComponent(
+            HTMLTaskRanking = (
                 "task.html",
-                taskName=RemoveUnderscoreAndDash(taskName),
-                taskNamePage=BenchSite.CreateScriptBalise(
-                    content=f"const TaskName = '{taskName}';"
-                ),
-                scriptFilePath=BenchSite.CreateScriptBalise(
-                    scriptName=f"../{staticSiteGenerator.scriptFilePath}/{scriptFilePath}",
-                    module=True,
-                ),
-                libraryOrdered=BenchSite.OrderedList(
-                    rk.RankingLibraryByTask(threshold=BenchSite.LEXMAX_THRESHOLD)[
-                        taskName
-                    ]
-                ),
-                scriptData=BenchSite.CreateScriptBalise(
-                    content=f"const importedData = {chartData};"
-                ),
-                code=templateTask,
-                taskDescritpion=taskConfig[taskName].get(
-                    "description", "No description"
-                ),
-                argumentsDescription=BenchSite.CreateScriptBalise(
-                    content=f"const argDescription = '{taskConfig[taskName].get('arguments_description', 'No description')}';"
-                ),
-                displayScale=BenchSite.CreateScriptBalise(
-                    content=f"const displayScale = '{taskConfig[taskName].get('display_scale', 'linear')}';"
+                dict(
+                    taskName=RemoveUnderscoreAndDash(taskName),
+                    taskNamePage=BenchSite.CreateScriptBalise(
+                        content=f"const TaskName = '{taskName}';"
+                    ),
+                    scriptFilePath=BenchSite.CreateScriptBalise(
+                        scriptName=f"../{staticSiteGenerator.scriptFilePath}/{scriptFilePath}",
+                        module=True,
+                    ),
+                    libraryOrdered=BenchSite.OrderedList(taskRankDico[taskName]),
+                    scriptData=BenchSite.CreateScriptBalise(
+                        content=f"const importedDataUrl = '../{staticSiteGenerator.dataFilePath}/{staticSiteGenerator.CreateDataFile(taskName, chartData)}';"
+                        f"const timelineDataUrl = {timelineDataUrl};"
+                    ),
+                    code=templateTask,
+                    taskDescritpion=taskConfig[taskName].get(
+                        "description", "No description"
+                    ),
+                    argumentsDescription=BenchSite.CreateScriptBalise(
+                        content=f"const argDescription = '{taskConfig[taskName].get('arguments_description', 'No description')}';"
+                    ),
+                    displayScale=BenchSite.CreateScriptBalise(
+                        content=f"const displayScale = '{taskConfig[taskName].get('display_scale', 'linear')}';"
+                    ),
+                    extra_html_element=HTMLExtra,
+                    extra_description=taskConfig[taskName].get("extra_description", ""),
                 ),
-                extra_html_element=HTMLExtra,
-                extra_description=taskConfig[taskName].get("extra_description", ""),
             )
 
-            staticSiteGenerator.CreateHTMLPage(
-                [
-                    HTMLHeader,
-                    HTMLNavigation,
-                    HTMLTaskRankingBar,
-                    HTMLTaskRanking,
-                    HTMLGoogleAnalytics,
-                    HTMLFooter,
-                ],
-                f"{taskName}.html",
+            renderJobs.append(
+                RenderJob(
+                    f"{taskName}.html",
+                    staticSiteGenerator.contentFilePath,
+                    [
+                        "taskHeader",
+                        "navigation",
+                        HTMLTaskRankingBar,
+                        HTMLTaskRanking,
+                        "googleAnalytics",
+                        "footer",
+                    ],
+                )
             )
 
         # ==================================================
@@ -585,7 +984,7 @@ class BenchSite:
         scriptFilePath = "themeScript.js"
 
         # HEADER
-        HTMLHeader = staticSiteGenerator.CreateHTMLComponent(
+        sharedComponents["themeHeader"] = staticSiteGenerator.CreateHTMLComponent(
             "header.html",
             styleFilePath=f"../{staticSiteGenerator.styleFilePath}/{styleFilePath}",
             assetsFilePath=f"../{staticSiteGenerator.assetsFilePath}",
@@ -595,16 +994,20 @@ class BenchSite:
         )
 
         themeRankDico = rk.RankingLibraryByTheme(
-            threshold=BenchSite.LEXMAX_THRESHOLD, isResultList=False
+            threshold=BenchSite.LEXMAX_THRESHOLD,
+            isResultList=False,
+            metric=self.rankingMetric,
         )
 
         for themeName in Task.GetAllThemeName():
             # CLASSEMENT DES LIBRAIRIES PAR TACHES BAR
-            HTMLThemeRankingBar = staticSiteGenerator.CreateHTMLComponent(
+            HTMLThemeRankingBar = (
                 "rankBar.html",
-                data=f"const cls = {themeRankDico[themeName]}",
-                dataGenerationDate=self.machineData["execution_date"],
-                scriptFilePath=f"../{staticSiteGenerator.scriptFilePath}/rankBar.js",
+                dict(
+                    data=f"const cls = {themeRankDico[themeName]}",
+                    dataGenerationDate=self.machineData["execution_date"],
+                    scriptFilePath=f"../{staticSiteGenerator.scriptFilePath}/rankBar.js",
+                ),
             )
 
             importedRuntime = sum(
@@ -613,13 +1016,9 @@ class BenchSite:
                         {
                             "taskName": taskName,
                             "libraryName": t,
-                            "results": rk.RankingLibraryByTask(
-                                threshold=BenchSite.LEXMAX_THRESHOLD, isResultList=False
-                            )[taskName][t],
+                            "results": taskRankDico[taskName][t],
                         }
-                        for t in rk.RankingLibraryByTask(
-                            threshold=BenchSite.LEXMAX_THRESHOLD
-                        )[taskName]
+                        for t in taskRankDico[taskName]
                     ]
                     for taskName in Task.GetTaskNameByThemeName(themeName)
                 ],
@@ -637,36 +1036,65 @@ class BenchSite:
             importedRuntime = summaryData + importedRuntime
 
             # CLASSEMENT DES LIBRAIRIES PAR TACHES
-            HTMLThemeRanking = staticSiteGenerator.CreateHTMLComponent(
+            HTMLThemeRanking = (
                 "theme.html",
-                themeName=RemoveUnderscoreAndDash(themeName),
-                themeNamePage=BenchSite.CreateScriptBalise(
-                    content=f"const themeName = '{themeName}';"
-                ),
-                taskNameList=", ".join(
-                    BenchSite.MakeLink(taskName)
-                    for taskName in Task.GetTaskNameByThemeName(themeName)
-                ),
-                results=self.GenerateHTMLRankingPerThemeName(themeName),
-                scriptFilePath=BenchSite.CreateScriptBalise(
-                    scriptName=f"../{staticSiteGenerator.scriptFilePath}/{scriptFilePath}",
-                    module=True,
-                ),
-                scriptData=BenchSite.CreateScriptBalise(
-                    content=f"const importedData = {importedRuntime};"
+                dict(
+                    themeName=RemoveUnderscoreAndDash(themeName),
+                    themeNamePage=BenchSite.CreateScriptBalise(
+                        content=f"const themeName = '{themeName}';"
+                    ),
+                    taskNameList=", ".join(
+                        BenchSite.MakeLink(taskName)
+                        for taskName in Task.GetTaskNameByThemeName(themeName)
+                    ),
+                    results=self.GenerateHTMLRankingPerThemeName(themeName),
+                    scriptFilePath=BenchSite.CreateScriptBalise(
+                        scriptName=f"../{staticSiteGenerator.scriptFilePath}/{scriptFilePath}",
+                        module=True,
+                    ),
+                    scriptData=BenchSite.CreateScriptBalise(
+                        content=f"const importedDataUrl = '../{staticSiteGenerator.dataFilePath}/{staticSiteGenerator.CreateDataFile(themeName, importedRuntime)}';"
+                    ),
                 ),
             )
 
-            staticSiteGenerator.CreateHTMLPage(
-                [
-                    HTMLHeader,
-                    HTMLNavigation,
-                    HTMLThemeRankingBar,
-                    HTMLThemeRanking,
-                    HTMLGoogleAnalytics,
-                    HTMLFooter,
-                ],
-                f"{themeName}.html",
+            components = [
+                "themeHeader",
+                "navigation",
+                HTMLThemeRankingBar,
+                HTMLThemeRanking,
+            ]
+            if self.referenceLibrary is not None:
+                speedupByTask = rk.SpeedupByTask(self.referenceLibrary)
+                speedupTheme = rk.SpeedupByTheme(self.referenceLibrary)[themeName]
+                components.append(
+                    (
+                        "speedup.html",
+                        self.SpeedupComponent(
+                            f"Speedup relative to {self.referenceLibrary}",
+                            speedupTheme,
+                            {
+                                themeName: speedupTheme,
+                                **{
+                                    taskName: speedupByTask[taskName]
+                                    for taskName in Task.GetTaskNameByThemeName(
+                                        themeName
+                                    )
+                                    if taskName in speedupByTask
+                                },
+                            },
+                            "Library",
+                            f"../{staticSiteGenerator.scriptFilePath}/speedupChart.js",
+                        ),
+                    )
+                )
+
+            renderJobs.append(
+                RenderJob(
+                    f"{themeName}.html",
+                    staticSiteGenerator.contentFilePath,
+                    components + ["googleAnalytics", "footer"],
+                )
             )
 
         # ==================================================
@@ -677,28 +1105,31 @@ class BenchSite:
         scriptFilePath = "libraryScript.js"
 
         libraryDico = rk.RankingLibraryGlobal(
-            threshold=BenchSite.LEXMAX_THRESHOLD, isResultList=False
+            threshold=BenchSite.LEXMAX_THRESHOLD,
+            isResultList=False,
+            metric=self.rankingMetric,
         )
         # RANKING BAR GLOBALE
-        HTMLGlobalRankingBar = staticSiteGenerator.CreateHTMLComponent(
+        sharedComponents["globalRankingBar"] = (
             "rankBar.html",
-            contentFolderPath=contentFilePath,
-            data=f"const cls = {libraryDico}",
-            dataGenerationDate=self.machineData["execution_date"],
-            scriptFilePath=f"../{staticSiteGenerator.scriptFilePath}/rankBar.js",
+            dict(
+                contentFolderPath=contentFilePath,
+                data=f"const cls = {libraryDico}",
+                dataGenerationDate=self.machineData["execution_date"],
+                scriptFilePath=f"../{staticSiteGenerator.scriptFilePath}/rankBar.js",
+            ),
+        )
+        # HEADER
+        sharedComponents["libraryHeader"] = staticSiteGenerator.CreateHTMLComponent(
+            "header.html",
+            styleFilePath=f"../{staticSiteGenerator.styleFilePath}/{styleFilePath}",
+            assetsFilePath=f"../{staticSiteGenerator.assetsFilePath}",
+            linkTo=linkTo,
+            siteName=self.siteConfig.get("name", "No name attributed"),
+            socialMediaList=social_media,
         )
 
         for libraryName in Library.GetAllLibraryName():
-            # HEADER
-            HTMLHeader = staticSiteGenerator.CreateHTMLComponent(
-                "header.html",
-                styleFilePath=f"../{staticSiteGenerator.styleFilePath}/{styleFilePath}",
-                assetsFilePath=f"../{staticSiteGenerator.assetsFilePath}",
-                linkTo=linkTo,
-                siteName=self.siteConfig.get("name", "No name attributed"),
-                socialMediaList=social_media,
-            )
-
             importedRuntime = {
                 task.name: {
                     "display": "plot"
@@ -722,40 +1153,86 @@ class BenchSite:
             }
             # print(importedData)
             # CLASSEMENT DES LIBRAIRIES PAR TACHES
-            HTMLLibraryRanking = staticSiteGenerator.CreateHTMLComponent(
+            HTMLLibraryRanking = (
                 "library.html",
-                libraryName=libraryName,
-                taskNameList=[
-                    (taskName, RemoveUnderscoreAndDash(taskName))
-                    for taskName in Task.GetAllTaskName()
-                ],
-                scriptFilePath=BenchSite.CreateScriptBalise(
-                    scriptName=f"../{staticSiteGenerator.scriptFilePath}/{scriptFilePath}",
-                    module=True,
-                ),
-                scriptData=BenchSite.CreateScriptBalise(
-                    content=f"const importedData = {importedRuntime};"
-                ),
-                taskDescription=libraryConfig[libraryName].get(
-                    "description", "No Description Attributed"
+                dict(
+                    libraryName=libraryName,
+                    taskNameList=[
+                        (taskName, RemoveUnderscoreAndDash(taskName))
+                        for taskName in Task.GetAllTaskName()
+                    ],
+                    scriptFilePath=BenchSite.CreateScriptBalise(
+                        scriptName=f"../{staticSiteGenerator.scriptFilePath}/{scriptFilePath}",
+                        module=True,
+                    ),
+                    scriptData=BenchSite.CreateScriptBalise(
+                        content=f"const importedDataUrl = '../{staticSiteGenerator.dataFilePath}/{staticSiteGenerator.CreateDataFile(libraryName, importedRuntime)}';"
+                    ),
+                    taskDescription=libraryConfig[libraryName].get(
+                        "description", "No Description Attributed"
+                    ),
+                    logoLibrary=f"<img src='../{logoLibrary[libraryName]}' alt='{libraryName}' width='50' height='50'>"
+                    if logoLibrary[libraryName] != None
+                    else "",
                 ),
-                logoLibrary=f"<img src='../{logoLibrary[libraryName]}' alt='{libraryName}' width='50' height='50'>"
-                if logoLibrary[libraryName] != None
-                else "",
             )
 
-            staticSiteGenerator.CreateHTMLPage(
-                [
-                    HTMLHeader,
-                    HTMLNavigation,
-                    HTMLGlobalRankingBar,
-                    HTMLLibraryRanking,
-                    HTMLGoogleAnalytics,
-                    HTMLFooter,
-                ],
-                f"{libraryName}.html",
+            components = [
+                "libraryHeader",
+                "navigation",
+                "globalRankingBar",
+                HTMLLibraryRanking,
+            ]
+            # the speedup of the library on each task, not for the reference itself
+            if self.referenceLibrary not in [None, libraryName]:
+                speedupByTask = {
+                    taskName: libraries[libraryName]
+                    for taskName, libraries in rk.SpeedupByTask(
+                        self.referenceLibrary
+                    ).items()
+                    if libraryName in libraries
+                }
+                speedupByTheme = {
+                    themeName: libraries[libraryName]
+                    for themeName, libraries in rk.SpeedupByTheme(
+                        self.referenceLibrary
+                    ).items()
+                    if libraryName in libraries
+                }
+                components.append(
+                    (
+                        "speedup.html",
+                        self.SpeedupComponent(
+                            f"Speedup of {libraryName} relative to {self.referenceLibrary}",
+                            speedupByTask,
+                            {
+                                libraryName: {
+                                    "Global": rk.SpeedupGlobal(
+                                        self.referenceLibrary
+                                    ).get(libraryName, {"count": 0, "total": 0}),
+                                    **speedupByTheme,
+                                    **speedupByTask,
+                                }
+                            },
+                            "Task / Theme",
+                            f"../{staticSiteGenerator.scriptFilePath}/speedupChart.js",
+                            sortRows=False,
+                        ),
+                    )
+                )
+
+            renderJobs.append(
+                RenderJob(
+                    f"{libraryName}.html",
+                    staticSiteGenerator.contentFilePath,
+                    components + ["googleAnalytics", "footer"],
+                )
             )
 
+        staticSiteGenerator.RenderPages(
+            renderJobs, sharedComponents, nbWorkers=self.nbRenderWorkers
+        )
+
         # ==================================================
         # ABOUT PAGE
         # ==================================================
@@ -781,6 +1258,8 @@ class BenchSite:
             [HTMLHeader, HTMLNavigation, HTMLAbout, HTMLFooter], "about.html"
         )
 
+        staticSiteGenerator.CompleteBuild()
+
         logger.info("=======Static site generated successfully=======")
 
 
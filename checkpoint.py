@@ -0,0 +1,143 @@
+"""Docstring for checkpoint.py module.
+
+This module contains the class Checkpoint used to save the state of a running benchmark so it can be
+resumed after a crash (a snapshot followed by a journal of the completed cells), and the function WriteJsonAtomic used to write a json file without ever
+leaving a truncated file behind.
+
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from logger import logger
+
+
+def WriteJsonAtomic(path, data, **kwargs) -> None:
+    """Write a json file atomically.
+
+    The data is written in a temporary file of the same folder which then replace the file, a reader
+    (or a crash) see either the old file or the new one.
+
+    Parameters
+    ----------
+    path : str or Path
+        The path to the json file.
+    data : object
+        The json serializable data.
+    **kwargs
+        Given to `json.dump`.
+    """
+    path = Path(path)
+    file = tempfile.NamedTemporaryFile(
+        "w", dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False
+    )
+    try:
+        with file:
+            json.dump(data, file, **kwargs)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(file.name, path)
+    except BaseException:
+        Path(file.name).unlink(missing_ok=True)
+        raise
+
+
+class Checkpoint:
+    """The state of a running benchmark: its results and the (library, task, argument) completed.
+
+    The checkpoint is a journal of json lines. The first line is a snapshot of the results and of the
+    completed cells, each following line is the result of a cell completed since the snapshot. Saving a
+    cell only appends its own record, the journal is compacted into a single snapshot at the end.
+
+    Attributes
+    ----------
+    path : Path
+        The path to the checkpoint file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        self.journal = None
+
+    def Exists(self) -> bool:
+        return self.path.is_file()
+
+    def Start(self, results: dict, completedCells) -> None:
+        """Replace the checkpoint with a snapshot of the benchmark, the next cells are appended to it.
+
+        Parameters
+        ----------
+        results : dict
+            The results of the benchmark.
+        completedCells : iterable of tuple
+            The (library, task, argument) completed since the beginning of the benchmark.
+        """
+        self.Close()
+        WriteJsonAtomic(
+            self.path,
+            {"results": results, "completed": [list(key) for key in completedCells]},
+        )
+        with open(self.path, "a") as file:
+            file.write("\n")
+        self.journal = open(self.path, "a")
+
+    def Append(self, key: tuple[str, str, str], result: dict) -> None:
+        """Append the result of a completed (library, task, argument) to the journal.
+
+        Parameters
+        ----------
+        key : tuple of str
+            The (library, task, argument) completed.
+        result : dict
+            Its results (runtime, evaluation ...), they replace the ones of the snapshot.
+        """
+        self.journal.write(json.dumps({"cell": list(key), "result": result}) + "\n")
+        self.journal.flush()
+        os.fsync(self.journal.fileno())
+
+    def Compact(self, results: dict, completedCells) -> None:
+        """Replace the journal with a single snapshot, see `Start`."""
+        self.Start(results, completedCells)
+        self.Close()
+
+    def Close(self) -> None:
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def Load(self) -> tuple[dict, set[tuple[str, str, str]]]:
+        """Read the checkpoint, the records of the journal are applied on the snapshot.
+
+        The last record is ignored if it is truncated (the benchmark stopped while writing it).
+
+        Returns
+        -------
+        tuple of dict and set of tuple
+            The results and the (library, task, argument) completed.
+        """
+        with open(self.path, "r") as file:
+            lines = [line for line in file.read().split("\n") if line.strip() != ""]
+        data = json.loads(lines[0])
+        results = data["results"]
+        completedCells = {tuple(key) for key in data["completed"]}
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(
+                    f"Truncated record ignored in the checkpoint {self.path}"
+                )
+                continue
+            libraryName, taskName, arg = record["cell"]
+            results[libraryName][taskName]["results"][arg] = record["result"]
+            completedCells.add(tuple(record["cell"]))
+        logger.info(
+            f"Checkpoint {self.path} loaded with {len(completedCells)} completed cell(s)"
+        )
+        return results, completedCells
+
+    def Remove(self) -> None:
+        self.Close()
+        self.path.unlink(missing_ok=True)
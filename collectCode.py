@@ -1,14 +1,71 @@
+import hashlib
 import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pygments import __version__ as pygmentsVersion
 from pygments import highlight
-from pygments.lexers import PythonLexer
+from pygments.lexers import get_lexer_by_name, get_lexer_for_filename, TextLexer
 from pygments.formatters import HtmlFormatter
+from pygments.util import ClassNotFound
 import json
 from pathlib import Path
 from logger import logger
+from structure_test import StructureTest
+
+
+def GetLexer(language: str, filename: str):
+    """The lexer of the language configured for the target, or the one guessed from the file name."""
+    try:
+        return get_lexer_by_name(language)
+    except ClassNotFound:
+        pass
+    try:
+        return get_lexer_for_filename(filename)
+    except ClassNotFound:
+        return TextLexer()
+
+
+def HighlightCode(code: str, language: str, filename: str) -> str:
+    """Highlight the code in HTML, run by the workers of `CollectCode` for the snippets not in cache."""
+    return highlight(
+        code,
+        GetLexer(language, filename),
+        HtmlFormatter(**CollectCode.FORMATTER_OPTIONS),
+    )
 
 
 class CollectCode:
-    def __init__(self, pathToInfrastructure: str, outputPath=None):
+    """Collect the scripts of the targets for each task and highlight them in HTML.
+
+    The highlighted code is cached on disk by the hash of the code, the language and the options of the
+    formatter, only the snippets which changed are highlighted again (on a pool of processes). The entries
+    of the cache not used for `CACHE_MAX_AGE` seconds are removed.
+
+    Attributes
+    ----------
+    FORMATTER_OPTIONS : dict
+        Class Attribute ! The options of the pygments HtmlFormatter.
+    CACHE_MAX_AGE : int
+        Class Attribute ! The time in seconds after which an unused entry of the cache is removed.
+    """
+
+    FORMATTER_OPTIONS = dict(
+        linenos=True,
+        cssclass="zenburn",
+        noclasses=True,
+        style="zenburn",
+    )
+    CACHE_MAX_AGE = 30 * 24 * 3600
+
+    def __init__(
+        self,
+        pathToInfrastructure: str,
+        outputPath=None,
+        libraryConfig: dict = None,
+        cachePath: str = None,
+        nbWorkers: int = None,
+    ):
         logger.info("Collecting the code")
         logger.debug(f"Path to infrastructure : {pathToInfrastructure}")
         self.pathToInfrastructure = Path(pathToInfrastructure)
@@ -19,7 +76,25 @@ class CollectCode:
             path.name for path in self.pathToInfrastructure.glob("targets/*")
         ]
 
-        self.taskPath = list(self.pathToInfrastructure.glob("**/*_run.py"))
+        if libraryConfig is None:
+            strtest = StructureTest()
+            libraryConfig = strtest.readConfig(
+                *strtest.findConfigFile(os.path.join(pathToInfrastructure, "targets"))
+            )
+        self.libraryConfig = libraryConfig
+        self.cachePath = Path(
+            os.path.join(tempfile.gettempdir(), "benchsite-code-cache")
+            if cachePath is None
+            else cachePath
+        )
+        self.nbWorkers = nbWorkers
+
+        # the scripts of every language (libA_run.py, libB_run.java ...), not the compiled files
+        self.taskPath = [
+            path
+            for path in self.pathToInfrastructure.glob("**/*_run.*")
+            if "__pycache__" not in path.parts and path.suffix not in [".pyc", ".class"]
+        ]
 
         logger.debug(f"Task path : {self.taskPath}")
         logger.debug(f"Targets : {self.targets}")
@@ -37,6 +112,7 @@ class CollectCode:
             return {}
 
         code = {target: {} for target in self.targets}
+        self.codeFilename = {target: {} for target in self.targets}
         for path in code_path:
             # we check if there is a before in the pathName
             # maybe change strategy in the future to be more flexible
@@ -47,28 +123,89 @@ class CollectCode:
             logger.debug(f"Reading code file in {path.absolute()}")
             with open(path.absolute(), "r") as f:
                 code[targetName][taskName] = f.read()
+            self.codeFilename[targetName][taskName] = path.name
 
         logger.info("Code retreived")
 
         return code
 
+    def CacheKey(self, code: str, language: str, filename: str) -> str:
+        """The hash of everything the highlighted HTML depends on."""
+        options = json.dumps(CollectCode.FORMATTER_OPTIONS, sort_keys=True)
+        return hashlib.sha256(
+            f"{pygmentsVersion}\0{language}\0{Path(filename).suffix}\0{options}\0{code}".encode()
+        ).hexdigest()
+
     def TransfomCodeInHTML(self):
+        self.cachePath.mkdir(parents=True, exist_ok=True)
+        misses = []
         for target in self.targets:
-            for task in self.pure_code_str[target]:
-                self.CodeHTML[target][task] = self.pure_code_to_html(
-                    self.pure_code_str[target][task]
+            language = self.libraryConfig.get(target, {}).get("language", "python")
+            for task in self.pure_code_str.get(target, {}):
+                code = self.pure_code_str[target][task]
+                filename = self.codeFilename[target][task]
+                cacheFile = (
+                    self.cachePath / f"{self.CacheKey(code, language, filename)}.html"
                 )
-        logger.info("Code transformed in HTML")
+                if cacheFile.is_file():
+                    self.CodeHTML[target][task] = cacheFile.read_text()
+                    # the entry is used, it is not removed by `PruneCache`
+                    os.utime(cacheFile)
+                else:
+                    misses.append((target, task, code, language, filename, cacheFile))
+
+        nbWorkers = os.cpu_count() if self.nbWorkers is None else self.nbWorkers
+        nbWorkers = max(1, min(nbWorkers, len(misses)))
+        arguments = [miss[2:5] for miss in misses]
+        if nbWorkers == 1:
+            highlighted = [HighlightCode(*argument) for argument in arguments]
+        else:
+            with ProcessPoolExecutor(max_workers=nbWorkers) as executor:
+                highlighted = list(executor.map(HighlightCode, *zip(*arguments)))
+
+        for (target, task, _, _, _, cacheFile), html in zip(misses, highlighted):
+            self.CodeHTML[target][task] = html
+            self.WriteCacheFile(cacheFile, html)
+        self.PruneCache()
+        logger.info(
+            f"Code transformed in HTML ({len(misses)} snippet(s) highlighted, the others were in cache)"
+        )
         logger.debug(f"Code HTML : {self.CodeHTML.keys()}")
 
-    def pure_code_to_html(self, code: str):
-        formatter = HtmlFormatter(
-            linenos=True,
-            cssclass="zenburn",
-            noclasses=True,
-            style="zenburn",
+    def WriteCacheFile(self, cacheFile: Path, html: str) -> None:
+        """Write an entry of the cache atomically, a concurrent build (or a crash) never leaves a truncated entry."""
+        file = tempfile.NamedTemporaryFile(
+            "w", dir=self.cachePath, prefix=".", suffix=".tmp", delete=False
         )
-        return highlight(code, PythonLexer(), formatter)
+        try:
+            with file:
+                file.write(html)
+            os.replace(file.name, cacheFile)
+        except BaseException:
+            Path(file.name).unlink(missing_ok=True)
+            raise
+
+    def PruneCache(self) -> None:
+        """Remove the entries of the cache not used for `CACHE_MAX_AGE` seconds."""
+        limit = time.time() - CollectCode.CACHE_MAX_AGE
+        nbRemoved = 0
+        for cacheFile in self.cachePath.glob("*.html"):
+            try:
+                if cacheFile.stat().st_mtime < limit:
+                    cacheFile.unlink()
+                    nbRemoved += 1
+            except FileNotFoundError:
+                # removed by a concurrent build
+                continue
+        if nbRemoved > 0:
+            logger.info(
+                f"{nbRemoved} unused snippet(s) removed from the cache {self.cachePath}"
+            )
+
+    def pure_code_to_html(
+        self, code: str, language: str = "python", filename: str = ""
+    ):
+        return HighlightCode(code, language, filename)
 
     def SaveInJson(self, outputPath: str):
         with open(outputPath, "w") as file:
@@ -0,0 +1,103 @@
+"""Docstring for fingerprint.py module.
+
+This module contains the functions to compute a content-addressed fingerprint of the inputs of a
+benchmark cell (scripts, data files, configuration and version of the library). Two cells with the
+same fingerprint would give the same measures so the results of one can be reused for the other.
+
+"""
+
+import hashlib
+import json
+from importlib import metadata
+from pathlib import Path
+
+from logger import logger
+
+
+class FileHasher:
+    """Hash the content of files, each file is only read once.
+
+    Attributes
+    ----------
+    cache : dict of str and str
+        The hash of the files already read, indexed by their absolute path.
+    """
+
+    def __init__(self) -> None:
+        self.cache = {}
+
+    def Hash(self, path) -> str:
+        """Getter for the sha256 of the content of a file.
+
+        Parameters
+        ----------
+        path : str or Path
+            The path to the file.
+
+        Returns
+        -------
+        str
+            The hexadecimal sha256 of the file, an empty string if the file doesn't exist.
+        """
+        path = Path(path).absolute()
+        key = str(path)
+        if key not in self.cache:
+            if not path.is_file():
+                self.cache[key] = ""
+            else:
+                digest = hashlib.sha256()
+                with open(path, "rb") as file:
+                    for block in iter(lambda: file.read(1 << 20), b""):
+                        digest.update(block)
+                self.cache[key] = digest.hexdigest()
+        return self.cache[key]
+
+
+def Fingerprint(*parts) -> str:
+    """Combine json serializable parts into a single fingerprint.
+
+    Parameters
+    ----------
+    *parts
+        The parts of the fingerprint, the order matters.
+
+    Returns
+    -------
+    str
+        The hexadecimal sha256 of the parts.
+
+    Examples
+    --------
+    >>> Fingerprint({"b": 1, "a": 2}) == Fingerprint({"a": 2, "b": 1})
+    True
+    """
+    return hashlib.sha256(
+        json.dumps(parts, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def GetLibraryVersion(libraryName: str, libraryConfig: dict) -> str:
+    """Getter for the version of a library.
+
+    The `version` key of the target config file is used if it exist, otherwise the version of the
+    installed python distribution with the same name.
+
+    Parameters
+    ----------
+    libraryName : str
+        The name of the library.
+    libraryConfig : dict
+        The config of the target.
+
+    Returns
+    -------
+    str
+        The version of the library, an empty string if it is unknown.
+    """
+    if "version" in libraryConfig:
+        return libraryConfig["version"]
+    try:
+        return metadata.version(libraryName)
+    except metadata.PackageNotFoundError:
+        logger.debug(f"No version found for {libraryName}")
+        return ""
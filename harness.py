@@ -0,0 +1,280 @@
+"""Docstring for harness.py module.
+
+This module contains the timing harness used to measure a library script without the cost of the
+interpreter startup. It is called by the benchmark as::
+
+    python harness.py <script> <argument>
+
+If the script defines a function ``run(argument)``, the script is imported once (the imports at the top
+of the script are not measured), the optional function ``setup(argument)`` is called and only the call
+to ``run`` is timed. Otherwise the whole body of the script is timed as if it was the main module, the
+imports and the setup of the script are then part of the measure: such a runtime is not comparable with
+the runtime of a script timed around ``run``, the answer of the harness is flagged with
+``"whole_script": true`` and the benchmark logs a warning.
+
+The result is written on the last line of the standard output, after `HARNESS_MARKER`, as a json
+object ``{"samples": [<nanoseconds>, ...]}``. As for a plain script, the exit code is 1 if an error occured
+and 2 if the library doesn't support the task.
+
+The harness can also be kept alive as a warm worker with ``python harness.py --serve``. It then read
+one json job ``{"script": <path>, "argument": <argument>}`` per line on its standard input and answer
+each of them with a line ``{"samples": [<nanoseconds>], "status": <exit code>, "resources": {...}}`` after `HARNESS_MARKER`.
+The scripts and the libraries they import are only loaded once by the worker. The folder of a script is
+only on the path during its job and the modules imported from this folder are forgotten after it, so
+two tasks with a helper module of the same name don't share it.
+
+The process of a warm worker is not started for each job, so the worker measures the resources of each
+job itself with `resource.getrusage` and adds them to its answer as ``"resources"`` (the keys of
+`resource_usage.RESOURCE_METRICS`). The CPU times, the page faults and the context switches are the
+differences of the counters around the job. The kernel only keeps the peak of the resident memory over
+the life of a process, ``max_rss`` is then the peak of the worker up to the end of the job, the memory
+of its previous jobs included. Without the `resource` module (Windows) the answer has no resources and
+the samples of the warm workers are stored as unmeasured.
+
+"""
+
+import ast
+import contextlib
+import importlib.util
+import json
+import runpy
+import sys
+import time
+import traceback
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:
+    # Windows, the resources of the warm jobs are not measured
+    resource = None
+
+HARNESS_MARKER = "@benchsite-harness "
+HARNESS_PATH = Path(__file__).absolute()
+
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS, the harness doesn't import resource_usage
+# since the worker must not load numpy and psutil next to the library it measures
+MAXRSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def LoadScript(scriptPath: str):
+    """Import the script as a module without running its main section.
+
+    Parameters
+    ----------
+    scriptPath : str
+        The path to the script.
+
+    Returns
+    -------
+    module
+        The module of the script.
+    """
+    scriptPath = Path(scriptPath)
+    spec = importlib.util.spec_from_file_location(scriptPath.stem, scriptPath)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def DefinesRunFunction(scriptPath: str) -> bool:
+    """Check, without running it, if the script defines a function ``run`` at the top level."""
+    tree = ast.parse(Path(scriptPath).read_text())
+    return any(
+        isinstance(node, ast.FunctionDef) and node.name == "run" for node in tree.body
+    )
+
+
+@contextlib.contextmanager
+def ScriptEnvironment(scriptPath: str):
+    """Isolate the job of a script on the warm worker.
+
+    The path is restored after the job and the modules imported from the folder of the script are
+    removed from `sys.modules`. The loaded script keeps its own reference to them, the libraries
+    imported from elsewhere stay loaded for the next jobs.
+
+    Parameters
+    ----------
+    scriptPath : str
+        The path to the script.
+    """
+    folder = Path(scriptPath).absolute().parent
+    savedPath = list(sys.path)
+    try:
+        yield
+    finally:
+        sys.path[:] = savedPath
+        for name, module in list(sys.modules.items()):
+            moduleFile = getattr(module, "__file__", None)
+            if moduleFile is not None and folder in Path(moduleFile).absolute().parents:
+                del sys.modules[name]
+
+
+def MeasureScript(
+    scriptPath: str, argument: str, loadedScripts: dict = None, answer: dict = None
+) -> int:
+    """Time the measured body of a script.
+
+    The measured body is the call to ``run`` if the script defines it, otherwise the whole script
+    including its imports and module setup (`answer` is then flagged with ``whole_script``).
+
+    Parameters
+    ----------
+    scriptPath : str
+        The path to the script.
+    argument : str
+        The argument given to the script.
+    loadedScripts : dict, optional
+        The modules of the scripts already imported, indexed by their path. Used by the warm worker
+        to import each script only once.
+    answer : dict, optional
+        The answer of the harness, ``whole_script`` is set to True if the whole script is timed.
+
+    Returns
+    -------
+    int
+        The time in nanoseconds spent in the measured body.
+    """
+    scriptPath = str(Path(scriptPath).absolute())
+    # the script see the same environment as if it was run directly
+    sys.argv = [scriptPath, argument]
+    if str(Path(scriptPath).parent) not in sys.path:
+        sys.path.insert(0, str(Path(scriptPath).parent))
+
+    if not DefinesRunFunction(scriptPath):
+        if answer is not None:
+            answer["whole_script"] = True
+        start = time.perf_counter_ns()
+        try:
+            runpy.run_path(scriptPath, run_name="__main__")
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                raise
+        return time.perf_counter_ns() - start
+
+    if loadedScripts is None:
+        module = LoadScript(scriptPath)
+    elif scriptPath not in loadedScripts:
+        module = loadedScripts[scriptPath] = LoadScript(scriptPath)
+    else:
+        module = loadedScripts[scriptPath]
+    run = module.run
+    setup = getattr(module, "setup", None)
+    if setup is not None:
+        setup(argument)
+
+    start = time.perf_counter_ns()
+    run(argument)
+    return time.perf_counter_ns() - start
+
+
+def ParseHarnessAnswer(output: str) -> dict:
+    """Retrieve the answer written by the harness in its standard output.
+
+    Parameters
+    ----------
+    output : str
+        The standard output of the harness.
+
+    Returns
+    -------
+    dict
+        The answer ``{"samples": [<nanoseconds>, ...]}`` (with ``whole_script`` if the whole script was
+        timed), an empty dict if the harness didn't write any.
+    """
+    for line in reversed(output.splitlines()):
+        if line.startswith(HARNESS_MARKER):
+            return json.loads(line[len(HARNESS_MARKER) :])
+    return {}
+
+
+def main(scriptPath: str, argument: str) -> int:
+    answer = {}
+    try:
+        answer["samples"] = [MeasureScript(scriptPath, argument, answer=answer)]
+    except SystemExit as e:
+        # the script can exit with the code 2 if the library doesn't support the task
+        if e.code in (None, 0):
+            print("The script exited before the end of the measure", file=sys.stderr)
+            return 1
+        return e.code if isinstance(e.code, int) else 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+    print(f"\n{HARNESS_MARKER}{json.dumps(answer)}", flush=True)
+    return 0
+
+
+def ReadUsage() -> list or None:
+    """The rusage of the worker and of the children it waited for, None without the `resource` module."""
+    if resource is None:
+        return None
+    return [
+        resource.getrusage(resource.RUSAGE_SELF),
+        resource.getrusage(resource.RUSAGE_CHILDREN),
+    ]
+
+
+def UsageDelta(before: list, after: list) -> dict:
+    """The resources used between two `ReadUsage`, `max_rss` is the peak of the worker (see the module)."""
+    usage = {
+        "user_time": 0.0,
+        "system_time": 0.0,
+        "max_rss": 0,
+        "major_faults": 0,
+        "minor_faults": 0,
+        "voluntary_switches": 0,
+        "involuntary_switches": 0,
+    }
+    for start, end in zip(before, after):
+        usage["user_time"] += end.ru_utime - start.ru_utime
+        usage["system_time"] += end.ru_stime - start.ru_stime
+        usage["max_rss"] = max(usage["max_rss"], end.ru_maxrss * MAXRSS_UNIT)
+        usage["major_faults"] += end.ru_majflt - start.ru_majflt
+        usage["minor_faults"] += end.ru_minflt - start.ru_minflt
+        usage["voluntary_switches"] += end.ru_nvcsw - start.ru_nvcsw
+        usage["involuntary_switches"] += end.ru_nivcsw - start.ru_nivcsw
+    return usage
+
+
+def Serve() -> int:
+    """Run the jobs received on the standard input until it is closed."""
+    protocolOutput = sys.stdout
+    loadedScripts = {}
+    for line in sys.stdin:
+        if line.strip() == "":
+            continue
+        job = json.loads(line)
+        answer = {"samples": [], "status": 0}
+        usage = ReadUsage()
+        # the output of the scripts must not be mixed with the answers
+        with ScriptEnvironment(job["script"]), contextlib.redirect_stdout(sys.stderr):
+            try:
+                answer["samples"].append(
+                    MeasureScript(
+                        job["script"], job["argument"], loadedScripts, answer=answer
+                    )
+                )
+            except SystemExit as e:
+                answer["status"] = e.code if isinstance(e.code, int) and e.code else 1
+            except Exception:
+                answer["status"] = 1
+                answer["error"] = traceback.format_exc()
+        if usage is not None:
+            answer["resources"] = UsageDelta(usage, ReadUsage())
+        protocolOutput.write(f"{HARNESS_MARKER}{json.dumps(answer)}\n")
+        protocolOutput.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2 and sys.argv[1] == "--serve":
+        sys.exit(Serve())
+    if len(sys.argv) != 3:
+        print(
+            "usage: python harness.py <script> <argument> | python harness.py --serve",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    sys.exit(main(sys.argv[1], sys.argv[2]))
@@ -24,16 +24,24 @@ def FileReaderJson(filename: str) -> None:
         A tuple with a list of library and a list of task.
 
     """
-    data = readJsonFile(filename)
+    CreateObjects(readJsonFile(filename))
 
+
+def CreateObjects(data: dict) -> None:
+    """Create the python object from the results.
+
+    Parameters
+    ----------
+    data : dict
+        The results, with the same structure as the json file written by the benchmark.
+
+    """
     for libName, libInfo in data.items():
         library = Library(libName)
         for taskName, taskInfo in libInfo.items():
-            task = (
-                Task(taskName, taskInfo["theme"])
-                if taskName not in Task.GetAllTaskName()
-                else Task.GetTaskByName(taskName)
-            )
+            task = Task.GetTaskByName(taskName)
+            if task is None:
+                task = Task(taskName, taskInfo["theme"])
             logger.info(f"Task {taskName} with {libName} library")
             logger.debug(f"arguments: {len(taskInfo['results'].keys())}")
 
@@ -51,11 +59,22 @@ def FileReaderJson(filename: str) -> None:
             ]
             if evaluation[0] is None:
                 evaluation = None
+            resources = [
+                taskInfo["results"].get(argument).get("resources")
+                for argument in task.arguments_label
+            ]
+            if all(usages is None for usages in resources):
+                resources = None
+            timeline = [
+                taskInfo["results"].get(argument).get("timeline")
+                for argument in task.arguments_label
+            ]
+            if all(timelines is None for timelines in timeline):
+                timeline = None
 
-            task.runtime[libName] = runtime
-            task.evaluation[libName] = evaluation
+            task.SetResults(libName, runtime, evaluation, resources, timeline)
 
-            library.tasks.append(task)
+            library.AddTask(task)
 
 
 def TokenizeArguments(arguments: list[str]) -> list[int]:
@@ -72,6 +91,7 @@ def readJsonFile(filename: str):
 
     return data
 
+
 def count_test():
     # we tak a task at random
     task = Task.allTasks[0]
@@ -19,18 +19,45 @@ class Library:
     name : str
         The name of the library.
     tasks : list of Task
-        The list of the tasks of the library.
+        The list of the tasks of the library, the tasks must be added with `AddTask`.
+    tasksByName : dict of str and Task
+        Index of the tasks of the library by name.
     allLibrary : list of Library
         Class Attribute ! The list of all the libraries created.
+    libraryByName : dict of str and Library
+        Class Attribute ! Index of the libraries created by name.
+    librariesByTaskName : dict of str and list of Library
+        Class Attribute ! Index of the libraries by the name of their tasks.
 
     """
 
     name: str
     tasks: list[Task] = field(default_factory=list)
+    tasksByName: dict[str, Task] = field(default_factory=dict, repr=False)
     allLibrary: ClassVar[list["Library"]] = []
+    libraryByName: ClassVar[dict[str, "Library"]] = {}
+    librariesByTaskName: ClassVar[dict[str, list["Library"]]] = {}
 
     def __post_init__(self) -> None:
         self.allLibrary.append(self)
+        Library.libraryByName.setdefault(self.name, self)
+        for task in self.tasks:
+            self.IndexTask(task)
+
+    def AddTask(self, task: Task) -> None:
+        """Add a task to the library and to the indexes.
+
+        Parameters
+        ----------
+        task : Task
+            The task to add.
+        """
+        self.tasks.append(task)
+        self.IndexTask(task)
+
+    def IndexTask(self, task: Task) -> None:
+        self.tasksByName.setdefault(task.name, task)
+        Library.librariesByTaskName.setdefault(task.name, []).append(self)
 
     def __repr__(self) -> str:
         return f"Library({self.name})"
@@ -71,12 +98,7 @@ class Library:
         list of Library
             The list of all the libraries that contains a task with the name taskName.
         """
-        libraryList = []
-        for library in cls.GetAllLibrary():
-            libraryList.extend(
-                [library for task in library.tasks if task.name == taskName]
-            )
-        return libraryList
+        return list(cls.librariesByTaskName.get(taskName, []))
 
     @classmethod
     def GetLibraryByName(cls, libraryName: str) -> "Library":
@@ -92,10 +114,7 @@ class Library:
         Library
             The library with the name libraryName.
         """
-        for library in cls.allLibrary:
-            if library.name == libraryName:
-                return library
-        return None
+        return cls.libraryByName.get(libraryName)
 
     def GetTaskByName(self, taskName: str) -> Task:
         """Getter for the task with the name taskName in the library.
@@ -110,10 +129,7 @@ class Library:
         Task
             The task with the name taskName in the library.
         """
-        for task in self.tasks:
-            if task.name == taskName:
-                return task
-        return None
+        return self.tasksByName.get(taskName)
 
     @classmethod
     def GetTaskByLibraryNameAndTaskName(cls, libraryName: str, taskName: str) -> "Task":
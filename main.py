@@ -1,9 +1,10 @@
 import argparse
+import filecmp
 import os
 import shutil
-import subprocess
 from pathlib import Path
 
+from asset_pipeline import CompressFile
 from benchmark import Benchmark
 from benchsite import BenchSite
 from logger import logger
@@ -17,7 +18,7 @@ def delete_directory(dir_path: str):
     ---------
     dir_path : str
         The path to the directory to clear.
-    
+
     """
     logger.info(f"Deleting directory: {dir_path}")
     path = Path(dir_path)
@@ -46,19 +47,93 @@ def delete_file(file_path):
         logger.warning(f"File not found: {path}")
 
 
-def start_benchmark(structure_test_path: str, resultFilename: str = "results.json"):
+def sync_directory(source_path: str, destination_path: str) -> list[Path]:
+    """
+    Makes the destination directory a copy of the source directory by only copying the files which
+    changed and removing the files which are no longer in the source directory.
+
+    Arguments
+    ---------
+    source_path : str
+        The path to the directory to copy.
+    destination_path : str
+        The path to the copy.
+
+    Returns
+    -------
+    list[Path]
+        The files of the destination directory which were copied or removed.
+    """
+    source = Path(source_path)
+    destination = Path(destination_path)
+    source_files = {
+        path.relative_to(source) for path in source.rglob("*") if path.is_file()
+    }
+    changed_files = []
+    for relative_path in sorted(source_files):
+        destination_file = destination / relative_path
+        if destination_file.is_file() and filecmp.cmp(
+            source / relative_path, destination_file, shallow=False
+        ):
+            continue
+        destination_file.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(source / relative_path, destination_file)
+        changed_files.append(destination_file)
+    if destination.exists():
+        for path in destination.rglob("*"):
+            if path.is_file() and path.relative_to(destination) not in source_files:
+                path.unlink()
+                changed_files.append(path)
+    logger.info(f"{len(changed_files)} file(s) changed in {destination}")
+    return changed_files
+
+
+def start_benchmark(
+    structure_test_path: str,
+    resultFilename: str = "results.json",
+    nbWorkers: int = 1,
+    coresPerJob: int = None,
+    incremental: bool = False,
+    resultStore: str = None,
+    resume: bool = False,
+):
     """
     Starts the benchmark script with the given parameters.
 
     Arguments
     ---------
     structure_test_path : str
+    resultFilename : str
+    nbWorkers : int
+        The number of jobs running at the same time.
+    coresPerJob : int
+        The number of cores each job is pinned to.
+    incremental : bool
+        If True, the (library, task, argument) whose inputs have not changed are not run again.
+    resultStore : str
+        The path to the result store where the samples are appended during the benchmark.
+        If the store is not empty, the previous results are read from it instead of the json file.
+    resume : bool
+        If True, the benchmark continue from the checkpoint of an interrupted benchmark if it exists.
+        The checkpoint is written next to the result file and removed once the results are saved.
 
     """
     baseFilename = resultFilename if Path(resultFilename).exists() else None
-    benchmark = Benchmark(pathToInfrastructure=structure_test_path, baseResult=baseFilename)
+    if resultStore is not None and Path(resultStore).exists():
+        baseFilename = None
+    benchmark = Benchmark(
+        pathToInfrastructure=structure_test_path,
+        baseResult=baseFilename,
+        nbWorkers=nbWorkers,
+        coresPerJob=coresPerJob,
+        incremental=incremental,
+        resultStore=resultStore,
+        checkpointFilename=f"{resultFilename}.checkpoint",
+        resume=resume,
+    )
     benchmark.StartAllProcedure()
     benchmark.ConvertResultToJson(outputFileName=resultFilename)
+    benchmark.RemoveCheckpoint()
 
 
 def repository_is_local(repository, **kargs):
@@ -74,28 +149,19 @@ def repository_is_github(repository, **kargs):
         logger.debug(f"Creating the local repository {path}")
         path.mkdir()
     else:
-        # we check if a python file has changed since the last pull
-        if has_python_file_changed(path.absolute().__str__()):
-            logger.info(f"Python file has changed since the last pull")
-            # we clear the local repository and the results file needed for the benchmark
-            # as the old test are now deprecated we delete the old results
-            delete_directory(path.absolute().__str__())
-            delete_file(kargs["resultFilename"])
-
-        else:
-            logger.info(f"No python file has changed since the last pull")
-            # we merge the remote repository with the local repository
-            command = f"git -C {path} pull"
-            try:
-                os.system(command)
-            except:
-                logger.error(
-                    f"Error when merging the remote repository with the local repository {repository}"
-                )
-                raise Exception(
-                    f"Error when merging the remote repository with the local repository {repository}"
-                )
-            return path
+        # the results of the tasks whose inputs have changed are invalidated by the benchmark
+        # (see Benchmark.InvalidateChangedCells), we only need to merge the remote repository
+        command = f"git -C {path} pull"
+        try:
+            os.system(command)
+        except:
+            logger.error(
+                f"Error when merging the remote repository with the local repository {repository}"
+            )
+            raise Exception(
+                f"Error when merging the remote repository with the local repository {repository}"
+            )
+        return path
 
     # we clone the repository in the local repository
     command = f"git clone {repository} {path}"
@@ -108,33 +174,7 @@ def repository_is_github(repository, **kargs):
     return path
 
 
-def has_python_file_changed(repository_name: str):
-    # we memorize the current directory
-    current_dir = os.getcwd()
-    # we check if a python file has changed since the last pull
-    # we go to the repository
-    os.chdir(repository_name)
-    # we get the last commit
-    fetch = subprocess.Popen(["git", "fetch"], stdout=subprocess.PIPE)
-    fetch.wait()
-    # we get the last commit of the remote repository
-    last_commit = subprocess.check_output(["git", "rev-parse", "FETCH_HEAD"]).strip()
-    # we get the last commit of the local repository
-    local_last_commit = subprocess.check_output(["git", "rev-parse", "HEAD"]).strip()
-    # we compare the two commits
-    # compare the SHAs to see if the Python file has changed
-    files_changed = subprocess.check_output(
-        ["git", "diff", "--name-only", last_commit, local_last_commit], encoding="utf-8"
-    ).splitlines()
-    logger.debug(f"Files changed : {files_changed}")
-    # we go back to the current directory
-    os.chdir(current_dir)
-    for file in files_changed:
-        if file.endswith(".py"):
-            return True
-    return False
-
-def enough_test_to_publish(resultFilename: str,min_test_required: int = 10):
+def enough_test_to_publish(resultFilename: str, min_test_required: int = 10):
     """
     Checks if there are enough tests to publish the results.
 
@@ -152,10 +192,11 @@ def enough_test_to_publish(resultFilename: str,min_test_required: int = 10):
     # we check if there are enough tests
     return count_test() % min_test_required == 0
 
+
 def count_test():
     import json_to_python_object as jtpo
+
     return jtpo.count_test()
-    
 
 
 if __name__ == "__main__":
@@ -225,6 +266,45 @@ if __name__ == "__main__":
         action=argparse.BooleanOptionalAction,
     )
 
+    parser.add_argument(
+        "-W",
+        "--workers",
+        type=int,
+        help="The number of benchmark jobs running at the same time, each job is pinned to its own set of cores",
+        default=1,
+    )
+
+    parser.add_argument(
+        "--cores_per_job",
+        type=int,
+        help="The number of cores each benchmark job is pinned to. By default the cores are evenly shared between the workers",
+        default=None,
+    )
+
+    parser.add_argument(
+        "-I",
+        "--incremental",
+        help="True if the user want to only run the tasks whose inputs (scripts, data, config, library version) have changed since the last benchmark, False otherwise",
+        default=False,
+        action=argparse.BooleanOptionalAction,
+    )
+
+    parser.add_argument(
+        "-S",
+        "--store",
+        type=str,
+        help="The path of a result store (.db) where the samples are appended during the benchmark. The site is then generated from the store and results.json is only an export",
+        default=None,
+    )
+
+    parser.add_argument(
+        "-R",
+        "--resume",
+        help="True if the user want to continue an interrupted benchmark from its last checkpoint instead of starting over, False otherwise",
+        default=False,
+        action=argparse.BooleanOptionalAction,
+    )
+
     args = parser.parse_args()
     logger.info(f"Arguments: {args}")
     default_repository_name = "repository"
@@ -252,15 +332,22 @@ if __name__ == "__main__":
 
     if args.benchmark:
         start_benchmark(
-            working_directory.absolute().__str__(), resultFilename.absolute().__str__(),
+            working_directory.absolute().__str__(),
+            resultFilename.absolute().__str__(),
+            nbWorkers=args.workers,
+            coresPerJob=args.cores_per_job,
+            incremental=args.incremental,
+            resultStore=args.store,
+            resume=args.resume,
         )
 
     # The second step is to create the HTML page from the test results. This HTML page will be
     # created in the output folder. The output folder is the folder where the user want to save the
     # HTML page. The output folder is the same as the input folder if the user didn't specify an output folder.
 
+    siteInput = Path(args.store) if args.store is not None else resultFilename
     benchsite = BenchSite(
-        inputFilename=resultFilename.absolute().__str__(), outputPath=args.output_folder
+        inputFilename=siteInput.absolute().__str__(), outputPath=args.output_folder
     )
     benchsite.GenerateStaticSite()
 
@@ -269,27 +356,29 @@ if __name__ == "__main__":
         resultFilename.absolute(),
         os.path.join(args.output_folder, resultFilename),
     )
-    
+    CompressFile(os.path.join(args.output_folder, resultFilename))
+
     # The third step is to deploy the HTML page on a server. The server is a github page. The user
     # must have a github account and a github repository. The user must have a github token to deploy
     # the HTML page on the github page. The user must specify the name of the github repository where
     # the HTML page will be deployed.
 
     if args.publish and args.access_folder == "github":
-        if not args.force and not enough_test_to_publish(resultFilename.absolute().__str__()):
+        if not args.force and not enough_test_to_publish(
+            resultFilename.absolute().__str__()
+        ):
             logger.info("Not enough tests to publish the results")
             exit(0)
         logger.info("Publishing the HTML page on the github page")
-        # before copying the output folder in the repository, we need to check if there is not already
-        # copy the output folder in the repository
-        if os.path.exists(os.path.join(working_directory.absolute(), args.output_folder)):
-            logger.info(
-                f"Removing the folder {os.path.join(working_directory.absolute(), args.output_folder)}"
-            )
-            shutil.rmtree(os.path.join(working_directory.absolute(), args.output_folder))
-        shutil.copytree(
-            args.output_folder, os.path.join(working_directory.absolute(), args.output_folder)
+        # only the files of the output folder which changed since the last publication are copied
+        # (or removed) in the repository, the unchanged pages are left untouched
+        changed_files = sync_directory(
+            args.output_folder,
+            os.path.join(working_directory.absolute(), args.output_folder),
         )
+        if len(changed_files) == 0:
+            logger.info("The HTML page has not changed, nothing to publish")
+            exit(0)
         os.chdir(working_directory.absolute())
         os.system(f"git add {args.output_folder}")
         os.system(f'git commit -m "Updating the HTML page"')
@@ -0,0 +1,43 @@
+// decoder of the columnar chart payload written by BenchSite.ColumnarChartData
+
+const typedArrays = {"float32": Float32Array, "uint8": Uint8Array, "uint16": Uint16Array, "uint32": Uint32Array};
+
+// a column is the base64 of a little endian typed array
+export function DecodeColumn(column) {
+    let binary = atob(column.data);
+    let bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) {
+        bytes[i] = binary.charCodeAt(i);
+    }
+    return new typedArrays[column.dtype](bytes.buffer);
+}
+
+// give back one object per point {arguments, runTime, libraryName, std, distribution} as used by the charts,
+// a value which is not valid (NaN) is 'error'
+export function DecodeChartData(payload) {
+    let libraryIndex = DecodeColumn(payload.libraryIndex);
+    let argumentIndex = DecodeColumn(payload.argumentIndex);
+    let columns = {};
+    for (let name of ["runTime", "std", "min", "p10", "p50", "p90", "p99", "max"]) {
+        columns[name] = DecodeColumn(payload[name]);
+    }
+    let histogram = DecodeColumn(payload.histogram);
+    let bins = payload.histogramBins;
+    let valueOrError = value => isNaN(value) ? 'error' : value;
+
+    return Array.from(libraryIndex, (library, i) => ({
+        arguments: payload.arguments[argumentIndex[i]],
+        runTime: valueOrError(columns.runTime[i]),
+        libraryName: payload.libraries[library],
+        std: valueOrError(columns.std[i]),
+        distribution: isNaN(columns.p50[i]) ? 'error' : {
+            min: columns.min[i],
+            p10: columns.p10[i],
+            p50: columns.p50[i],
+            p90: columns.p90[i],
+            p99: columns.p99[i],
+            max: columns.max[i],
+            histogram: Array.from(histogram.subarray(i * bins, (i + 1) * bins)),
+        },
+    }));
+}
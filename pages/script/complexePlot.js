@@ -3,6 +3,8 @@ export function ComplexeLineChart(data, {
     categories = ([, categories]) => categories,  // given d in data, returns the (temporal) y-value
     inerClass = ([, , inerClass]) => inerClass, // given d in data, returns the (categorical) z-value
     std = ([, , , std]) => std, // given d in data, returns the (categorical) z-value
+    distribution = () => undefined, // given d in data, returns the percentiles {min, p10, p50, p90, p99, max} of the samples
+    band = "std", // "std" for mean ± std, "percentile" for the p10 to p90 band of the samples
 
     title = "", // title of the chart
     titleFontSize = 20, // font size of the title
@@ -65,6 +67,12 @@ export function ComplexeLineChart(data, {
     const Y = d3.map(data, values);
     const Z = d3.map(data, inerClass);
     const W = d3.map(data, std);
+    const P = d3.map(data, distribution);
+    // the band around the line, the percentiles are only used if they were computed for the point. The line
+    // is the mean, it can be out of the p10 to p90 range with skewed samples so the band is extended to it
+    const hasPercentile = i => band == "percentile" && typeof P[i] === "object" && P[i] !== null;
+    const bandLower = i => hasPercentile(i) ? Math.min(P[i].p10, Y[i]) : Y[i] - W[i];
+    const bandUpper = i => hasPercentile(i) ? Math.max(P[i].p90, Y[i]) : Y[i] + W[i];
     const O = d3.map(data, d => d);
     if (defined === undefined) defined = (d, i) => !isNaN(X[i]) && !isNaN(Y[i]);
     const D = d3.map(data, defined);
@@ -126,8 +134,8 @@ export function ComplexeLineChart(data, {
         .defined(i => D[i])
         .curve(curve)
         .x(i => xScale(X[i]))
-        .y0(i => yScale(Y[i] - W[i]))
-        .y1(i => yScale(Y[i] + W[i]));
+        .y0(i => yScale(bandLower(i)))
+        .y1(i => yScale(bandUpper(i)));
 
 
     // Construct a new SVG. this is the main container for the chart.
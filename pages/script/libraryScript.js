@@ -27,6 +27,9 @@ let chart;
 // let treatedData = ResultTreatement(data[libraryName],libraryName);
 // console.log(treatedData);
 
+// the data of the page is a separate json file, cached by the browser as long as its content doesn't change
+const importedData = await fetch(importedDataUrl).then(response => response.json());
+
 console.log(importedData);
 
 let AllTaskName = Object.keys(importedData);
@@ -0,0 +1,95 @@
+// horizontal bars of the geometric mean speedup relative to the reference library written by
+// BenchSite.SpeedupComponent, on a log scale centered on 1 (the reference) with the confidence interval.
+// The libraries compared on less arguments or tasks than the reference (count < total) are not comparable
+// with the others, their bar is lighter and the number of elements compared is written next to it
+export function SpeedupChart(data, {
+    reference = "", // name of the reference library
+    width = 640, // outer width, in pixels
+    barHeight = 22, // height of a bar, in pixels
+    margin = { top: 30, right: 90, bottom: 40, left: 160 },
+    labelFontSize = 12, // font size of axis labels
+    faster = "#4ac16d", // color of the bars faster than the reference
+    slower = "#440154", // color of the bars slower than the reference
+} = {}) {
+    // the elements without speedup (failed or not run) are not drawn
+    data = data.filter(d => d.speedup != null).sort((a, b) => b.speedup - a.speedup);
+    const height = margin.top + margin.bottom + barHeight * data.length;
+    const isPartial = d => d.count < d.total;
+    const label = d => `×${d3.format(".3~g")(d.speedup)}` + (isPartial(d) ? ` (${d.count}/${d.total})` : "");
+
+    // the domain is symmetric around 1 so a speedup and a slowdown of the same factor have the same length
+    const extent = d3.max(data.flatMap(d => [d.speedup, d.low, d.high]).filter(v => v != null && v > 0),
+        v => Math.abs(Math.log10(v))) || 1;
+    const xScale = d3.scaleLog([10 ** -extent, 10 ** extent], [margin.left, width - margin.right]).nice();
+    const yScale = d3.scaleBand(data.map(d => d.name), [margin.top, height - margin.bottom]).padding(0.2);
+
+    const svg = d3.create("svg")
+        .attr("width", width)
+        .attr("height", height)
+        .attr("viewBox", [0, 0, width, height])
+        .attr("style", "max-width: 100%; height: auto;");
+
+    svg.append("g")
+        .attr("transform", `translate(0,${height - margin.bottom})`)
+        .call(d3.axisBottom(xScale).ticks(5, "~g"))
+        .call(g => g.append("text")
+            .attr("x", width - margin.right)
+            .attr("y", 32)
+            .attr("fill", "currentColor")
+            .attr("text-anchor", "end")
+            .attr("font-size", labelFontSize)
+            .text(`Speedup relative to ${reference} →`));
+
+    svg.append("g")
+        .attr("transform", `translate(${margin.left},0)`)
+        .call(d3.axisLeft(yScale).tickSize(0))
+        .call(g => g.select(".domain").remove())
+        .selectAll("text")
+        .attr("font-size", labelFontSize);
+
+    svg.append("g")
+        .selectAll("rect")
+        .data(data)
+        .join("rect")
+        .attr("x", d => Math.min(xScale(1), xScale(d.speedup)))
+        .attr("y", d => yScale(d.name))
+        .attr("width", d => Math.abs(xScale(d.speedup) - xScale(1)))
+        .attr("height", yScale.bandwidth())
+        .attr("fill", d => d.speedup >= 1 ? faster : slower)
+        .attr("fill-opacity", d => isPartial(d) ? 0.4 : 1)
+        .append("title")
+        .text(d => `${d.name} : ${label(d)} [${d3.format(".3~g")(d.low)}, ${d3.format(".3~g")(d.high)}]`);
+
+    // the confidence intervals
+    svg.append("g")
+        .attr("stroke", "currentColor")
+        .selectAll("line")
+        .data(data.filter(d => d.low != null && d.high != null))
+        .join("line")
+        .attr("x1", d => xScale(d.low))
+        .attr("x2", d => xScale(d.high))
+        .attr("y1", d => yScale(d.name) + yScale.bandwidth() / 2)
+        .attr("y2", d => yScale(d.name) + yScale.bandwidth() / 2);
+
+    svg.append("text")
+        .attr("x", width - margin.right + 5)
+        .attr("font-size", labelFontSize)
+        .attr("dominant-baseline", "central")
+        .selectAll("tspan")
+        .data(data)
+        .join("tspan")
+        .attr("x", width - margin.right + 5)
+        .attr("y", d => yScale(d.name) + yScale.bandwidth() / 2)
+        .text(label);
+
+    // the reference
+    svg.append("line")
+        .attr("x1", xScale(1))
+        .attr("x2", xScale(1))
+        .attr("y1", margin.top - 5)
+        .attr("y2", height - margin.bottom)
+        .attr("stroke", "currentColor")
+        .attr("stroke-dasharray", "4 2");
+
+    return svg.node();
+}
@@ -3,6 +3,11 @@ import {Histogram} from './histogram.js';
 import {GroupedBarChart} from './groupedBarChart.js';
 import {ViolonsChart} from './violonsChart.js';
 import {ComplexeLineChart} from './complexePlot.js';
+import {DecodeChartData} from './columnarData.js';
+import {TimelineChart} from './timelineChart.js';
+
+// the data of the page is a separate json file, cached by the browser as long as its content doesn't change
+const importedData = await fetch(importedDataUrl).then(response => response.json());
 
 function dataSpread(data){
     let min = Math.min.apply(Math, data)
@@ -47,7 +52,7 @@ let allLibraries;
 
 for(let element in importedData){
     let chart;
-    let chartdata = importedData[element].data;
+    let chartdata = DecodeChartData(importedData[element].data);
     labelList.push(importedData[element].label);
     
     console.log(chartdata);
@@ -115,6 +120,8 @@ for(let element in importedData){
             categories: d => d.arguments,
             inerClass: d => d.libraryName,
             std: d => d.std,
+            distribution: d => d.distribution,
+            band: importedData[element].band,
 
             width: width,
             height: height,
@@ -183,6 +190,12 @@ dropdown.onchange = function(){
     }
 }
 
+// the timeline of memory and I/O of the runs, only if it was sampled
+if (timelineDataUrl != null){
+    const timelineData = await fetch(timelineDataUrl).then(response => response.json());
+    htmlComponent.appendChild(TimelineChart(timelineData, {width: width}));
+}
+
 // we're adding buttons to choose the library's code we want to display
 let codeSelector = document.getElementById("codeSelector");
 codeSelector.id = "codeSelector";
@@ -1,5 +1,8 @@
 import { HeatMap } from "./heatMapChart.js";
 
+// the data of the page is a separate json file, cached by the browser as long as its content doesn't change
+const importedData = await fetch(importedDataUrl).then(response => response.json());
+
 // let themeName = document.getElementById('entry-title').innerHTML;
 
 let width = window.innerWidth * 1;
@@ -0,0 +1,88 @@
+import {LineChart} from './dynamicPlot.js';
+import {DecodeColumn} from './columnarData.js';
+
+// the series that can be displayed, the values are in bytes
+const timelineSeries = {"rss": "Resident memory (MB)", "read": "Read (MB)", "write": "Written (MB)"};
+
+// small line chart of the memory and I/O timeline of the runs written by BenchSite.TimelineChartData,
+// one line per library for the argument chosen in the selector
+export function TimelineChart(payload, {
+    width = 640, // outer width, in pixels
+    height = 250, // outer height, in pixels
+    labelFontSize = 12, // font size of axis labels
+    titleFontSize = 14, // font size of the title
+    tooltipFontSize = 12, // font size of tooltip text
+} = {}) {
+    let points = [];
+    for (let timeline of payload.timelines) {
+        let time = DecodeColumn(timeline.time);
+        let series = {};
+        for (let name in timelineSeries) {
+            series[name] = DecodeColumn(timeline[name]);
+        }
+        for (let i = 0; i < time.length; i++) {
+            let point = {
+                time: time[i],
+                libraryName: payload.libraries[timeline.library],
+                argument: payload.arguments[timeline.argument],
+            };
+            for (let name in timelineSeries) {
+                point[name] = series[name][i] / 1024 ** 2;
+            }
+            points.push(point);
+        }
+    }
+
+    let container = document.createElement("div");
+    container.id = "timeline";
+
+    let argumentSelector = document.createElement("select");
+    argumentSelector.title = "timelineArgumentSelector";
+    for (let argument of [...new Set(points.map(d => d.argument))]) {
+        let option = document.createElement("option");
+        option.value = argument;
+        option.text = argument;
+        argumentSelector.appendChild(option);
+    }
+
+    let seriesSelector = document.createElement("select");
+    seriesSelector.title = "timelineSeriesSelector";
+    for (let name in timelineSeries) {
+        let option = document.createElement("option");
+        option.value = name;
+        option.text = timelineSeries[name];
+        seriesSelector.appendChild(option);
+    }
+
+    container.appendChild(argumentSelector);
+    container.appendChild(seriesSelector);
+    let chart = document.createElement("div");
+    container.appendChild(chart);
+
+    function draw() {
+        let data = points.filter(d => String(d.argument) == argumentSelector.value);
+        let series = seriesSelector.value;
+        chart.replaceChildren(LineChart(data, {
+            values: d => d[series],
+            categories: d => d.time,
+            inerClass: d => d.libraryName,
+            title: `Timeline of the runs with ${argumentSelector.value}`,
+            xLabel: "Time (s) →",
+            yLabel: timelineSeries[series] + " ↑",
+            xFormat: d3.format(".2~f"),
+            curve: d3.curveLinear,
+            circlesRadius: 2,
+            width: width,
+            height: height,
+            labelFontSize: labelFontSize,
+            titleFontSize: titleFontSize,
+            tooltipFontSize: tooltipFontSize,
+            margin: { top: 40, right: 10, bottom: 50, left: 50 },
+        }));
+    }
+
+    argumentSelector.onchange = draw;
+    seriesSelector.onchange = draw;
+    draw();
+    return container;
+}
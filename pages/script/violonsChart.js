@@ -2,6 +2,7 @@ export function ViolonsChart(data,{
     values = ([value]) => value, 
     categories = ([, categories]) => categories, 
     inerClass = ([, , inerClass]) => inerClass,
+    distribution = () => undefined, // given d in data, returns {min, p50, p90, p99, max, histogram} of the samples
 
     title,
 
@@ -43,22 +44,9 @@ export function ViolonsChart(data,{
 
     const I = d3.range(Values.length);
 
-    // TEMPORAIRE Il faudrait que les quantiles soient calculés en fonction des données
-    let upperQuantile = [];
-    let lowerQuantile = [];
-    let maxValues = [];
-    let minValues = [];
-    for (let _ of I) {
-        let uq = 1 + Math.floor(Math.random() * 5);
-        let lq = -1 - Math.floor(Math.random() * 5);
-        let max = uq + Math.floor(Math.random() * 2) + 1;
-        let min = lq - Math.floor(Math.random() * 2) - 1;
-        upperQuantile.push(uq);
-        lowerQuantile.push(lq);
-        maxValues.push(max);
-        minValues.push(min);
-
-    }
+    // the summary of the samples of each element, 'error' (or undefined) if there is no valid sample
+    const Distribution = d3.map(data, distribution);
+    const hasDistribution = d => typeof Distribution[d] === "object" && Distribution[d] !== null;
 
     // console.log(Values);
     // console.log(Categories);
@@ -86,7 +74,10 @@ export function ViolonsChart(data,{
         .domain(InerClass)
         .rangeRound([0, xScaleCategory.bandwidth()]);
   
-    const yMinMaxValue = d3.extent(Values);
+    const yMinMaxValue = d3.extent(
+        Values.concat(I.filter(hasDistribution).flatMap(d => [Distribution[d].min, Distribution[d].max]))
+            .filter(value => typeof value === "number")
+    );
 
     // CAUTION: if the min value is 0, the log scale will not work
 
@@ -100,6 +91,8 @@ export function ViolonsChart(data,{
         yDomain = [0, yMinMaxValue[1]];
         yScale = d3.scaleLinear(yDomain, yRange);
     }
+    // the values under the domain (0 with the log scale) are drawn at the bottom of the chart
+    const yPosition = value => yScale(Math.max(value, yDomain[0]));
 
     let xAxis = d3.axisBottom(xScaleCategory);
     let yAxis = d3.axisLeft(yScale).ticks(height / 60, yFormat);
@@ -127,13 +120,15 @@ export function ViolonsChart(data,{
         .attr("x", function (d) {
             return xScaleInerCategory(InerClass[d]);
         })
+        // the box goes from the median to the 90th percentile of the samples
         .attr("y", function (d) {
-            return yScale(Values[d] + upperQuantile[d]);
+            return hasDistribution(d) ? yPosition(Distribution[d].p90) : yPosition(Values[d]);
         })
         .attr("width", xScaleInerCategory.bandwidth())
         .attr("height", function (d) {
-            return yScale(Values[d] + lowerQuantile[d]) - yScale(Values[d] + upperQuantile[d]);
+            return hasDistribution(d) ? yPosition(Distribution[d].p50) - yPosition(Distribution[d].p90) : 0;
         })
+        .attr("fill-opacity", 0.6)
         .attr("fill", function (d) {
             return color(InerClass[d]);
         })
@@ -153,25 +148,84 @@ export function ViolonsChart(data,{
             return xScaleInerCategory(InerClass[d]) + xScaleInerCategory.bandwidth()/2;
         })
         .attr("y", function (d) {
-            return yScale(Values[d]) - 5;
+            return (hasDistribution(d) ? yPosition(Distribution[d].max) : yPosition(Values[d])) - 5;
         })
         .text(function (d) {
-            return Values[d].toFixed(countDecimals(Values[d])<=2?countDecimals(Values[d]):2);
+            if (!hasDistribution(d)) {
+                return Values[d];
+            }
+            let format = value => value.toFixed(countDecimals(value)<=2?countDecimals(value):2);
+            return `p50 ${format(Distribution[d].p50)} p90 ${format(Distribution[d].p90)} p99 ${format(Distribution[d].p99)} max ${format(Distribution[d].max)}`;
         })
         ;
 
-    //we add the violons to the chart
+    //we add the violons to the chart, the density is the histogram of the samples mirrored around the middle
+    const violonArea = d3.area()
+        .curve(d3.curveBasis)
+        .x0(point => point.middle - point.halfWidth)
+        .x1(point => point.middle + point.halfWidth)
+        .y(point => yPosition(point.value));
+
+    rect
+        .filter(hasDistribution)
+        .append("path")
+        .attr("class", "violon")
+        .attr("d", function (d) {
+            let {min, max, histogram} = Distribution[d];
+            let middle = xScaleInerCategory.bandwidth()/2 + xScaleInerCategory(InerClass[d]);
+            let halfWidth = xScaleInerCategory.bandwidth()/2;
+            let maxCount = d3.max(histogram) || 1;
+            let binWidth = (max - min) / histogram.length;
+            let points = histogram.map((count, k) => ({
+                middle: middle,
+                halfWidth: halfWidth * count / maxCount,
+                value: min + (k + 0.5) * binWidth,
+            }));
+            points.unshift({middle: middle, halfWidth: 0, value: min});
+            points.push({middle: middle, halfWidth: 0, value: max});
+            return violonArea(points);
+        })
+        .attr("fill", function (d) {
+            return color(InerClass[d]);
+        })
+        .attr("fill-opacity", 0.3)
+        .attr("stroke", function (d) {
+            return color(InerClass[d]);
+        })
+        .attr("stroke-width", 1)
+        .attr("pointer-events", "none");
+
+    // the whiskers go from the min to the max, the dashed tick is the 99th percentile
+    rect
+        .filter(hasDistribution)
+        .append("path")
+        .attr("class", "whisker")
+        .attr("d", function (d) {
+            let {min, max, p50} = Distribution[d];
+            let middle = xScaleInerCategory.bandwidth()/2 + xScaleInerCategory(InerClass[d]);
+            let halfWidth = xScaleInerCategory.bandwidth()/4;
+            return `M ${middle} ${yPosition(min)} L ${middle} ${yPosition(max)}
+                    M ${middle - halfWidth} ${yPosition(max)} L ${middle + halfWidth} ${yPosition(max)}
+                    M ${middle - halfWidth} ${yPosition(min)} L ${middle + halfWidth} ${yPosition(min)}
+                    M ${middle - 2 * halfWidth} ${yPosition(p50)} L ${middle + 2 * halfWidth} ${yPosition(p50)}`
+        })
+        .attr("stroke", "black")
+        .attr("stroke-width", 1)
+        .attr("pointer-events", "none");
+
     rect
+        .filter(hasDistribution)
         .append("path")
-        .join("path")
+        .attr("class", "tail")
         .attr("d", function (d) {
             let middle = xScaleInerCategory.bandwidth()/2 + xScaleInerCategory(InerClass[d]);
             let halfWidth = xScaleInerCategory.bandwidth()/2;
-            return `M ${middle} ${yScale(Values[d] + upperQuantile[d])} L ${middle} ${yScale(Values[d] + maxValues[d])} M ${middle - halfWidth} ${yScale(Values[d] + maxValues[d])} L ${middle + halfWidth} ${yScale(Values[d] + maxValues[d])} Z
-                    M ${middle} ${yScale(Values[d] + lowerQuantile[d])} L ${middle} ${yScale(Values[d] + minValues[d])} M ${middle - halfWidth} ${yScale(Values[d] + minValues[d])} L ${middle + halfWidth} ${yScale(Values[d] + minValues[d])} Z`
+            return `M ${middle - halfWidth} ${yPosition(Distribution[d].p99)} L ${middle + halfWidth} ${yPosition(Distribution[d].p99)}`
         })
         .attr("stroke", "black")
-        .attr("stroke-width", 1);
+        .attr("stroke-width", 1)
+        .attr("stroke-dasharray", "2,2")
+        .attr("pointer-events", "none");
 
     // add the x-axis to the chart.
     let xAxisG = svg.append("g")
@@ -2,16 +2,225 @@
 
 This module contains the differents ranking function to rank the library by task, by theme or globaly
 
+The libraries can also be ranked on several metrics at once (runtime, resources, evaluation functions)
+with the Pareto fronts of each task, see `RankingLibraryParetoByTask`.
+
+With the metric `significant_runtime` two libraries only get different ranks for an argument if the
+difference of their mean runtime is significant, the samples are bootstrapped to decide it and to give
+the stability of the ranks, see `SignificantRanks` and `RankStabilityByTask`.
+
+Instead of ordinal ranks, the libraries can be scored by their speedup relative to a reference library,
+aggregated with geometric means over the arguments, the tasks and the themes, see `SpeedupByTask`.
+
 """
 
+import warnings
+from dataclasses import dataclass
+
 import numpy as np
 
 from task import Task
 from library import Library
 from logger import logger
 
+# the value of each library for a task used to rank them
+METRICS = {
+    "runtime": lambda task, libraryName: task.mean_runtime(libraryName),
+    "significant_runtime": lambda task, libraryName: SignificantRanks(task.name)[
+        libraryName
+    ],
+}
+
+DEFAULT_ALPHA = 0.05
+DEFAULT_BOOTSTRAP_RESAMPLES = 1000
+# the bootstrap is seeded so the same results always give the same ranking
+BOOTSTRAP_SEED = 0
+
+# the options of the significance-aware ranking, see `SetSignificanceOptions`
+significanceOptions = {"alpha": DEFAULT_ALPHA, "resamples": DEFAULT_BOOTSTRAP_RESAMPLES}
+
+
+class RankingCache:
+    """Cache of the rankings shared by all the pages of the site.
+
+    The rankings are computed once for each (level, threshold, metric) as long as the data of the tasks
+    doesn't change (see `Task.dataVersion`). Each level is computed from the levels it depends on,
+    so the ranking by task is computed once for the ranking by theme and the global ranking.
+
+    Attributes
+    ----------
+    DEPENDENCIES : dict of str and list of str
+        Class Attribute ! The levels needed to compute each level.
+    cache : dict of tuple and dict
+        The rankings indexed by (level, threshold, metric).
+    dataVersion : int
+        The version of the data of the tasks used to compute the cached rankings.
+    """
+
+    DEPENDENCIES = {"task": [], "theme": ["task"], "global": ["task"]}
+
+    def __init__(self) -> None:
+        self.cache = {}
+        self.dataVersion = Task.dataVersion
+
+    def ClearIfDataChanged(self) -> None:
+        """Remove the cached rankings if the data of the tasks changed since they were computed."""
+        if self.dataVersion != Task.dataVersion:
+            logger.debug(
+                "The data of the tasks changed, the rankings are computed again"
+            )
+            self.cache.clear()
+            self.dataVersion = Task.dataVersion
+
+    def Get(self, level: str, threshold=0.0, metric: str = "runtime") -> dict:
+        """Getter for a ranking, it is computed if it is not in the cache.
+
+        Parameters
+        ----------
+        level : str
+            `task`, `theme` or `global`.
+        threshold : float, default=0.0
+            The threshold to remove the result with an argument that are under the threshold.
+        metric : str, default="runtime"
+            The metric used to rank the libraries, a key of `METRICS`.
+
+        Returns
+        -------
+        dict
+            The ranking, it must not be modified.
+        """
+        self.ClearIfDataChanged()
+
+        key = (level, threshold, metric)
+        if key not in self.cache:
+            dependencies = [
+                self.Get(dependency, threshold, metric)
+                for dependency in RankingCache.DEPENDENCIES[level]
+            ]
+            if level == "task":
+                self.cache[key] = ComputeRankingByTask(threshold, metric)
+            elif level == "theme":
+                self.cache[key] = ComputeRankingByTheme(*dependencies)
+            else:
+                self.cache[key] = ComputeRankingGlobal(*dependencies)
+        return self.cache[key]
+
+    def GetPareto(self, taskName: str, config: "ParetoConfig") -> dict:
+        """Getter for the Pareto ranking of a task, it is computed if it is not in the cache.
+
+        Returns
+        -------
+        dict
+            The ranking (see `ComputeParetoRanking`), it must not be modified.
+        """
+        self.ClearIfDataChanged()
+
+        key = ("pareto", taskName, config)
+        if key not in self.cache:
+            self.cache[key] = ComputeParetoRanking(taskName, config)
+        return self.cache[key]
+
+    def GetSpeedups(self, referenceLibrary: str) -> dict[str, dict]:
+        """Getter for the speedups relative to a library, they are computed if they are not in the cache.
+
+        Returns
+        -------
+        dict of str and dict
+            The speedups of each level, see `ComputeSpeedups`.
+        """
+        self.ClearIfDataChanged()
+
+        key = (
+            "speedup",
+            referenceLibrary,
+            significanceOptions["alpha"],
+            significanceOptions["resamples"],
+        )
+        if key not in self.cache:
+            self.cache[key] = ComputeSpeedups(referenceLibrary)
+        return self.cache[key]
+
+    def GetRankStability(
+        self, taskName: str, threshold=0.0, metric: str = "runtime"
+    ) -> dict:
+        """Getter for the stability of the ranking of a task, it is computed if it is not in the cache.
+
+        Returns
+        -------
+        dict of str and dict
+            The stability of the rank of each library, see `RankStabilityByTask`.
+        """
+        self.ClearIfDataChanged()
+
+        key = (
+            "stability",
+            taskName,
+            threshold,
+            metric,
+            significanceOptions["resamples"],
+        )
+        if key not in self.cache:
+            self.cache[key] = ComputeRankStability(taskName, threshold, metric)
+        return self.cache[key]
+
+    def GetBootstrap(self, taskName: str) -> tuple[list[str], np.ndarray]:
+        """Getter for the bootstrapped mean runtimes of a task, they are computed if they are not in the cache.
 
-def RankingLibraryByTask(threshold=0.0, isResultList=True) -> dict[str, list[str]]:
+        Returns
+        -------
+        tuple of list of str and np.ndarray
+            The libraries and their bootstrapped means, see `BootstrapRuntime`.
+        """
+        self.ClearIfDataChanged()
+
+        key = ("bootstrap", taskName, significanceOptions["resamples"])
+        if key not in self.cache:
+            self.cache[key] = BootstrapRuntime(
+                taskName, significanceOptions["resamples"]
+            )
+        return self.cache[key]
+
+
+@dataclass(frozen=True)
+class ParetoConfig:
+    """The metrics of the Pareto ranking of a task, read from the keys `pareto_metrics`,
+    `pareto_maximize` and `pareto_weights` of the task config file.
+
+    Attributes
+    ----------
+    metrics : tuple of str
+        The metrics compared: `runtime`, a resource (see `Task.RESOURCE_METRICS`) or an evaluation function.
+    maximize : tuple of str
+        The metrics for which the highest value is the best, the lowest is the best for the others.
+    weights : tuple of float or None
+        The weight of each metric in the aggregate score, the same weight for all the metrics if None.
+    """
+
+    metrics: tuple = ("runtime",)
+    maximize: tuple = ()
+    weights: tuple = None
+
+    @staticmethod
+    def FromTaskConfig(config: dict) -> "ParetoConfig":
+        metrics = tuple(config.get("pareto_metrics", "runtime").split())
+        maximize = tuple(config.get("pareto_maximize", "").split())
+        weights = config.get("pareto_weights", None)
+        if weights is not None:
+            weights = tuple(float(weight) for weight in weights.split())
+            if len(weights) != len(metrics):
+                logger.warning(
+                    f"{len(weights)} pareto_weights for {len(metrics)} pareto_metrics, the same weight is used for all the metrics"
+                )
+                weights = None
+        return ParetoConfig(metrics, maximize, weights)
+
+
+rankingCache = RankingCache()
+
+
+def RankingLibraryByTask(
+    threshold=0.0, isResultList=True, metric="runtime"
+) -> dict[str, list[str]]:
     r"""Rank all the Library by their results for each task.
 
     Each library has a list of result for each task. For each result we apply the LexMax algorithm
@@ -22,6 +231,8 @@ def RankingLibraryByTask(threshold=0.0, isResultList=True) -> dict[str, list[str
     ----------
     threshold : float, default=0.0
         The threshold to remove the result with an argument that are under the threshold.
+    metric : str, default="runtime"
+        The metric used to rank the libraries, a key of `METRICS`.
 
     Returns
     -------
@@ -42,30 +253,18 @@ def RankingLibraryByTask(threshold=0.0, isResultList=True) -> dict[str, list[str
     >>> print(RankingLibraryByTask())
     {'Task1': ['Library1', 'Library2', 'Library3'], 'Task2': ['Library1', 'Library2', 'Library3'], 'Task3': ['Library1', 'Library2', 'Library3']}
     """
-    dictionaryTaskLibraryResults = {}
-    for taskName in Task.GetAllTaskName():
-        dictionaryTaskLibraryResults[taskName] = {}
-        for library in Library.GetLibraryByTaskName(taskName):
-            dictionaryTaskLibraryResults[taskName][
-                library.name
-            ] = library.GetTaskByName(taskName).mean_runtime(library.name)
-
-    for taskName in dictionaryTaskLibraryResults.keys():
-        dictionaryTaskLibraryResults[taskName] = LexMaxWithThreshold(
-            dictionaryTaskLibraryResults[taskName],
-            Task.GetTaskByName(taskName).arguments,
-            threshold,
-        )
-
+    rankLibraryByTask = rankingCache.Get("task", threshold, metric)
     if isResultList:
-        for taskName in dictionaryTaskLibraryResults.keys():
-            dictionaryTaskLibraryResults[taskName] = list(
-                dictionaryTaskLibraryResults[taskName].keys()
-            )
-    return dictionaryTaskLibraryResults
+        return {
+            taskName: list(ranking.keys())
+            for taskName, ranking in rankLibraryByTask.items()
+        }
+    return {taskName: dict(ranking) for taskName, ranking in rankLibraryByTask.items()}
 
 
-def RankingLibraryByTheme(threshold=0, isResultList=True) -> dict[str, list[str]]:
+def RankingLibraryByTheme(
+    threshold=0, isResultList=True, metric="runtime"
+) -> dict[str, list[str]]:
     """Rank all the Library by their results for each theme.
 
     Each library has a list of result for each task. For each result we apply the LexMax algorithm
@@ -76,6 +275,8 @@ def RankingLibraryByTheme(threshold=0, isResultList=True) -> dict[str, list[str]
     ----------
     threshold : float, default=0.0
         The threshold to remove the result with an argument that are under the threshold.
+    metric : str, default="runtime"
+        The metric used to rank the libraries, a key of `METRICS`.
 
     Returns
     -------
@@ -97,27 +298,15 @@ def RankingLibraryByTheme(threshold=0, isResultList=True) -> dict[str, list[str]
     {'Theme1': ['Library1', 'Library2', 'Library3'], 'Theme2': ['Library1', 'Library2', 'Library3'], 'Theme3': ['Library1', 'Library2', 'Library3']}
 
     """
-    rankLibraryByTask = RankingLibraryByTask(threshold=threshold, isResultList=False)
-    rankLibraryByTheme = {}
-
-    for theme in Task.GetAllThemeName():
-        listTaskNameForCurrentTheme = Task.GetTaskNameByThemeName(theme)
-        classementLibrary = {}
-        for libraryName in Library.GetAllLibraryName():
-            classementLibrary[libraryName] = [
-                rankLibraryByTask[taskName][libraryName]
-                for taskName in listTaskNameForCurrentTheme
-            ]
-        rankLibraryByTheme[theme] = LexMax(classementLibrary)
-
+    rankLibraryByTheme = rankingCache.Get("theme", threshold, metric)
     if isResultList:
-        for theme in rankLibraryByTheme.keys():
-            rankLibraryByTheme[theme] = list(rankLibraryByTheme[theme].keys())
-
-    return rankLibraryByTheme
+        return {
+            theme: list(ranking.keys()) for theme, ranking in rankLibraryByTheme.items()
+        }
+    return {theme: dict(ranking) for theme, ranking in rankLibraryByTheme.items()}
 
 
-def RankingLibraryGlobal(threshold=0, isResultList=True) -> list[str]:
+def RankingLibraryGlobal(threshold=0, isResultList=True, metric="runtime") -> list[str]:
     """Rank all the Library by their results for each theme.
 
     Each library has a list of result for each task. For each result we apply the LexMax algorithm
@@ -128,6 +317,8 @@ def RankingLibraryGlobal(threshold=0, isResultList=True) -> list[str]:
     ----------
     threshold : float, default=0.0
         The threshold to remove the result with an argument that are under the threshold.
+    metric : str, default="runtime"
+        The metric used to rank the libraries, a key of `METRICS`.
 
     Returns
     -------
@@ -140,8 +331,54 @@ def RankingLibraryGlobal(threshold=0, isResultList=True) -> list[str]:
     LexMaxWithThreshold : The LexMax algorithm with a threshold.
 
     """
+    classementLibrary = rankingCache.Get("global", threshold, metric)
+    if isResultList:
+        return list(classementLibrary.keys())
+    return dict(classementLibrary)
+
+
+def ComputeRankingByTask(
+    threshold=0.0, metric: str = "runtime"
+) -> dict[str, dict[str, int]]:
+    """Compute the LexMax ranking of the libraries for each task, see `RankingLibraryByTask`."""
+    dictionaryTaskLibraryResults = {}
+    for taskName in Task.GetAllTaskName():
+        dictionaryTaskLibraryResults[taskName] = {}
+        for library in Library.GetLibraryByTaskName(taskName):
+            dictionaryTaskLibraryResults[taskName][library.name] = METRICS[metric](
+                library.GetTaskByName(taskName), library.name
+            )
+
+    for taskName in dictionaryTaskLibraryResults.keys():
+        dictionaryTaskLibraryResults[taskName] = LexMaxWithThreshold(
+            dictionaryTaskLibraryResults[taskName],
+            Task.GetTaskByName(taskName).arguments,
+            threshold,
+        )
+    return dictionaryTaskLibraryResults
+
+
+def ComputeRankingByTheme(
+    rankLibraryByTask: dict[str, dict[str, int]]
+) -> dict[str, dict[str, int]]:
+    """Compute the LexMax ranking of the libraries for each theme from their ranking for each task."""
+    rankLibraryByTheme = {}
+    for theme in Task.GetAllThemeName():
+        listTaskNameForCurrentTheme = Task.GetTaskNameByThemeName(theme)
+        classementLibrary = {}
+        for libraryName in Library.GetAllLibraryName():
+            classementLibrary[libraryName] = [
+                rankLibraryByTask[taskName][libraryName]
+                for taskName in listTaskNameForCurrentTheme
+            ]
+        rankLibraryByTheme[theme] = LexMax(classementLibrary)
+    return rankLibraryByTheme
+
 
-    rankLibraryByTask = RankingLibraryByTask(threshold=threshold, isResultList=False)
+def ComputeRankingGlobal(
+    rankLibraryByTask: dict[str, dict[str, int]]
+) -> dict[str, int]:
+    """Compute the global LexMax ranking of the libraries from their ranking for each task."""
     classementLibrary = {}
     for libraryName in Library.GetAllLibraryName():
         classementLibrary[libraryName] = []
@@ -149,13 +386,506 @@ def RankingLibraryGlobal(threshold=0, isResultList=True) -> list[str]:
             classementLibrary[libraryName].append(
                 rankLibraryByTask[taskName][libraryName]
             )
+    return LexMax(classementLibrary)
+
+
+def RankingLibraryParetoByTask(
+    configs: dict[str, ParetoConfig] = None, isResultList=True
+) -> dict[str, list[str]]:
+    """Rank all the Library on several metrics for each task with their Pareto front.
 
-    classementLibrary = LexMax(classementLibrary)
+    The libraries of the first front are not dominated by any other library (no other library is as good on
+    all the metrics and better on one), the libraries of the second front are only dominated by the first
+    one, etc. In a front the libraries are ordered by their weighted aggregate score.
 
+    Parameters
+    ----------
+    configs : dict of str and ParetoConfig, optional
+        The metrics of each task, the runtime only for the tasks not in the dictionary.
+    isResultList : bool, default=True
+        If True, the libraries are given as a sorted list, else as a dictionary with their front.
+
+    Returns
+    -------
+    dict of str and list of str
+        A dictionary with the task name as key and a list of library name sorted by their front and
+        their score as value (or a dictionary of library name and front if `isResultList` is False).
+
+    See Also
+    --------
+    ParetoScoresByTask : The fronts, the scores and the normalized metrics of each library.
+    ParetoFronts : The non-dominated sorting.
+    """
+    rankings = ParetoScoresByTask(configs)
     if isResultList:
-        classementLibrary = list(classementLibrary.keys())
+        return {
+            taskName: list(ranking.keys()) for taskName, ranking in rankings.items()
+        }
+    return {
+        taskName: {
+            libraryName: result["front"] for libraryName, result in ranking.items()
+        }
+        for taskName, ranking in rankings.items()
+    }
+
+
+def ParetoScoresByTask(
+    configs: dict[str, ParetoConfig] = None
+) -> dict[str, dict[str, dict]]:
+    """The Pareto front, the weighted aggregate score and the normalized metrics of the libraries for each task.
+
+    Parameters
+    ----------
+    configs : dict of str and ParetoConfig, optional
+        The metrics of each task, the runtime only for the tasks not in the dictionary.
+
+    Returns
+    -------
+    dict of str and dict
+        For each task, the libraries sorted by their front and their score, see `ComputeParetoRanking`.
+    """
+    configs = configs or {}
+    return {
+        taskName: rankingCache.GetPareto(
+            taskName, configs.get(taskName, ParetoConfig())
+        )
+        for taskName in Task.GetAllTaskName()
+    }
+
+
+def NormalizedMetrics(
+    taskName: str, libraryNames: list[str], config: ParetoConfig
+) -> np.ndarray:
+    """The metrics of the libraries for a task normalized between 0 (the best) and 1 (the worst).
 
-    return classementLibrary
+    For each argument the mean of a metric is scaled between the best and the worst library, a failure is
+    the worst value. The normalized values are then averaged over the arguments so every metric has the
+    same scale whatever its unit.
+
+    Returns
+    -------
+    np.ndarray of float
+        Array of shape (nbLibraries, nbMetrics).
+    """
+    task = Task.GetTaskByName(taskName)
+    normalized = np.ones((len(libraryNames), len(config.metrics)))
+    for j, metric in enumerate(config.metrics):
+        if len(libraryNames) == 0:
+            break
+        # shape (nbLibraries, nbArguments)
+        values = np.stack(
+            [
+                task.GetStatistics(libraryName, metric).mean
+                for libraryName in libraryNames
+            ]
+        )
+        if metric in config.maximize:
+            values = -values
+        with np.errstate(invalid="ignore"), warnings.catch_warnings():
+            # the arguments where all the libraries failed
+            warnings.simplefilter("ignore", RuntimeWarning)
+            best = np.nanmin(values, axis=0)
+            spread = np.nanmax(values, axis=0) - best
+            scaled = np.where(
+                spread > 0, (values - best) / np.where(spread > 0, spread, 1), 0.0
+            )
+        scaled[np.isnan(values)] = 1.0
+        normalized[:, j] = scaled.mean(axis=1) if scaled.shape[1] > 0 else 1.0
+    return normalized
+
+
+def ParetoFronts(values: np.ndarray) -> np.ndarray:
+    """Non-dominated sorting of elements on several metrics (the lowest value is the best).
+
+    All the dominance relations are computed at once by broadcasting, the fronts are then peeled by
+    removing the dominance of the elements of each front.
+
+    Parameters
+    ----------
+    values : np.ndarray of float
+        Array of shape (nbElements, nbMetrics), np.nan is the worst value.
+
+    Returns
+    -------
+    np.ndarray of int
+        The front of each element, 0 for the elements dominated by no other.
+
+    Examples
+    --------
+    >>> ParetoFronts(np.array([[1.0, 3.0], [2.0, 2.0], [3.0, 1.0], [3.0, 3.0]]))
+    array([0, 0, 0, 1])
+    """
+    values = np.where(np.isnan(values), np.inf, values)
+    # dominates[i, j] : i is as good as j on all the metrics and better on at least one
+    dominates = (values[:, np.newaxis, :] <= values[np.newaxis, :, :]).all(axis=2) & (
+        values[:, np.newaxis, :] < values[np.newaxis, :, :]
+    ).any(axis=2)
+    nbDominators = dominates.sum(axis=0)
+    fronts = np.full(len(values), -1)
+    remaining = np.ones(len(values), dtype=bool)
+    front = 0
+    while remaining.any():
+        current = remaining & (nbDominators == 0)
+        fronts[current] = front
+        remaining &= ~current
+        nbDominators -= dominates[current].sum(axis=0)
+        front += 1
+    return fronts
+
+
+def ComputeParetoRanking(taskName: str, config: ParetoConfig) -> dict[str, dict]:
+    """Compute the Pareto ranking of the libraries for a task, see `RankingLibraryParetoByTask`.
+
+    Returns
+    -------
+    dict of str and dict
+        For each library, sorted by front and score, its `front`, its weighted aggregate `score` (between
+        0 for the best and 1 for the worst) and its normalized `metrics` (see `NormalizedMetrics`).
+    """
+    libraryNames = [library.name for library in Library.GetLibraryByTaskName(taskName)]
+    normalized = NormalizedMetrics(taskName, libraryNames, config)
+    fronts = ParetoFronts(normalized)
+    weights = np.asarray(
+        config.weights if config.weights is not None else [1.0] * len(config.metrics)
+    )
+    scores = (
+        normalized @ weights / weights.sum()
+        if weights.sum() > 0
+        else np.zeros(len(libraryNames))
+    )
+
+    order = np.lexsort((scores, fronts))
+    return {
+        libraryNames[i]: {
+            "front": int(fronts[i]),
+            "score": float(scores[i]),
+            "metrics": dict(zip(config.metrics, normalized[i].tolist())),
+        }
+        for i in order
+    }
+
+
+def SetSignificanceOptions(
+    alpha: float = DEFAULT_ALPHA, resamples: int = DEFAULT_BOOTSTRAP_RESAMPLES
+) -> None:
+    """Set the significance level and the number of bootstrap resamples of the `significant_runtime` metric."""
+    significanceOptions.update(alpha=alpha, resamples=resamples)
+    # the rankings computed with the previous options are not valid anymore
+    rankingCache.cache.clear()
+
+
+def BootstrapMeans(
+    samples: np.ndarray, resamples: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Bootstrap the mean of the samples of each argument, all the resamples are drawn at once.
+
+    Parameters
+    ----------
+    samples : np.ndarray of float
+        Array of shape (nbArguments, nbSamples), np.nan if the sample is missing or failed.
+    resamples : int
+        The number of bootstrap resamples.
+    rng : np.random.Generator
+        The random generator.
+
+    Returns
+    -------
+    np.ndarray of float
+        Array of shape (resamples, nbArguments), np.nan for the arguments without valid sample.
+    """
+    # the valid samples first, the resamples are drawn among them
+    compact = np.sort(samples, axis=1)
+    counts = (~np.isnan(samples)).sum(axis=1)
+    index = (rng.random((resamples,) + samples.shape) * counts[:, np.newaxis]).astype(
+        np.int64
+    )
+    drawn = np.take_along_axis(compact[np.newaxis], index, axis=2)
+    isDrawn = np.arange(samples.shape[1]) < counts[:, np.newaxis]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(isDrawn, drawn, 0.0).sum(axis=2) / np.where(
+            counts > 0, counts, np.nan
+        )
+
+
+def BootstrapRuntime(taskName: str, resamples: int) -> tuple[list[str], np.ndarray]:
+    """Bootstrap the mean runtime of each library for each argument of a task.
+
+    Returns
+    -------
+    libraryNames : list of str
+        The libraries of the task.
+    means : np.ndarray of float
+        Array of shape (nbLibraries, resamples, nbArguments), np.inf if the library has no valid sample
+        for the argument (a failure is slower than any runtime).
+    """
+    task = Task.GetTaskByName(taskName)
+    libraryNames = [library.name for library in Library.GetLibraryByTaskName(taskName)]
+    rng = np.random.default_rng(BOOTSTRAP_SEED)
+    means = (
+        np.stack(
+            [
+                BootstrapMeans(task.GetRuntimeArray(libraryName), resamples, rng)
+                for libraryName in libraryNames
+            ]
+        )
+        if libraryNames
+        else np.zeros((0, resamples, len(task.arguments_label)))
+    )
+    return libraryNames, np.where(np.isnan(means), np.inf, means)
+
+
+def SignificantlyFaster(taskName: str) -> np.ndarray:
+    """Which libraries are significantly faster than the others for each argument of a task.
+
+    A library is significantly faster than another if the bootstrap confidence interval (at the level
+    1 - alpha) of the difference of their mean runtime is under 0. With a single sample there is no noise
+    to measure, the means are compared as they are. A library which failed is slower than all the others.
+
+    Returns
+    -------
+    np.ndarray of bool
+        Array of shape (nbLibraries, nbLibraries, nbArguments), [i, j, a] is True if the library j is
+        significantly faster than the library i for the argument a.
+    """
+    libraryNames, means = rankingCache.GetBootstrap(taskName)
+    alpha = significanceOptions["alpha"]
+    isFailure = np.isinf(means).all(axis=1)
+    isFaster = np.zeros((len(libraryNames),) + isFailure.shape, dtype=bool)
+    for i in range(len(libraryNames)):
+        with np.errstate(invalid="ignore"):
+            # shape (nbLibraries, nbArguments), the upper bound of mean_j - mean_i
+            upper = np.quantile(means - means[i], 1 - alpha / 2, axis=1)
+        isFaster[i] = (upper < 0) & ~isFailure
+        isFaster[i] |= ~isFailure & isFailure[i]
+    return isFaster
+
+
+def SignificantRanks(taskName: str) -> dict[str, np.ndarray]:
+    """The rank of each library for each argument of a task counting only the significant differences.
+
+    The rank of a library is the number of libraries significantly faster than it (see
+    `SignificantlyFaster`), two libraries whose difference is within the noise of their runs share the
+    same rank.
+
+    Returns
+    -------
+    dict of str and np.ndarray
+        For each library, its rank for each argument.
+    """
+    libraryNames, _ = rankingCache.GetBootstrap(taskName)
+    ranks = SignificantlyFaster(taskName).sum(axis=1).astype(float)
+    return dict(zip(libraryNames, ranks))
+
+
+def RankStabilityByTask(
+    threshold=0.0, metric: str = "runtime"
+) -> dict[str, dict[str, dict]]:
+    """The stability of the rank of the libraries for each task, estimated with the bootstrap.
+
+    The ranking displayed for the task (LexMax on the `metric`) is computed again on each resample of the
+    runs. The spread of these ranks over the resamples tells how much the ranking could change with other
+    runs.
+
+    Parameters
+    ----------
+    threshold : float, default=0.0
+        The threshold of the ranking, see `RankingLibraryByTask`.
+    metric : str, default="runtime"
+        `runtime` or `significant_runtime`, the metric of the ranking.
+
+    Returns
+    -------
+    dict of str and dict
+        For each task and each library, `probabilities` the probability of each rank (0 the best) and
+        `interval` the confidence interval (at the level 1 - alpha) of its rank.
+    """
+    return {
+        taskName: rankingCache.GetRankStability(taskName, threshold, metric)
+        for taskName in Task.GetAllTaskName()
+    }
+
+
+def ComputeRankStability(
+    taskName: str, threshold=0.0, metric: str = "runtime"
+) -> dict[str, dict]:
+    """Compute the stability of the ranking of a task, see `RankStabilityByTask`.
+
+    With `significant_runtime` the pairs of libraries whose difference is not significant keep sharing
+    their rank, the others are ordered by their mean runtime in each resample.
+    """
+    alpha = significanceOptions["alpha"]
+    libraryNames, means = rankingCache.GetBootstrap(taskName)
+    nbLibraries = len(libraryNames)
+    if metric == "significant_runtime":
+        isFaster = SignificantlyFaster(taskName)
+        isDifferent = isFaster | isFaster.transpose(1, 0, 2)
+        # shape (nbLibraries, resamples, nbArguments), the number of libraries faster in each resample
+        values = np.stack(
+            [
+                (isDifferent[i][:, np.newaxis, :] & (means < means[i])).sum(axis=0)
+                for i in range(nbLibraries)
+            ]
+        ).astype(float)
+    else:
+        values = means
+
+    # all the resamples are ranked at once, shape (resamples, nbLibraries)
+    start = ThresholdStart(Task.GetTaskByName(taskName).arguments, threshold)
+    taskRanks = LexMaxRanks(values[:, :, start:].transpose(1, 0, 2))
+    return {
+        libraryName: {
+            "probabilities": np.bincount(taskRanks[:, i], minlength=nbLibraries)
+            / len(taskRanks),
+            "interval": np.quantile(
+                taskRanks[:, i], [alpha / 2, 1 - alpha / 2], method="nearest"
+            ).astype(int),
+        }
+        for i, libraryName in enumerate(libraryNames)
+    }
+
+
+def SpeedupByTask(referenceLibrary: str) -> dict[str, dict[str, dict]]:
+    """The speedup of the libraries relative to a reference library for each task.
+
+    The speedup of an argument is the mean runtime of the reference divided by the mean runtime of the
+    library (2 is twice faster than the reference), the speedup of the task is the geometric mean over the
+    arguments both libraries succeeded. The confidence interval is given by the bootstrap of the samples.
+
+    A library which failed where the reference succeeded is aggregated over less arguments (or tasks) than
+    the others, its `count` is then lower than `total` and its speedup is not comparable with the others.
+
+    Parameters
+    ----------
+    referenceLibrary : str
+        The name of the reference library, the tasks it doesn't run have no speedup.
+
+    Returns
+    -------
+    dict of str and dict
+        For each task and each library, `speedup` the geometric mean speedup, `interval` its confidence
+        interval (at the level 1 - alpha), `count` the number of arguments aggregated and `total` the
+        number of arguments the reference succeeded.
+
+    See Also
+    --------
+    SpeedupByTheme, SpeedupGlobal : The same aggregation over the tasks of a theme and over all the tasks.
+    """
+    return rankingCache.GetSpeedups(referenceLibrary)["task"]
+
+
+def SpeedupByTheme(referenceLibrary: str) -> dict[str, dict[str, dict]]:
+    """The speedup of the libraries relative to a reference library for each theme, the geometric mean of
+    their speedup on the tasks of the theme (see `SpeedupByTask`)."""
+    return rankingCache.GetSpeedups(referenceLibrary)["theme"]
+
+
+def SpeedupGlobal(referenceLibrary: str) -> dict[str, dict]:
+    """The speedup of the libraries relative to a reference library, the geometric mean of their speedup on
+    all the tasks (see `SpeedupByTask`)."""
+    return rankingCache.GetSpeedups(referenceLibrary)["global"]
+
+
+def SpeedupSummary(
+    logSpeedups: list[np.ndarray], logReplicates: list[np.ndarray], total: int
+) -> dict:
+    """Aggregate log speedups with their bootstrap replicates into a geometric mean and its confidence interval.
+
+    Parameters
+    ----------
+    logSpeedups : list of np.ndarray
+        The log of the speedups aggregated (each element is one value).
+    logReplicates : list of np.ndarray
+        The bootstrap replicates of each log speedup, of shape (resamples,).
+    total : int
+        The number of speedups the reference has, more than `len(logSpeedups)` if the library failed on
+        some of them.
+    """
+    alpha = significanceOptions["alpha"]
+    if len(logSpeedups) == 0:
+        return {
+            "speedup": np.nan,
+            "interval": [np.nan, np.nan],
+            "count": 0,
+            "total": total,
+        }
+    replicates = np.mean(logReplicates, axis=0)
+    return {
+        "speedup": float(np.exp(np.mean(logSpeedups))),
+        "interval": np.exp(
+            np.quantile(replicates, [alpha / 2, 1 - alpha / 2])
+        ).tolist(),
+        "count": len(logSpeedups),
+        "total": total,
+    }
+
+
+def ComputeSpeedups(referenceLibrary: str) -> dict[str, dict]:
+    """Compute the speedups relative to a library for each task, each theme and globally.
+
+    The tasks and the themes have the same weight whatever their number of arguments or tasks, the log
+    speedups are averaged at each level.
+
+    Returns
+    -------
+    dict of str and dict
+        `task`, `theme` and `global`, see `SpeedupByTask`.
+    """
+    # for each task and library, the log speedup of each argument and its bootstrap replicates
+    logByTask = {}
+    for taskName in Task.GetAllTaskName():
+        task = Task.GetTaskByName(taskName)
+        libraryNames, means = rankingCache.GetBootstrap(taskName)
+        if referenceLibrary not in libraryNames:
+            continue
+        reference = libraryNames.index(referenceLibrary)
+        observed = np.stack(
+            [task.GetStatistics(libraryName).mean for libraryName in libraryNames]
+        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            logObserved = np.log(observed[reference]) - np.log(observed)
+            logReplicates = np.log(means[reference]) - np.log(means)
+        # the arguments where the library or the reference failed are not compared
+        isValid = np.isfinite(logObserved) & np.isfinite(logReplicates).all(axis=1)
+        logByTask[taskName] = {
+            libraryName: (logObserved[i][isValid[i]], logReplicates[i][:, isValid[i]])
+            for i, libraryName in enumerate(libraryNames)
+        }
+
+    taskLevel = {}
+    # the mean log speedup of each task, the unit aggregated by the themes and globally
+    taskLogs = {}
+    for taskName, libraries in logByTask.items():
+        taskLevel[taskName] = {}
+        total = len(libraries[referenceLibrary][0])
+        for libraryName, (logObserved, logReplicates) in libraries.items():
+            taskLevel[taskName][libraryName] = SpeedupSummary(
+                list(logObserved), list(logReplicates.T), total
+            )
+            if len(logObserved) > 0:
+                taskLogs.setdefault(libraryName, {})[taskName] = (
+                    logObserved.mean(),
+                    logReplicates.mean(axis=1),
+                )
+
+    def Aggregate(taskNames) -> dict[str, dict]:
+        total = len(set(taskNames) & set(taskLogs.get(referenceLibrary, {})))
+        return {
+            libraryName: SpeedupSummary(
+                [logs[taskName][0] for taskName in taskNames if taskName in logs],
+                [logs[taskName][1] for taskName in taskNames if taskName in logs],
+                total,
+            )
+            for libraryName, logs in taskLogs.items()
+        }
+
+    return {
+        "task": taskLevel,
+        "theme": {
+            theme: Aggregate(Task.GetTaskNameByThemeName(theme))
+            for theme in Task.GetAllThemeName()
+        },
+        "global": Aggregate(Task.GetAllTaskName()),
+    }
 
 
 def LexMax(dictionnary: dict[str, list[float]]) -> list[str]:
@@ -185,38 +915,66 @@ def LexMax(dictionnary: dict[str, list[float]]) -> list[str]:
     >>> print(LexMax(dictionnary))
     ['Library3', 'Library2', 'Library1']
     """
-    rankMatrix = np.zeros((len(dictionnary.keys()), len(list(dictionnary.values())[0])))
+    keys = list(dictionnary.keys())
+    rankMatrix = np.zeros((len(keys), len(list(dictionnary.values())[0])))
     # On remplit la matrice avec les valeurs du dictionnaire
-    for i, key in enumerate(dictionnary.keys()):
-        for j, value in enumerate(dictionnary[key]):
-            rankMatrix[i, j] = value
+    for i, key in enumerate(keys):
+        rankMatrix[i, : len(dictionnary[key])] = dictionnary[key]
+
+    ranks = LexMaxRanks(rankMatrix[np.newaxis])[0]
+    # the elements sorted by rank, the equal elements keep their order
+    return {keys[i]: int(ranks[i]) for i in np.argsort(ranks, kind="stable")}
+
+
+def LexMaxRanks(values: np.ndarray) -> np.ndarray:
+    """The LexMax rank of the elements of several rankings at once, see `LexMax`.
+
+    Parameters
+    ----------
+    values : np.ndarray of float
+        Array of shape (nbRankings, nbElements, nbColumns), the results of each element of each ranking.
+
+    Returns
+    -------
+    np.ndarray of int
+        Array of shape (nbRankings, nbElements), the rank of each element in its ranking (0 the best).
+    """
+    rankMatrix = np.array(values, dtype=float)
+    nbRankings, nbElements, nbColumns = rankMatrix.shape
 
-    # for each column we sort the value and we replace the value by their rank
+    # for each column we replace the value by their rank, the rank of a value is the number of values
+    # strictly lower in the column so the equal values share the lowest rank
     # the sort here will give a rank no matter the precision of the value
-    for column in range(rankMatrix.shape[1]):
-        rankMatrix[:, column] = [
-            sorted(rankMatrix[:, column].tolist()).index(element)
-            for element in rankMatrix[:, column].tolist()
-        ]
+    order = np.argsort(rankMatrix, axis=1, kind="stable")
+    sortedColumns = np.take_along_axis(rankMatrix, order, axis=1)
+    isNewValue = np.ones(rankMatrix.shape, dtype=bool)
+    isNewValue[:, 1:] = sortedColumns[:, 1:] != sortedColumns[:, :-1]
+    position = np.arange(nbElements)[:, np.newaxis]
+    minRank = np.maximum.accumulate(np.where(isNewValue, position, 0), axis=1)
+    np.put_along_axis(rankMatrix, order, minRank, axis=1)
 
     # we now sort the rank of each element to have a list of rank for each element sorted
-    VectorLibrary = {}
-    for i, key in enumerate(dictionnary.keys()):
-        VectorLibrary[key] = sorted(rankMatrix[i, :].tolist())
-
-    # we can now compare the element by their list of rank
-    sortedListRank = sorted(VectorLibrary.items(), key=lambda item: item[1])
-    rk = 0
-    elementRank = {}
-    for i in range(len(sortedListRank)):
-        elementRank[sortedListRank[i][0]] = rk
-        # if the next element is the same, they share the same rank as the element are equivelent
-        if (
-            i < len(sortedListRank) - 1
-            and sortedListRank[i][1] != sortedListRank[i + 1][1]
-        ):
-            rk += 1
-    return elementRank
+    rankMatrix.sort(axis=2)
+
+    # we can now compare the element by their list of rank, the first rank is the most important
+    # (lexsort use the last key as the primary one and keep the order of the equal elements)
+    if nbColumns == 0:
+        sortedElement = np.broadcast_to(np.arange(nbElements), (nbRankings, nbElements))
+    else:
+        sortedElement = np.lexsort(np.moveaxis(rankMatrix, 2, 0)[::-1], axis=-1)
+    sortedRank = np.take_along_axis(rankMatrix, sortedElement[:, :, np.newaxis], axis=1)
+    # if the next element is the same, they share the same rank as the element are equivelent
+    isDifferent = np.any(sortedRank[:, 1:] != sortedRank[:, :-1], axis=2)
+    elementRank = np.concatenate(
+        [
+            np.zeros((nbRankings, min(nbElements, 1)), dtype=np.int64),
+            np.cumsum(isDifferent, axis=1),
+        ],
+        axis=1,
+    )
+    ranks = np.zeros((nbRankings, nbElements), dtype=np.int64)
+    np.put_along_axis(ranks, sortedElement, elementRank, axis=1)
+    return ranks
 
 
 def LexMaxWithThreshold(dictionaryResults, argumentsList=list(), threshold=0) -> list:
@@ -250,9 +1008,21 @@ def LexMaxWithThreshold(dictionaryResults, argumentsList=list(), threshold=0) ->
     # Here only the result with an argument greater than 0.2 are used
     ['Library3', 'Library1', 'Library2']
     """
-    if threshold == 0 or len(argumentsList) == 0:
+    iterationLimit = ThresholdStart(argumentsList, threshold)
+    if iterationLimit == 0:
         return LexMax(dictionaryResults)
 
+    for key in dictionaryResults.keys():
+        dictionaryResults[key] = dictionaryResults[key][iterationLimit:]
+
+    return LexMax(dictionaryResults)
+
+
+def ThresholdStart(argumentsList: list, threshold=0) -> int:
+    """The index of the first result kept by `LexMaxWithThreshold`, 0 if all the results are kept."""
+    if threshold == 0 or len(argumentsList) == 0:
+        return 0
+
     # On cherche la limite d'itération pour ne récuperer que les résultats dont
     # la valeur de l'argument est supérieur au seuil
     iterationLimit = 0
@@ -266,12 +1036,8 @@ def LexMaxWithThreshold(dictionaryResults, argumentsList=list(), threshold=0) ->
     # cela veut dire que le seuil est trop élevé et que il n'y a pas de résultat
     if iterationLimit == len(argumentsList):
         # print("The threshold is too high, the LexMax algorithm will return without threshold")
-        return LexMax(dictionaryResults)
-
-    for key in dictionaryResults.keys():
-        dictionaryResults[key] = dictionaryResults[key][iterationLimit:]
-
-    return LexMax(dictionaryResults)
+        return 0
+    return iterationLimit
 
 
 if __name__ == "__main__":
@@ -0,0 +1,106 @@
+"""Docstring for ranking_benchmark.py module.
+
+This module compare the LexMax function of ranking.py with the reference implementation (the loop
+version it replaced). It check that both give the same ranking on random results with ties and
+infinite values, then print the time taken by both for a growing number of elements and results.
+
+usage : python ranking_benchmark.py [--repeat <n>]
+
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from ranking import LexMax
+
+
+def LexMaxReference(dictionnary: dict[str, list[float]]) -> dict[str, int]:
+    """Reference implementation of the LexMax algorithm, see `ranking.LexMax`."""
+    rankMatrix = np.zeros((len(dictionnary.keys()), len(list(dictionnary.values())[0])))
+    for i, key in enumerate(dictionnary.keys()):
+        for j, value in enumerate(dictionnary[key]):
+            rankMatrix[i, j] = value
+
+    for column in range(rankMatrix.shape[1]):
+        rankMatrix[:, column] = [
+            sorted(rankMatrix[:, column].tolist()).index(element)
+            for element in rankMatrix[:, column].tolist()
+        ]
+
+    VectorLibrary = {}
+    for i, key in enumerate(dictionnary.keys()):
+        VectorLibrary[key] = sorted(rankMatrix[i, :].tolist())
+
+    sortedListRank = sorted(VectorLibrary.items(), key=lambda item: item[1])
+    rk = 0
+    elementRank = {}
+    for i in range(len(sortedListRank)):
+        elementRank[sortedListRank[i][0]] = rk
+        if (
+            i < len(sortedListRank) - 1
+            and sortedListRank[i][1] != sortedListRank[i + 1][1]
+        ):
+            rk += 1
+    return elementRank
+
+
+def RandomResults(
+    nbElements: int, nbResults: int, rng: np.random.Generator
+) -> dict[str, list[float]]:
+    """Random results with ties (few distinct values) and infinite values (task not run)."""
+    values = rng.integers(
+        0, max(2, nbElements // 2), size=(nbElements, nbResults)
+    ).astype(np.float64)
+    values[rng.random(values.shape) < 0.05] = float("inf")
+    # some elements have exactly the same results
+    for i in range(0, nbElements - 1, 7):
+        values[i + 1] = values[i]
+    return {f"Library{i}": values[i].tolist() for i in range(nbElements)}
+
+
+def CheckSameRanking(nbTrials: int = 200, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    for _ in range(nbTrials):
+        results = RandomResults(int(rng.integers(1, 30)), int(rng.integers(0, 30)), rng)
+        expected = LexMaxReference(results)
+        obtained = LexMax(results)
+        # the order of the keys is the order of the ranking
+        assert list(expected.items()) == list(obtained.items()), (expected, obtained)
+    print(f"Same ranking on {nbTrials} random results")
+
+
+def Timeit(function, results, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(results)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the LexMax function.")
+    parser.add_argument("--repeat", type=int, default=3, help="number of repetitions")
+    args = parser.parse_args()
+
+    CheckSameRanking()
+
+    rng = np.random.default_rng(1)
+    print(
+        f"{'elements':>9} {'results':>8} {'reference (s)':>14} {'numpy (s)':>10} {'speedup':>8}"
+    )
+    for nbElements, nbResults in [
+        (3, 10),
+        (10, 100),
+        (50, 500),
+        (100, 1000),
+        (300, 3000),
+    ]:
+        results = RandomResults(nbElements, nbResults, rng)
+        reference = Timeit(LexMaxReference, results, args.repeat)
+        vectorized = Timeit(LexMax, results, args.repeat)
+        print(
+            f"{nbElements:>9} {nbResults:>8} {reference:>14.5f} {vectorized:>10.5f} {reference / vectorized:>7.1f}x"
+        )
@@ -0,0 +1,314 @@
+"""Docstring for resource_usage.py module.
+
+This module contains the function RunCommand, it run a shell command like `subprocess.run` and also
+measure the resources used by the process: the user and system CPU time, the peak resident memory, the
+page faults and the context switches.
+
+On the POSIX systems the child is reaped with `os.wait4` which give its `rusage`, the values include the
+children it waited for (like the interpreter started by the shell). On the other systems (Windows) the
+values are read with psutil on the finished process, before its handle is released.
+
+The peak values hide the spikes of memory and the bursts of I/O, the class TimelineSampler can also
+poll the resident memory and the bytes read and written by the process tree during the run.
+
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import psutil
+
+from logger import logger
+
+# the resources stored for each sample, next to the runtime
+RESOURCE_METRICS = [
+    "user_time",
+    "system_time",
+    "max_rss",
+    "major_faults",
+    "minor_faults",
+    "voluntary_switches",
+    "involuntary_switches",
+]
+
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+MAXRSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+# the series of a timeline, the time in seconds since the start, the memory and the I/O in bytes
+TIMELINE_SERIES = ["time", "rss", "read", "write"]
+DEFAULT_TIMELINE_POINTS = 64
+
+
+@dataclass
+class CompletedCommand:
+    """The result of a command run by `RunCommand`.
+
+    Attributes
+    ----------
+    returncode : int
+        The exit code of the command, negative if it was killed by a signal.
+    stdout, stderr : str
+        The outputs of the command.
+    elapsed : float
+        The wall time in seconds between the start of the command and the end of the process.
+    resources : dict of str and float or None
+        The value of each of `RESOURCE_METRICS` (times in seconds, memory in bytes), None if they could
+        not be measured. A single value can also be None if the platform doesn't give it.
+    timeline : dict of str and list or None
+        The downsampled series of `TIMELINE_SERIES` if a timeline was asked, see `TimelineSampler`.
+    """
+
+    returncode: int
+    stdout: str
+    stderr: str
+    elapsed: float
+    resources: dict = None
+    timeline: dict = None
+
+
+class TimelineSampler(threading.Thread):
+    """Thread polling the resident memory and the I/O of a process and its children at a fixed interval.
+
+    The I/O counters are cumulative, the bytes of the children which already ended are not counted
+    anymore. The I/O counters are not available on macOS, only the memory is sampled there.
+
+    Attributes
+    ----------
+    pid : int
+        The process sampled, with all its children.
+    interval : float
+        The time in seconds between two samples.
+    maxPoints : int
+        The number of points of the timeline once downsampled, see `Downsample`.
+    samples : dict of str and list
+        The raw samples of each of `TIMELINE_SERIES`.
+    """
+
+    def __init__(
+        self, pid: int, interval: float, maxPoints: int = DEFAULT_TIMELINE_POINTS
+    ):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.maxPoints = maxPoints
+        self.samples = {series: [] for series in TIMELINE_SERIES}
+        self.stopEvent = threading.Event()
+
+    def run(self) -> None:
+        start = time.perf_counter()
+        try:
+            root = psutil.Process(self.pid)
+        except psutil.Error:
+            return
+        while not self.stopEvent.is_set():
+            try:
+                processes = [root] + root.children(recursive=True)
+            except psutil.Error:
+                break
+            rss, read, write = 0, 0, 0
+            for process in processes:
+                try:
+                    with process.oneshot():
+                        rss += process.memory_info().rss
+                        if hasattr(process, "io_counters"):
+                            counters = process.io_counters()
+                            read += counters.read_bytes
+                            write += counters.write_bytes
+                except psutil.Error:
+                    continue
+            for series, value in zip(
+                TIMELINE_SERIES, [time.perf_counter() - start, rss, read, write]
+            ):
+                self.samples[series].append(value)
+            self.stopEvent.wait(self.interval)
+
+    def Stop(self) -> dict or None:
+        """Stop the sampling and return the downsampled timeline, None if nothing was sampled."""
+        self.stopEvent.set()
+        self.join()
+        if len(self.samples["time"]) == 0:
+            return None
+        return Downsample(self.samples, self.maxPoints)
+
+
+def Downsample(samples: dict[str, list], maxPoints: int) -> dict[str, list]:
+    """Reduce a timeline to at most `maxPoints` points.
+
+    The samples are split in consecutive buckets, the memory of a bucket is its maximum so the spikes are
+    kept, the time and the cumulative I/O are the last value of the bucket.
+    """
+    nbSamples = len(samples["time"])
+    if nbSamples <= maxPoints:
+        return {series: list(values) for series, values in samples.items()}
+    # the index of the first sample of each bucket
+    starts = np.linspace(0, nbSamples, maxPoints, endpoint=False).astype(np.int64)
+    ends = np.append(starts[1:], nbSamples) - 1
+    downsampled = {}
+    for series, values in samples.items():
+        values = np.asarray(values)
+        if series == "rss":
+            downsampled[series] = np.maximum.reduceat(values, starts).tolist()
+        else:
+            downsampled[series] = values[ends].tolist()
+    return downsampled
+
+
+def UsageFromRusage(rusage) -> dict:
+    """Convert the `rusage` of `os.wait4` to the values of `RESOURCE_METRICS`."""
+    return {
+        "user_time": rusage.ru_utime,
+        "system_time": rusage.ru_stime,
+        "max_rss": rusage.ru_maxrss * MAXRSS_UNIT,
+        "major_faults": rusage.ru_majflt,
+        "minor_faults": rusage.ru_minflt,
+        "voluntary_switches": rusage.ru_nvcsw,
+        "involuntary_switches": rusage.ru_nivcsw,
+    }
+
+
+def UsageFromPsutil(pid: int) -> dict or None:
+    """Read the values of `RESOURCE_METRICS` of a finished process with psutil (Windows).
+
+    Windows doesn't split the page faults, they are all counted as minor faults.
+    """
+    try:
+        process = psutil.Process(pid)
+        times = process.cpu_times()
+        memory = process.memory_info()
+        switches = process.num_ctx_switches()
+    except psutil.Error as e:
+        logger.debug(f"Resources of the process {pid} not available : {e}")
+        return None
+    return {
+        "user_time": times.user,
+        "system_time": times.system,
+        "max_rss": getattr(memory, "peak_wset", memory.rss),
+        "major_faults": None,
+        "minor_faults": getattr(memory, "num_page_faults", None),
+        "voluntary_switches": switches.voluntary,
+        "involuntary_switches": switches.involuntary,
+    }
+
+
+def RunCommand(
+    command: str,
+    timeout: float,
+    timelineInterval: float = None,
+    timelinePoints: int = DEFAULT_TIMELINE_POINTS,
+) -> CompletedCommand:
+    """Run a shell command and measure the resources it used.
+
+    Parameters
+    ----------
+    command : str
+        The command, run with the shell.
+    timeout : float
+        The maximum time in seconds of the command, the whole process group is killed after it.
+    timelineInterval : float, optional
+        If given, the memory and the I/O of the command are sampled every `timelineInterval` seconds.
+    timelinePoints : int, default=DEFAULT_TIMELINE_POINTS
+        The number of points of the timeline once downsampled.
+
+    Returns
+    -------
+    CompletedCommand
+        The exit code, the outputs, the wall time and the resources of the command.
+
+    Raises
+    ------
+    subprocess.TimeoutExpired
+        If the command was killed after `timeout` seconds.
+    """
+    if not hasattr(os, "wait4"):
+        return RunCommandPsutil(command, timeout, timelineInterval, timelinePoints)
+
+    # the outputs go to files, a pipe would block the child once full since nobody read it while we wait
+    with tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            command, shell=True, stdout=stdout, stderr=stderr, start_new_session=True
+        )
+        sampler = StartSampler(process.pid, timelineInterval, timelinePoints)
+        timedOut = threading.Event()
+
+        def Kill() -> None:
+            timedOut.set()
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+        timer = threading.Timer(timeout, Kill)
+        timer.start()
+        try:
+            _, status, rusage = os.wait4(process.pid, 0)
+        finally:
+            timer.cancel()
+        end = time.perf_counter()
+        timeline = sampler.Stop() if sampler is not None else None
+        # the process is reaped, Popen must not wait for it anymore
+        process.returncode = os.waitstatus_to_exitcode(status)
+
+        if timedOut.is_set():
+            raise subprocess.TimeoutExpired(command, timeout)
+
+        stdout.seek(0)
+        stderr.seek(0)
+        return CompletedCommand(
+            process.returncode,
+            stdout.read().decode(errors="replace"),
+            stderr.read().decode(errors="replace"),
+            end - start,
+            UsageFromRusage(rusage),
+            timeline,
+        )
+
+
+def StartSampler(
+    pid: int, interval: float or None, maxPoints: int
+) -> TimelineSampler or None:
+    """Start a `TimelineSampler` on a process if an interval is given."""
+    if interval is None:
+        return None
+    sampler = TimelineSampler(pid, interval, maxPoints)
+    sampler.start()
+    return sampler
+
+
+def RunCommandPsutil(
+    command: str,
+    timeout: float,
+    timelineInterval: float = None,
+    timelinePoints: int = DEFAULT_TIMELINE_POINTS,
+) -> CompletedCommand:
+    """`RunCommand` for the platforms without `os.wait4`, the resources are read with psutil."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    sampler = StartSampler(process.pid, timelineInterval, timelinePoints)
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        raise
+    finally:
+        timeline = sampler.Stop() if sampler is not None else None
+    end = time.perf_counter()
+    # the handle of the process is still open, the values of the finished process can be read
+    return CompletedCommand(
+        process.returncode,
+        stdout,
+        stderr,
+        end - start,
+        UsageFromPsutil(process.pid),
+        timeline,
+    )
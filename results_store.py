@@ -0,0 +1,627 @@
+"""Docstring for results_store.py module.
+
+This module contains the class ResultStore, an append-only store of the samples of the benchmark.
+Instead of a nested dictionary rewritten at the end of the benchmark, every sample is a row of typed
+columns (library, task, argument, sweep, run id, phase, value, status) appended as soon as its cell is
+finished. The store is a SQLite database so it only needs the standard library, and the results can
+still be exported to the json format of the benchmark. The timelines of memory and I/O of the samples are
+not scalar values, they are stored as json in their own table.
+
+The samples can be read as typed columns (`ReadColumns`) or, for the site, straight into the arrays of
+the tasks (`ReadTarget`) without going through the json format of the store (`ToDict`).
+
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+
+from logger import logger
+from resource_usage import RESOURCE_METRICS
+
+# status code of a sample, the strings are the values used in the json file (see Benchmark)
+STATUS_OK = 0
+STATUS_ERROR = 1
+STATUS_TIMEOUT = 2
+STATUS_NOT_RUN = 3
+STATUS_MISSING = 4
+
+STATUS_BY_VALUE = {
+    "Error": STATUS_ERROR,
+    "Timeout": STATUS_TIMEOUT,
+    "NotRun": STATUS_NOT_RUN,
+}
+VALUE_BY_STATUS = {status: value for value, status in STATUS_BY_VALUE.items()}
+
+PHASE_BEFORE_RUN = "before_run"
+PHASE_RUN = "run"
+# the evaluation functions are stored with the phase "evaluation.<function>"
+PHASE_EVALUATION = "evaluation."
+# the resources of a sample are stored with the phase "resource.<metric>" (see resource_usage.py)
+PHASE_RESOURCE = "resource."
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    library TEXT NOT NULL,
+    task TEXT NOT NULL,
+    argument TEXT NOT NULL,
+    sweep INTEGER NOT NULL,
+    run_id INTEGER NOT NULL,
+    phase TEXT NOT NULL,
+    value REAL,
+    status INTEGER NOT NULL,
+    fingerprint TEXT
+);
+CREATE INDEX IF NOT EXISTS samples_cell ON samples (library, task, argument);
+CREATE TABLE IF NOT EXISTS cells (
+    library TEXT NOT NULL,
+    task TEXT NOT NULL,
+    argument TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    theme TEXT NOT NULL,
+    fingerprint TEXT,
+    status INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (library, task, argument)
+);
+CREATE TABLE IF NOT EXISTS timelines (
+    library TEXT NOT NULL,
+    task TEXT NOT NULL,
+    argument TEXT NOT NULL,
+    sweep INTEGER NOT NULL,
+    run_id INTEGER NOT NULL,
+    timeline TEXT NOT NULL,
+    fingerprint TEXT
+);
+CREATE INDEX IF NOT EXISTS timelines_cell ON timelines (library, task, argument);
+"""
+
+
+def EncodeValue(value) -> tuple[float or None, int]:
+    """Split a value of the json file into a float and a status code."""
+    if isinstance(value, str):
+        return None, STATUS_BY_VALUE.get(value, STATUS_ERROR)
+    if value is None:
+        return None, STATUS_MISSING
+    return float(value), STATUS_OK
+
+
+def DecodeValue(value: float or None, status: int):
+    """Inverse of `EncodeValue`."""
+    if status == STATUS_OK:
+        return value
+    return VALUE_BY_STATUS.get(status, None)
+
+
+class ResultStore:
+    """Append-only store of the samples of the benchmark.
+
+    Attributes
+    ----------
+    path : Path
+        The path to the database.
+    connection : sqlite3.Connection
+        The connection to the database.
+    sweep : int
+        The id of the current run of the benchmark, the samples appended are tagged with it.
+    """
+
+    def __init__(self, path: str, readOnly: bool = False) -> None:
+        self.path = Path(path)
+        if readOnly:
+            self.connection = sqlite3.connect(
+                f"file:{self.path.absolute().as_posix()}?mode=ro", uri=True
+            )
+        else:
+            self.connection = sqlite3.connect(self.path)
+            # the readers are not blocked by the writer
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript(SCHEMA)
+
+        self.sweep = self.connection.execute(
+            "SELECT COALESCE(MAX(sweep) + 1, 0) FROM samples"
+        ).fetchone()[0]
+        logger.info(f"Result store {self.path} opened (sweep {self.sweep})")
+
+    def Close(self) -> None:
+        self.connection.close()
+
+    def IsEmpty(self) -> bool:
+        return self.connection.execute("SELECT COUNT(*) FROM cells").fetchone()[0] == 0
+
+    def SetCell(
+        self,
+        libraryName: str,
+        taskName: str,
+        argument: str,
+        position: int,
+        theme: str,
+        fingerprint: str,
+        status: int = STATUS_OK,
+    ) -> None:
+        """Create or update the description of a (library, task, argument).
+
+        The samples appended with another fingerprint are not read anymore.
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO cells VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (libraryName, taskName, argument, position, theme, fingerprint, status),
+            )
+
+    def AppendCell(
+        self,
+        libraryName: str,
+        taskName: str,
+        argument: str,
+        fingerprint: str,
+        samples: list[list],
+        evaluation: dict[str, object] = None,
+        resources: list[dict or None] = None,
+        timelines: list[dict or None] = None,
+        sweep: int = None,
+    ) -> None:
+        """Append the samples of a (library, task, argument) in one transaction.
+
+        Parameters
+        ----------
+        libraryName, taskName, argument : str
+            The cell of the samples.
+        fingerprint : str
+            The fingerprint of the inputs of the cell.
+        samples : list of list
+            The samples ``[beforeRun, run]``, the values are strings if an error occured.
+        evaluation : dict of str and object, optional
+            The value of each evaluation function.
+        resources : list of dict or None, optional
+            The resources used by each sample, None for the samples without them.
+        timelines : list of dict or None, optional
+            The memory and I/O timeline of each sample, None for the samples without them.
+        sweep : int, optional
+            The run of the benchmark of the samples, by default the current one.
+        """
+        sweep = self.sweep if sweep is None else sweep
+        rows = []
+        for runId, sample in enumerate(samples):
+            for phase, value in zip([PHASE_BEFORE_RUN, PHASE_RUN], sample):
+                rows.append(
+                    (libraryName, taskName, argument, sweep, runId, phase)
+                    + EncodeValue(value)
+                    + (fingerprint,)
+                )
+        for runId, usage in enumerate(resources or []):
+            for metric, value in (usage or {}).items():
+                rows.append(
+                    (
+                        libraryName,
+                        taskName,
+                        argument,
+                        sweep,
+                        runId,
+                        PHASE_RESOURCE + metric,
+                    )
+                    + EncodeValue(value)
+                    + (fingerprint,)
+                )
+        for function, value in (evaluation or {}).items():
+            rows.append(
+                (libraryName, taskName, argument, sweep, 0, PHASE_EVALUATION + function)
+                + EncodeValue(value)
+                + (fingerprint,)
+            )
+        timelineRows = [
+            (
+                libraryName,
+                taskName,
+                argument,
+                sweep,
+                runId,
+                json.dumps(timeline),
+                fingerprint,
+            )
+            for runId, timeline in enumerate(timelines or [])
+            if timeline is not None
+        ]
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self.connection.executemany(
+                "INSERT INTO timelines VALUES (?, ?, ?, ?, ?, ?, ?)", timelineRows
+            )
+
+    def ImportResults(self, results: dict) -> None:
+        """Fill the store with the results of the json format of the benchmark.
+
+        Each entry of the evaluation lists is considered as a previous run of the benchmark. The samples of
+        the results written before `nb_samples` existed are split evenly between these runs.
+        """
+        for libraryName, tasks in results.items():
+            for taskName, task in tasks.items():
+                for position, (argument, result) in enumerate(task["results"].items()):
+                    runtime = result["runtime"]
+                    self.SetCell(
+                        libraryName,
+                        taskName,
+                        argument,
+                        position,
+                        task["theme"],
+                        result.get("fingerprint"),
+                        STATUS_BY_VALUE.get(runtime, STATUS_ERROR)
+                        if isinstance(runtime, str)
+                        else STATUS_OK,
+                    )
+                    if isinstance(runtime, str):
+                        continue
+
+                    evaluation = result.get("evaluation", {})
+                    # the samples of each previous run are split with nb_samples when it is known,
+                    # otherwise each run added the same number of samples and one value to each evaluation
+                    sizes = result.get("nb_samples")
+                    if sizes is None:
+                        nbSweeps = max(
+                            [len(values) for values in evaluation.values()] + [1]
+                        )
+                        size, extra = divmod(len(runtime), nbSweeps)
+                        sizes = [size + (sweep < extra) for sweep in range(nbSweeps)]
+                    resources = result.get("resources", [])
+                    timelines = result.get("timeline", [])
+                    start = 0
+                    for sweep, size in enumerate(sizes):
+                        self.AppendCell(
+                            libraryName,
+                            taskName,
+                            argument,
+                            result.get("fingerprint"),
+                            runtime[start : start + size],
+                            {
+                                function: values[sweep]
+                                for function, values in evaluation.items()
+                                if sweep < len(values)
+                            },
+                            resources[start : start + size],
+                            timelines[start : start + size],
+                            sweep=sweep - len(sizes),
+                        )
+                        start += size
+
+    def ReadColumns(
+        self, libraryName: str = None, taskName: str = None
+    ) -> dict[str, np.ndarray]:
+        """Read the current samples as columns.
+
+        Only the samples with the current fingerprint of their cell are returned.
+
+        Parameters
+        ----------
+        libraryName : str, optional
+            Only read the samples of this library.
+        taskName : str, optional
+            Only read the samples of this task.
+
+        Returns
+        -------
+        dict of str and np.ndarray
+            The columns library, task, argument, sweep, run_id, phase, value and status.
+        """
+        query = (
+            "SELECT s.library, s.task, s.argument, s.sweep, s.run_id, s.phase, s.value, s.status "
+            "FROM samples s JOIN cells c ON s.library = c.library AND s.task = c.task "
+            "AND s.argument = c.argument AND s.fingerprint IS c.fingerprint"
+        )
+        conditions, parameters = [], []
+        if libraryName is not None:
+            conditions.append("s.library = ?")
+            parameters.append(libraryName)
+        if taskName is not None:
+            conditions.append("s.task = ?")
+            parameters.append(taskName)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY s.library, s.task, c.position, s.sweep, s.run_id, s.phase"
+
+        rows = self.connection.execute(query, parameters).fetchall()
+        names = [
+            "library",
+            "task",
+            "argument",
+            "sweep",
+            "run_id",
+            "phase",
+            "value",
+            "status",
+        ]
+        columns = list(zip(*rows)) if rows else [[] for _ in names]
+        return {
+            "library": np.array(columns[0], dtype=object),
+            "task": np.array(columns[1], dtype=object),
+            "argument": np.array(columns[2], dtype=object),
+            "sweep": np.array(columns[3], dtype=np.int64),
+            "run_id": np.array(columns[4], dtype=np.int64),
+            "phase": np.array(columns[5], dtype=object),
+            "value": np.array(
+                [np.nan if value is None else value for value in columns[6]],
+                dtype=np.float64,
+            ),
+            "status": np.array(columns[7], dtype=np.uint8),
+        }
+
+    def ToDict(self) -> dict:
+        """Export the current samples in the json format of the benchmark."""
+        results = {}
+        cells = self.connection.execute(
+            "SELECT library, task, argument, theme, fingerprint, status FROM cells ORDER BY rowid"
+        ).fetchall()
+        for libraryName, taskName, argument, theme, fingerprint, status in cells:
+            task = results.setdefault(libraryName, {}).setdefault(
+                taskName, {"theme": theme, "results": {}}
+            )
+            task["results"][argument] = {
+                "runtime": VALUE_BY_STATUS[status] if status != STATUS_OK else [],
+                "fingerprint": fingerprint,
+            }
+
+        columns = self.ReadColumns()
+        sweeps = {}
+        resources = {}
+        timelines = self.ReadTimelines()
+        for i in range(len(columns["phase"])):
+            cell = (columns["library"][i], columns["task"][i], columns["argument"][i])
+            result = results[cell[0]][cell[1]]["results"][cell[2]]
+            value = DecodeValue(columns["value"][i].item(), int(columns["status"][i]))
+            phase = columns["phase"][i]
+            sweep = int(columns["sweep"][i])
+            if phase.startswith(PHASE_EVALUATION):
+                function = phase[len(PHASE_EVALUATION) :]
+                result.setdefault("evaluation", {}).setdefault(function, []).append(
+                    value
+                )
+                continue
+            if isinstance(result["runtime"], str):
+                continue
+            runId = int(columns["run_id"][i])
+            if phase.startswith(PHASE_RESOURCE):
+                usage = (
+                    resources.setdefault(cell, {})
+                    .setdefault(sweep, {})
+                    .setdefault(runId, {})
+                )
+                usage[phase[len(PHASE_RESOURCE) :]] = value
+                continue
+            samples = sweeps.setdefault(cell, {}).setdefault(sweep, {})
+            samples.setdefault(runId, [None, None])[
+                0 if phase == PHASE_BEFORE_RUN else 1
+            ] = value
+
+        for (libraryName, taskName, argument), samplesBySweep in sweeps.items():
+            result = results[libraryName][taskName]["results"][argument]
+            for sweep in sorted(samplesBySweep):
+                samples = samplesBySweep[sweep]
+                result["runtime"].extend(samples[runId] for runId in sorted(samples))
+                result.setdefault("nb_samples", []).append(len(samples))
+                if (libraryName, taskName, argument) in resources:
+                    usages = resources[(libraryName, taskName, argument)].get(sweep, {})
+                    result.setdefault("resources", []).extend(
+                        usages.get(runId) for runId in sorted(samples)
+                    )
+                if (libraryName, taskName, argument) in timelines:
+                    runs = timelines[(libraryName, taskName, argument)].get(sweep, {})
+                    result.setdefault("timeline", []).extend(
+                        runs.get(runId) for runId in sorted(samples)
+                    )
+        return results
+
+    def ReadTimelines(self) -> dict[tuple, dict[int, dict[int, dict]]]:
+        """Read the current timelines, by (library, task, argument), sweep and run id."""
+        try:
+            rows = self.connection.execute(
+                "SELECT t.library, t.task, t.argument, t.sweep, t.run_id, t.timeline "
+                "FROM timelines t JOIN cells c ON t.library = c.library AND t.task = c.task "
+                "AND t.argument = c.argument AND t.fingerprint IS c.fingerprint"
+            ).fetchall()
+        except sqlite3.OperationalError:
+            # a store opened read-only and written before the timelines existed
+            return {}
+        timelines = {}
+        for libraryName, taskName, argument, sweep, runId, timeline in rows:
+            timelines.setdefault((libraryName, taskName, argument), {}).setdefault(
+                sweep, {}
+            )[runId] = json.loads(timeline)
+        return timelines
+
+    def ReadTarget(
+        self, libraryName: str, taskName: str, timelines: dict = None
+    ) -> dict:
+        """Read the current results of a (library, task) into the arrays used by `Task`.
+
+        The samples of the runtime and of the resources are read with one query ordered by argument, sweep
+        and run id and placed in the arrays with numpy. The samples of all the sweeps of an argument follow
+        each other, as in the json format of the benchmark.
+
+        Parameters
+        ----------
+        libraryName, taskName : str
+            The target to read.
+        timelines : dict, optional
+            The timelines returned by `ReadTimelines`, read if not given.
+
+        Returns
+        -------
+        dict
+            ``arguments``: the labels of the arguments, in the order of their position.
+            ``runtime``: the arrays ``(values, status)`` of `Task.EncodeRuntime`.
+            ``resources``: the arrays of `Task.EncodeResources`, None if no sample has resources.
+            ``evaluation``: for each argument the values of each evaluation function (None if it has none),
+            None if the first argument has none.
+            ``timeline``: for each argument the timeline of each sample (None if it has none), None if no
+            sample has a timeline.
+        """
+        cells = self.connection.execute(
+            "SELECT argument, position, status FROM cells WHERE library = ? AND task = ? "
+            "ORDER BY position, rowid",
+            (libraryName, taskName),
+        ).fetchall()
+        arguments = [argument for argument, _, _ in cells]
+        positions = np.array([position for _, position, _ in cells], dtype=np.int64)
+        cellStatus = np.array([status for _, _, status in cells], dtype=np.uint8)
+
+        rows = self.connection.execute(
+            "SELECT c.position, s.sweep, s.run_id, s.phase, s.value, s.status "
+            "FROM samples s JOIN cells c ON s.library = c.library AND s.task = c.task "
+            "AND s.argument = c.argument AND s.fingerprint IS c.fingerprint "
+            "WHERE s.library = ? AND s.task = ? AND c.status = ? "
+            "AND (s.phase IN (?, ?) OR s.phase LIKE ?) "
+            "ORDER BY c.position, s.sweep, s.run_id, s.phase",
+            (
+                libraryName,
+                taskName,
+                STATUS_OK,
+                PHASE_BEFORE_RUN,
+                PHASE_RUN,
+                PHASE_RESOURCE + "%",
+            ),
+        ).fetchall()
+        columns = list(zip(*rows)) if rows else [[] for _ in range(6)]
+        keys = np.array(columns[:3], dtype=np.int64).T.reshape(-1, 3)
+        phases = np.array(columns[3], dtype=object)
+        rowValues = np.array(columns[4], dtype=np.float64)
+        rowStatus = np.array(columns[5], dtype=np.uint8)
+        isRun = phases == PHASE_RUN
+        isRuntime = isRun | (phases == PHASE_BEFORE_RUN)
+
+        # the rows of a (argument, sweep, run id) form a group, the groups with a runtime are the samples
+        isNewGroup = np.ones(len(rows), dtype=bool)
+        isNewGroup[1:] = (keys[1:] != keys[:-1]).any(axis=1)
+        group = np.cumsum(isNewGroup) - 1
+        isSample = np.bincount(group, weights=isRuntime).astype(bool)
+        groupArgument = np.searchsorted(positions, keys[isNewGroup, 0])
+        nbSamplesByArgument = np.bincount(groupArgument[isSample], minlength=len(cells))
+        firstSample = np.cumsum(nbSamplesByArgument) - nbSamplesByArgument
+        groupSample = np.cumsum(isSample) - 1 - firstSample[groupArgument]
+        rowArgument, rowSample = groupArgument[group], groupSample[group]
+
+        nbSamples = max(nbSamplesByArgument.max(initial=0), 1)
+        values = np.full((len(cells), nbSamples, 2), np.nan)
+        status = np.full(values.shape, STATUS_MISSING, dtype=np.uint8)
+        # the before run is the column 0 and the run the column 1
+        index = (
+            rowArgument[isRuntime],
+            rowSample[isRuntime],
+            isRun[isRuntime].astype(np.int64),
+        )
+        values[index] = rowValues[isRuntime]
+        status[index] = rowStatus[isRuntime]
+        isFailed = cellStatus != STATUS_OK
+        status[isFailed] = cellStatus[isFailed, None, None]
+
+        resources = None
+        isResource = ~isRuntime & isSample[group]
+        if isResource.any():
+            resources = {}
+            for metric in RESOURCE_METRICS:
+                resources[metric] = np.full((len(cells), nbSamples), np.nan)
+                selected = (
+                    isResource
+                    & (phases == PHASE_RESOURCE + metric)
+                    & (rowStatus == STATUS_OK)
+                )
+                resources[metric][
+                    rowArgument[selected], rowSample[selected]
+                ] = rowValues[selected]
+            resources["cpu_time"] = resources["user_time"] + resources["system_time"]
+
+        # a few values of evaluation by argument
+        evaluation = [None] * len(cells)
+        rows = self.connection.execute(
+            "SELECT c.position, s.phase, s.value, s.status "
+            "FROM samples s JOIN cells c ON s.library = c.library AND s.task = c.task "
+            "AND s.argument = c.argument AND s.fingerprint IS c.fingerprint "
+            "WHERE s.library = ? AND s.task = ? AND s.phase LIKE ? "
+            "ORDER BY c.position, s.sweep, s.run_id, s.phase",
+            (libraryName, taskName, PHASE_EVALUATION + "%"),
+        )
+        for position, phase, value, code in rows:
+            i = int(np.searchsorted(positions, position))
+            evaluation[i] = evaluation[i] or {}
+            evaluation[i].setdefault(phase[len(PHASE_EVALUATION) :], []).append(
+                DecodeValue(value, code)
+            )
+        if not cells or evaluation[0] is None:
+            evaluation = None
+
+        timelines = self.ReadTimelines() if timelines is None else timelines
+        timeline = [None] * len(cells)
+        sampleKeys = keys[isNewGroup][isSample]
+        for i, argument in enumerate(arguments):
+            runs = timelines.get((libraryName, taskName, argument))
+            if runs is None or nbSamplesByArgument[i] == 0:
+                continue
+            timeline[i] = [
+                runs.get(int(sweep), {}).get(int(runId))
+                for _, sweep, runId in sampleKeys[
+                    firstSample[i] : firstSample[i] + nbSamplesByArgument[i]
+                ]
+            ]
+        if all(timelines is None for timelines in timeline):
+            timeline = None
+
+        return {
+            "arguments": arguments,
+            "runtime": (values, status),
+            "resources": resources,
+            "evaluation": evaluation,
+            "timeline": timeline,
+        }
+
+    def ExportJson(self, outputFileName: str) -> None:
+        """Export the current samples in a json file with the format of the benchmark."""
+        with open(outputFileName, "w") as file:
+            json.dump(self.ToDict(), file, indent=4)
+        logger.info(f"Result store exported in {outputFileName}")
+
+
+def FileReaderStore(filename: str) -> None:
+    """Read a result store and create the python object.
+
+    The samples of each (library, task) are read straight into the arrays of `Task` with `ReadTarget`,
+    without going through the json format of the benchmark.
+
+    Parameters
+    ----------
+    filename : str
+        The path to the database.
+
+    """
+    from json_to_python_object import TokenizeArguments
+    from library import Library
+    from task import Task
+
+    store = ResultStore(filename, readOnly=True)
+    timelines = store.ReadTimelines()
+    targets = store.connection.execute(
+        "SELECT library, task, theme FROM cells GROUP BY library, task ORDER BY MIN(rowid)"
+    ).fetchall()
+    libraries = {}
+    for libraryName, taskName, theme in targets:
+        if libraryName not in libraries:
+            libraries[libraryName] = Library(libraryName)
+        task = Task.GetTaskByName(taskName)
+        if task is None:
+            task = Task(taskName, theme)
+        logger.info(f"Task {taskName} with {libraryName} library")
+
+        target = store.ReadTarget(libraryName, taskName, timelines)
+        logger.debug(f"arguments: {len(target['arguments'])}")
+        task.arguments_label = target["arguments"]
+        task.arguments.extend(TokenizeArguments(task.arguments_label))
+        task.SetResults(
+            libraryName,
+            None,
+            target["evaluation"],
+            timeline=target["timeline"],
+            encodedRuntime=target["runtime"],
+            encodedResources=target["resources"],
+        )
+        libraries[libraryName].AddTask(task)
+    store.Close()
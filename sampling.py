@@ -0,0 +1,159 @@
+"""Docstring for sampling.py module.
+
+This module contains the statistical functions used to decide if enough samples have been taken.
+
+"""
+
+import math
+from functools import lru_cache
+from statistics import NormalDist
+
+import numpy as np
+
+
+# up to this number of degrees of freedom the quantile is computed exactly, above the Cornish-Fisher
+# expansion is used (its relative error is under 1e-5 there)
+EXACT_QUANTILE_MAX_DOF = 30
+
+
+def StudentProbability(t: float, degreesOfFreedom: int) -> float:
+    """Two-sided probability P(-t < T < t) of the Student's t-distribution.
+
+    The probability is computed with the finite series of Abramowitz and Stegun (26.7.3 and 26.7.4),
+    the series has about ``degreesOfFreedom / 2`` terms.
+
+    Parameters
+    ----------
+    t : float
+        The non-negative bound of the interval.
+    degreesOfFreedom : int
+        The number of degrees of freedom.
+
+    Returns
+    -------
+    float
+        The probability of the interval.
+
+    Examples
+    --------
+    >>> round(StudentProbability(1.0, 1), 2)
+    0.5
+    """
+    theta = math.atan(t / math.sqrt(degreesOfFreedom))
+    cos2 = math.cos(theta) ** 2
+    if degreesOfFreedom % 2 == 1:
+        # with one degree of freedom the probability is 2 * theta / pi
+        term = 1.0
+        total = 1.0 if degreesOfFreedom > 1 else 0.0
+        for k in range(3, degreesOfFreedom, 2):
+            term *= (k - 1) / k * cos2
+            total += term
+        return 2 / math.pi * (theta + math.sin(theta) * math.cos(theta) * total)
+    term, total = 1.0, 1.0
+    for k in range(2, degreesOfFreedom - 1, 2):
+        term *= (k - 1) / k * cos2
+        total += term
+    return math.sin(theta) * total
+
+
+@lru_cache(maxsize=None)
+def StudentQuantile(confidence: float, degreesOfFreedom: int) -> float:
+    """Two-sided quantile of the Student's t-distribution.
+
+    Up to `EXACT_QUANTILE_MAX_DOF` degrees of freedom the quantile is found by bisection on
+    `StudentProbability`, the few samples taken by the adaptive sampling are where the approximations
+    are the least precise (the Cornish-Fisher expansion is 3% low at 2 degrees of freedom, which would
+    give too narrow intervals). Above, the Cornish-Fisher expansion of the normal quantile is used.
+
+    Parameters
+    ----------
+    confidence : float
+        The confidence level, 0.95 for a 95% confidence interval.
+    degreesOfFreedom : int
+        The number of degrees of freedom (number of samples - 1).
+
+    Returns
+    -------
+    float
+        The value t such that P(-t < T < t) = confidence.
+
+    Examples
+    --------
+    >>> round(StudentQuantile(0.95, 10), 2)
+    2.23
+    >>> round(StudentQuantile(0.95, 2), 3)
+    4.303
+    """
+    if degreesOfFreedom <= 0:
+        return math.inf
+    nu = degreesOfFreedom
+    if nu <= EXACT_QUANTILE_MAX_DOF:
+        low, high = 0.0, 1.0
+        while StudentProbability(high, nu) < confidence:
+            low, high = high, 2 * high
+        for _ in range(100):
+            middle = (low + high) / 2
+            if StudentProbability(middle, nu) < confidence:
+                low = middle
+            else:
+                high = middle
+            if high - low <= 1e-12 * high:
+                break
+        return (low + high) / 2
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    return (
+        z
+        + (z**3 + z) / (4 * nu)
+        + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * nu**2)
+        + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * nu**3)
+    )
+
+
+def ConfidenceInterval(samples, confidence: float = 0.95) -> float:
+    """Half-width of the confidence interval of the mean of the samples.
+
+    Parameters
+    ----------
+    samples : array_like of float
+        The samples.
+    confidence : float, default=0.95
+        The confidence level.
+
+    Returns
+    -------
+    float
+        The half-width of the interval, infinity if there is less than 2 samples.
+    """
+    samples = np.asarray(samples, dtype=np.float64)
+    if samples.size < 2:
+        return math.inf
+    return StudentQuantile(confidence, samples.size - 1) * (
+        samples.std(ddof=1) / math.sqrt(samples.size)
+    )
+
+
+def RelativeConfidenceInterval(samples, confidence: float = 0.95) -> float:
+    """Half-width of the confidence interval of the mean divided by the mean.
+
+    Parameters
+    ----------
+    samples : array_like of float
+        The samples.
+    confidence : float, default=0.95
+        The confidence level.
+
+    Returns
+    -------
+    float
+        The relative half-width, infinity if it can't be computed.
+
+    Examples
+    --------
+    >>> RelativeConfidenceInterval([1.0, 1.0, 1.0])
+    0.0
+    """
+    samples = np.asarray(samples, dtype=np.float64)
+    if samples.size < 2 or samples.mean() == 0:
+        return math.inf
+    return ConfidenceInterval(samples, confidence) / abs(samples.mean())
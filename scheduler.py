@@ -0,0 +1,407 @@
+"""Docstring for scheduler.py module.
+
+This module contains the class Scheduler and the classes Cell and Job used to run the benchmark
+on a pool of workers. A job is a single repetition of a task for a library and an argument, a cell
+gather all the repetitions of a (library, task, argument).
+
+"""
+
+import os
+import queue
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from logger import logger
+from sampling import RelativeConfidenceInterval
+
+
+@dataclass
+class Job:
+    """A single repetition of a task for a library and an argument.
+
+    Attributes
+    ----------
+    libraryName : str
+        The name of the library.
+    taskName : str
+        The name of the task.
+    argument : str
+        The argument given to the scripts.
+    runId : int
+        The index of the repetition inside the cell.
+    """
+
+    libraryName: str
+    taskName: str
+    argument: str
+    runId: int
+
+
+@dataclass
+class Cell:
+    """All the repetitions of a task for a library and an argument.
+
+    The cell give the jobs to run one by one and collect the samples. Once a repetition has failed
+    no more job is given, the samples are then kept up to the first failure (ordered by run id) so the
+    result doesn't depend on the order in which the jobs finished.
+
+    Attributes
+    ----------
+    libraryName : str
+        The name of the library.
+    taskName : str
+        The name of the task.
+    argument : str
+        The argument given to the scripts.
+    taskPath : Path
+        The path to the folder of the task.
+    timeout : int
+        The timeout in seconds of each command.
+    nbRuns : int
+        The number of repetitions to run.
+    samples : dict of int and list
+        The samples ``[beforeRun, run]`` indexed by their run id.
+    resources : dict of int and dict
+        The resources used by the run script of each sample (see `resource_usage.py`) indexed by their run id.
+    timelines : dict of int and dict
+        The memory and I/O timeline of the run script of each sample indexed by their run id, if sampled.
+    """
+
+    libraryName: str
+    taskName: str
+    argument: str
+    taskPath: Path
+    timeout: int
+    nbRuns: int
+    samples: dict[int, list] = field(default_factory=dict)
+    resources: dict[int, dict] = field(default_factory=dict)
+    timelines: dict[int, dict] = field(default_factory=dict)
+    nbSubmitted: int = 0
+    nbRunning: int = 0
+    failed: bool = False
+
+    @property
+    def key(self) -> tuple[str, str, str]:
+        return (self.libraryName, self.taskName, self.argument)
+
+    def NextJob(self) -> Job or None:
+        """Give the next job to run or None if there is nothing to run for now."""
+        if self.failed or self.nbSubmitted >= self.nbRuns:
+            return None
+        job = Job(self.libraryName, self.taskName, self.argument, self.nbSubmitted)
+        self.nbSubmitted += 1
+        self.nbRunning += 1
+        return job
+
+    def AddSample(self, runId: int, sample: list) -> None:
+        """Store the sample of a finished job."""
+        self.nbRunning -= 1
+        self.samples[runId] = sample
+        if any(isinstance(value, str) for value in sample):
+            self.failed = True
+
+    def AddResources(self, runId: int, resources: dict, timeline: dict = None) -> None:
+        """Store the resources and the timeline of a job, called by the worker running it (nothing is stored if empty)."""
+        if resources:
+            self.resources[runId] = resources
+        if timeline:
+            self.timelines[runId] = timeline
+
+    def IsComplete(self) -> bool:
+        return self.nbRunning == 0 and (self.failed or self.nbSubmitted >= self.nbRuns)
+
+    def GetSamples(self) -> list[list]:
+        """Getter for the samples ordered by run id, stopping at the first failure."""
+        samples = []
+        for runId in sorted(self.samples):
+            samples.append(self.samples[runId])
+            if any(isinstance(value, str) for value in self.samples[runId]):
+                break
+        return samples
+
+    def GetResources(self) -> list[dict or None]:
+        """Getter for the resources of the samples returned by `GetSamples`, None if a sample has none."""
+        return [
+            self.resources.get(runId)
+            for runId in sorted(self.samples)[: len(self.GetSamples())]
+        ]
+
+    def GetTimelines(self) -> list[dict or None]:
+        """Getter for the timelines of the samples returned by `GetSamples`, None if a sample has none."""
+        return [
+            self.timelines.get(runId)
+            for runId in sorted(self.samples)[: len(self.GetSamples())]
+        ]
+
+
+@dataclass
+class AdaptiveCell(Cell):
+    """A cell that stop giving jobs once the mean runtime is known precisely enough.
+
+    The repetitions are run until the relative half-width of the confidence interval of the mean
+    runtime is under `targetRelativeCI`, with at least `minRuns` and at most `nbRuns` repetitions or
+    until `timeBudget` seconds have been spent on the cell. Once `minRuns` repetitions have been
+    given, the next job is only given when the previous ones are finished so the decision is taken on
+    all the samples.
+
+    Attributes
+    ----------
+    minRuns : int
+        The minimum number of repetitions.
+    targetRelativeCI : float
+        The targeted relative half-width of the confidence interval.
+    confidence : float
+        The confidence level of the interval.
+    timeBudget : float or None
+        The maximum time in seconds spent on the cell, None for no limit.
+    """
+
+    minRuns: int = 3
+    targetRelativeCI: float = 0.05
+    confidence: float = 0.95
+    timeBudget: float = None
+    startTime: float = None
+
+    def GetRuntimes(self) -> list[float]:
+        """Getter for the runtimes (run - before run) of the successful samples."""
+        return [
+            sample[1] - sample[0]
+            for sample in self.samples.values()
+            if not any(isinstance(value, str) for value in sample)
+        ]
+
+    def RelativeCI(self) -> float:
+        return RelativeConfidenceInterval(self.GetRuntimes(), self.confidence)
+
+    def IsPreciseEnough(self) -> bool:
+        if self.failed or self.nbSubmitted >= self.nbRuns:
+            return True
+        if (
+            self.timeBudget is not None
+            and self.startTime is not None
+            and time.perf_counter() - self.startTime >= self.timeBudget
+        ):
+            return True
+        return (
+            self.nbSubmitted >= self.minRuns
+            and self.nbRunning == 0
+            and self.RelativeCI() <= self.targetRelativeCI
+        )
+
+    def NextJob(self) -> Job or None:
+        if self.startTime is None:
+            self.startTime = time.perf_counter()
+        if self.IsPreciseEnough():
+            return None
+        if self.nbSubmitted >= self.minRuns and self.nbRunning > 0:
+            # we wait for the running jobs to decide if another one is needed
+            return None
+        return super().NextJob()
+
+    def IsComplete(self) -> bool:
+        return self.nbRunning == 0 and self.IsPreciseEnough()
+
+
+@dataclass
+class TaskPolicy:
+    """Admission rules of the jobs of a task.
+
+    Attributes
+    ----------
+    maxParallel : int or None
+        The maximum number of jobs of the task running at the same time, None for no limit.
+    exclusive : bool
+        If True, a job of the task only run when no other job is running and nothing else is admitted meanwhile.
+    parallelRuns : bool
+        If True, the repetitions of a cell can run at the same time. By default they run one after the
+        other like the scripts of a repetition, since they use the same task folder and argument.
+    """
+
+    maxParallel: int = None
+    exclusive: bool = False
+    parallelRuns: bool = False
+
+
+class Scheduler:
+    """Run the jobs of a list of cells on a pool of workers.
+
+    Each worker is pinned to its own set of cores (when the platform allows it), the processes started
+    by a worker inherit this set of cores. The jobs are admitted in the order of the cells while respecting
+    the `TaskPolicy` of their task, the workers run different cells at the same time.
+
+    Attributes
+    ----------
+    nbWorkers : int
+        The number of jobs that can run at the same time.
+    coreSets : list of set of int or None
+        The set of cores of each worker, None if the workers are not pinned.
+    """
+
+    def __init__(self, nbWorkers: int = 1, coresPerJob: int = None) -> None:
+        self.nbWorkers = max(1, int(nbWorkers))
+        self.coreSets = Scheduler.SplitCores(self.nbWorkers, coresPerJob)
+        self._freeCoreSets = queue.Queue()
+
+        logger.info(f"Scheduler with {self.nbWorkers} worker(s)")
+        logger.debug(f"{self.coreSets = }")
+
+    @staticmethod
+    def SplitCores(nbWorkers: int, coresPerJob: int = None) -> list[set[int]] or None:
+        """Split the available cores in disjoint sets, one per worker.
+
+        Parameters
+        ----------
+        nbWorkers : int
+            The number of workers.
+        coresPerJob : int, optional
+            The number of cores given to each worker, by default the available cores are evenly shared.
+
+        Returns
+        -------
+        list of set of int or None
+            The set of cores of each worker or None if the workers can't be pinned.
+        """
+        if not hasattr(os, "sched_setaffinity"):
+            logger.warning("Core pinning is not supported on this platform")
+            return None
+
+        cores = sorted(os.sched_getaffinity(0))
+        if coresPerJob is None:
+            coresPerJob = len(cores) // nbWorkers
+        if coresPerJob < 1 or coresPerJob * nbWorkers > len(cores):
+            logger.warning(
+                f"Not enough cores ({len(cores)}) to give {coresPerJob} core(s) to {nbWorkers} worker(s), the workers are not pinned"
+            )
+            return None
+
+        return [
+            set(cores[i * coresPerJob : (i + 1) * coresPerJob])
+            for i in range(nbWorkers)
+        ]
+
+    def _PinWorker(self) -> None:
+        # on Linux the affinity is set for the calling thread only and inherited by the processes it starts
+        if self.coreSets is None:
+            return
+        coreSet = self._freeCoreSets.get_nowait()
+        os.sched_setaffinity(0, coreSet)
+        logger.debug(f"Worker pinned to the cores {coreSet}")
+
+    def Run(
+        self,
+        cells: list[Cell],
+        runJob,
+        taskPolicy: dict[str, TaskPolicy] = None,
+        onTaskStart=None,
+        onJobDone=None,
+        onCellDone=None,
+        errorValue: str = "Error",
+    ) -> None:
+        """Run all the jobs of the cells.
+
+        The callbacks are always called from the thread calling this method so they can safely
+        modify shared objects. A job raising an exception is logged and gives the sample
+        ``[errorValue, errorValue]``, only its cell stops, the other jobs keep running.
+
+        Parameters
+        ----------
+        cells : list of Cell
+            The cells to run, the order of the list is the order of admission of their jobs.
+        runJob : callable
+            Function called by the workers as ``runJob(cell, job)`` and returning the sample of the job.
+        taskPolicy : dict of str and TaskPolicy, optional
+            The admission rules of each task.
+        onTaskStart : callable, optional
+            Called as ``onTaskStart(taskName)`` before the first job of a task is admitted.
+        onJobDone : callable, optional
+            Called as ``onJobDone(cell, job, sample)`` when a job is finished.
+        onCellDone : callable, optional
+            Called as ``onCellDone(cell)`` when all the jobs of a cell are finished.
+        errorValue : str, default="Error"
+            The value of the sample of a job that raised an exception.
+        """
+        taskPolicy = taskPolicy or {}
+        # each run starts a new pool, the workers of the previous run are gone and their cores are free again
+        self._freeCoreSets = queue.Queue()
+        for coreSet in self.coreSets or []:
+            self._freeCoreSets.put(coreSet)
+        activeCells = list(cells)
+        running = {}
+        runningByTask = Counter()
+        startedTasks = set()
+
+        def Admissible(taskName: str) -> bool:
+            policy = taskPolicy.get(taskName, TaskPolicy())
+            if len(running) >= self.nbWorkers:
+                return False
+            if policy.exclusive and len(running) > 0:
+                return False
+            if any(
+                taskPolicy.get(cell.taskName, TaskPolicy()).exclusive
+                for cell, _ in running.values()
+            ):
+                return False
+            if (
+                policy.maxParallel is not None
+                and runningByTask[taskName] >= policy.maxParallel
+            ):
+                return False
+            return True
+
+        with ThreadPoolExecutor(
+            max_workers=self.nbWorkers, initializer=self._PinWorker
+        ) as executor:
+            while activeCells or running:
+                for cell in activeCells:
+                    if len(running) >= self.nbWorkers:
+                        break
+                    if not Admissible(cell.taskName):
+                        # an exclusive task wait for the running jobs to finish, we don't admit the next ones
+                        # meanwhile otherwise it would never get the machine for itself
+                        if taskPolicy.get(cell.taskName, TaskPolicy()).exclusive:
+                            break
+                        continue
+                    if cell.taskName not in startedTasks:
+                        startedTasks.add(cell.taskName)
+                        if onTaskStart is not None:
+                            onTaskStart(cell.taskName)
+                    parallelRuns = taskPolicy.get(
+                        cell.taskName, TaskPolicy()
+                    ).parallelRuns
+                    while Admissible(cell.taskName) and (
+                        parallelRuns or cell.nbRunning == 0
+                    ):
+                        job = cell.NextJob()
+                        if job is None:
+                            break
+                        future = executor.submit(runJob, cell, job)
+                        running[future] = (cell, job)
+                        runningByTask[cell.taskName] += 1
+
+                # the cells that can't give a job anymore and have no job running are done
+                for cell in [cell for cell in activeCells if cell.IsComplete()]:
+                    activeCells.remove(cell)
+                    if onCellDone is not None:
+                        onCellDone(cell)
+
+                if not running:
+                    continue
+
+                done, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    cell, job = running.pop(future)
+                    runningByTask[cell.taskName] -= 1
+                    try:
+                        sample = future.result()
+                    except Exception as e:
+                        logger.error(
+                            f"The job {job.runId} of {job.taskName} for {job.libraryName} with {job.argument} "
+                            f"raised {type(e).__name__}: {e}"
+                        )
+                        sample = [errorValue, errorValue]
+                    cell.AddSample(job.runId, sample)
+                    if onJobDone is not None:
+                        onJobDone(cell, job, sample)
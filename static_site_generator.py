@@ -5,8 +5,124 @@ You can use it to create and generate static html page with jinja2.
 
 """
 
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import hashlib
+import json
+import math
 import os
+import time
+
+from asset_pipeline import (
+    AssetReferencePattern,
+    BuildAssets,
+    RewriteReferences,
+    UncompressedPath,
+    WriteFile,
+)
+from checkpoint import WriteJsonAtomic
+from logger import logger
+
+
+@dataclass
+class RenderJob:
+    """A page to render, independent of the other pages.
+
+    Attributes
+    ----------
+    pageName : str
+        The name of the page to create.
+    outputPath : str
+        The path of the folder where the page is written.
+    components : list of str or tuple[str, dict]
+        The components of the page in order. A str is the name of a shared component (see
+        `StaticSiteGenerator.RenderPages`), a tuple is the name of a template and its arguments.
+        The page is only rendered again if one of them (or the source of a template) changed.
+    """
+
+    pageName: str
+    outputPath: str
+    components: list = field(default_factory=list)
+
+
+def ToJsonCompatible(data):
+    """Replace the infinite and nan values (not valid in json) by None and the numpy scalars by python ones."""
+    if isinstance(data, dict):
+        return {key: ToJsonCompatible(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [ToJsonCompatible(value) for value in data]
+    if hasattr(data, "item"):
+        data = data.item()
+    if isinstance(data, float) and not math.isfinite(data):
+        return None
+    return data
+
+
+# the state of a render worker, set once by InitRenderWorker
+_workerEnvironment = None
+_workerSharedComponents = {}
+_workerAssetManifest = {}
+_workerAssetPattern = None
+
+
+def CreateEnvironment(
+    htmlTemplateFilePath: str, templateCachePath: str = None
+) -> Environment:
+    """Create the jinja environment which keeps the compiled templates in memory and on disk."""
+    # the templates are parsed once per run (in memory, reloaded if the file changes) and their
+    # bytecode is reused by the next runs as long as the source of the template is the same
+    return Environment(
+        loader=FileSystemLoader(htmlTemplateFilePath),
+        bytecode_cache=FileSystemBytecodeCache(templateCachePath),
+        cache_size=-1,
+    )
+
+
+def InitRenderWorker(
+    htmlTemplateFilePath: str,
+    templateCachePath: str,
+    sharedComponents: dict,
+    assetManifest: dict[str, str] = None,
+) -> None:
+    """Give a render worker its jinja environment, the components shared by the pages and the hashed
+    path of the assets.
+
+    The shared components given as a template and its arguments are rendered once by the worker.
+    """
+    global _workerEnvironment, _workerSharedComponents
+    global _workerAssetManifest, _workerAssetPattern
+    _workerAssetManifest = {} if assetManifest is None else assetManifest
+    _workerAssetPattern = AssetReferencePattern(_workerAssetManifest)
+    _workerEnvironment = CreateEnvironment(htmlTemplateFilePath, templateCachePath)
+    _workerSharedComponents = {
+        name: component
+        if isinstance(component, str)
+        else _workerEnvironment.get_template(component[0]).render(**component[1])
+        for name, component in sharedComponents.items()
+    }
+
+
+def RenderPage(job: RenderJob) -> float:
+    """Render and write a page in a render worker.
+
+    Returns
+    -------
+    float
+        The time taken to render and write the page, in seconds.
+    """
+    start = time.perf_counter()
+    html = "".join(
+        _workerSharedComponents[component]
+        if isinstance(component, str)
+        else _workerEnvironment.get_template(component[0]).render(**component[1])
+        for component in job.components
+    )
+    WriteFile(
+        f"{job.outputPath}/{job.pageName}",
+        RewriteReferences(html, _workerAssetManifest, _workerAssetPattern),
+    )
+    return time.perf_counter() - start
 
 
 class StaticSiteGenerator:
@@ -25,8 +141,27 @@ class StaticSiteGenerator:
         The path of the folder where the output files are stored.
     styleFilePath : str
         The path of the folder where the CSS files are stored.
+    dataFilePath : str
+        The path of the folder where the data files of the pages are stored.
+    environment : Environment
+        The jinja environment shared by all the components, it keeps the compiled templates in memory.
+    manifestPath : str
+        The path of the build manifest, the hash of the inputs of each page rendered by `RenderPages`.
+    writtenPages : set of str
+        The path of the pages and data files written (or kept unchanged) by the current build.
+    assetManifest : dict of str
+        The hashed path of each asset (script, style, image...) once `BuildAssets` is called, the references
+        of the pages to the assets are replaced by them.
+    MANIFEST_NAME : str
+        Class Attribute ! The name of the build manifest, written next to the content folder.
+    VOLATILE_ARGUMENTS : set of str
+        Class Attribute ! The template arguments which change at every build without changing the data of
+        the page, they don't invalidate a page.
     """
 
+    MANIFEST_NAME = ".build_manifest.json"
+    VOLATILE_ARGUMENTS = {"dataGenerationDate"}
+
     def __init__(
         self,
         scriptFilePath="script",
@@ -35,6 +170,8 @@ class StaticSiteGenerator:
         contentFilePath="output",
         styleFilePath="style",
         createFolder: bool = True,
+        templateCachePath: str = None,
+        dataFilePath="data",
     ):
         """Create the static site generator object
 
@@ -54,6 +191,11 @@ class StaticSiteGenerator:
             The path of the folder where the CSS files are stored.
         createFolder : bool, optional
             If True, create the folder if it does not exist, by default True
+        templateCachePath : str, optional
+            The path of the folder where the compiled templates are stored between two runs, by default
+            the jinja cache folder of the temporary directory.
+        dataFilePath : str, optional
+            The path of the folder where the data files of the pages are stored, by default "data"
         """
 
         curentPath = os.path.dirname(__file__)
@@ -64,6 +206,7 @@ class StaticSiteGenerator:
             assetsFilePath,
             contentFilePath,
             styleFilePath,
+            dataFilePath,
         ]:
             if not self.CheckIfPathExist(path) and not createFolder:
                 raise Exception(f"Path {path} does not exist")
@@ -71,20 +214,49 @@ class StaticSiteGenerator:
                 # Create the folder relative to path of the script
                 os.mkdir(os.path.join(curentPath, path))
 
-        # we clean the output folder
-        for file in os.listdir(os.path.join(curentPath, contentFilePath)):
-            os.remove(os.path.join(curentPath, contentFilePath, file))
-
+        # the content folder is not cleaned, the pages whose inputs have not changed since the last build
+        # are kept and the stale pages are removed at the end of the build (see CompleteBuild)
         # we need the basename of these path to use it in the HTML template
         basename = lambda path: os.path.basename(os.path.normpath(path))
 
         self.scriptFilePath = basename(scriptFilePath)
         self.assetsFilePath = basename(assetsFilePath)
         self.styleFilePath = basename(styleFilePath)
+        self.dataFilePath = basename(dataFilePath)
+        self.dataFolder = dataFilePath
+        self.assetFolders = {
+            self.scriptFilePath: scriptFilePath,
+            self.styleFilePath: styleFilePath,
+            self.assetsFilePath: assetsFilePath,
+        }
+        self.staticFolder = os.path.join(
+            os.path.dirname(os.path.normpath(contentFilePath)), "static"
+        )
+        self.assetManifest = {}
+        self.assetPattern = None
 
         self.contentFilePath = contentFilePath
         self.htmlTemplateFilePath = htmlTemplateFilePath
 
+        self.templateCachePath = templateCachePath
+        self.environment = CreateEnvironment(htmlTemplateFilePath, templateCachePath)
+
+        self.manifestPath = os.path.join(
+            os.path.dirname(os.path.normpath(contentFilePath)),
+            StaticSiteGenerator.MANIFEST_NAME,
+        )
+        self.previousManifest = self.LoadManifest()
+        self.manifest = {}
+        self.writtenPages = set()
+
+    def LoadManifest(self) -> dict[str, str]:
+        """Read the build manifest of the previous build, empty if there is none or it is unreadable."""
+        try:
+            with open(self.manifestPath, "r") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
     def CheckIfPathExist(self, path: str) -> bool:
         """Check if the path relative to the path of the script exist.
 
@@ -118,9 +290,7 @@ class StaticSiteGenerator:
             The HTML component
 
         """
-        file_loader = FileSystemLoader(self.htmlTemplateFilePath)
-        env = Environment(loader=file_loader)
-        template = env.get_template(templateName)
+        template = self.environment.get_template(templateName)
         return template.render(**kwargs)
 
     def CreateHTMLPage(
@@ -141,6 +311,168 @@ class StaticSiteGenerator:
         outputPath = self.contentFilePath
         if manualOutputPath is not None:
             outputPath = manualOutputPath
+        self.writtenPages.add(os.path.normpath(f"{outputPath}/{pageName}"))
+
+        WriteFile(
+            f"{outputPath}/{pageName}",
+            RewriteReferences(html, self.assetManifest, self.assetPattern),
+        )
+
+    def BuildAssets(self) -> None:
+        """Asset stage: copy the scripts, the styles and the assets minified, compressed and under a name
+        containing the hash of their content in the static folder.
+
+        The pages created afterwards refer to the hashed copies, the source folders are not modified.
+        """
+        self.assetManifest = BuildAssets(self.assetFolders, self.staticFolder)
+        self.assetPattern = AssetReferencePattern(self.assetManifest)
+
+    def CreateDataFile(self, name: str, data) -> str:
+        """Write the data of a page in a json file named after the hash of its content.
+
+        The name of the file changes with its content, the browser can keep it in cache as long as it
+        wants. The file is only written if it doesn't exist yet.
+
+        Parameters
+        ----------
+        name : str
+            The prefix of the name of the file, usually the name of the page.
+        data : object
+            The data to write, the infinite and nan values are written as null.
+
+        Returns
+        -------
+        str
+            The name of the file in the data folder.
+        """
+        content = json.dumps(
+            ToJsonCompatible(data), separators=(",", ":"), allow_nan=False
+        ).encode()
+        fileName = f"{name}.{hashlib.sha256(content).hexdigest()[:16]}.json"
+        filePath = os.path.normpath(os.path.join(self.dataFolder, fileName))
+        self.writtenPages.add(filePath)
+        if not os.path.exists(filePath):
+            WriteFile(filePath, content)
+        return fileName
+
+    def TemplateHash(self, templateName: str) -> str:
+        source, _, _ = self.environment.loader.get_source(
+            self.environment, templateName
+        )
+        return hashlib.sha256(source.encode()).hexdigest()
+
+    def ComponentHash(self, component) -> str:
+        """The hash of the inputs of a component, a str or a template and its arguments."""
+        if isinstance(component, str):
+            return hashlib.sha256(component.encode()).hexdigest()
+        templateName, arguments = component
+        stableArguments = sorted(
+            (name, value)
+            for name, value in arguments.items()
+            if name not in StaticSiteGenerator.VOLATILE_ARGUMENTS
+        )
+        return hashlib.sha256(
+            f"{templateName}{self.TemplateHash(templateName)}{stableArguments!r}".encode()
+        ).hexdigest()
+
+    def JobHash(self, job: RenderJob, sharedHashes: dict[str, str]) -> str:
+        """The hash of the inputs of a page, the page is rendered again only if it changes."""
+        return hashlib.sha256(
+            # the references to the assets are replaced by their hashed path
+            json.dumps(self.assetManifest, sort_keys=True).encode()
+            + "".join(
+                sharedHashes[component]
+                if isinstance(component, str)
+                else self.ComponentHash(component)
+                for component in job.components
+            ).encode()
+        ).hexdigest()
+
+    def RenderPages(
+        self,
+        jobs: list[RenderJob],
+        sharedComponents: dict = None,
+        nbWorkers: int = None,
+    ) -> None:
+        """Render and write the pages on a pool of processes.
+
+        The shared components are given once to each worker, the jobs only carry what is specific to their
+        page. The pages whose inputs have the same hash as in the manifest of the previous build (and which
+        still exist) are not rendered again. The time taken compared to the time the pages would take one
+        after the other is logged.
+
+        Parameters
+        ----------
+        jobs : list of RenderJob
+            The pages to render.
+        sharedComponents : dict of str or tuple[str, dict], optional
+            The components used by several pages, by name. A component can be given already rendered or as
+            a template and its arguments.
+        nbWorkers : int, optional
+            The number of processes, by default the number of cores. The pages are rendered in the current
+            process with 1 worker.
+        """
+        sharedComponents = {} if sharedComponents is None else sharedComponents
+        sharedHashes = {
+            name: self.ComponentHash(component)
+            for name, component in sharedComponents.items()
+        }
+        changedJobs = []
+        for job in jobs:
+            pagePath = os.path.normpath(f"{job.outputPath}/{job.pageName}")
+            self.writtenPages.add(pagePath)
+            # the manifest is relative to the site folder, it doesn't depend on the working directory
+            manifestKey = os.path.relpath(pagePath, os.path.dirname(self.manifestPath))
+            self.manifest[manifestKey] = self.JobHash(job, sharedHashes)
+            if self.previousManifest.get(manifestKey) != self.manifest[
+                manifestKey
+            ] or not os.path.exists(pagePath):
+                changedJobs.append(job)
+        logger.info(
+            f"{len(changedJobs)} of {len(jobs)} pages changed since the last build"
+        )
+        jobs = changedJobs
+        if len(jobs) == 0:
+            return
+
+        nbWorkers = os.cpu_count() if nbWorkers is None else nbWorkers
+        nbWorkers = max(1, min(nbWorkers, len(jobs)))
+        initArgs = (
+            self.htmlTemplateFilePath,
+            self.templateCachePath,
+            sharedComponents,
+            self.assetManifest,
+        )
+
+        start = time.perf_counter()
+        if nbWorkers == 1:
+            InitRenderWorker(*initArgs)
+            renderTimes = [RenderPage(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=nbWorkers, initializer=InitRenderWorker, initargs=initArgs
+            ) as executor:
+                renderTimes = list(
+                    executor.map(
+                        RenderPage, jobs, chunksize=max(1, len(jobs) // (4 * nbWorkers))
+                    )
+                )
+        elapsed = time.perf_counter() - start
+
+        logger.info(
+            f"{len(jobs)} pages rendered in {elapsed:.3f}s with {nbWorkers} worker(s) "
+            f"({sum(renderTimes):.3f}s of rendering, speedup {sum(renderTimes) / elapsed if elapsed > 0 else 1:.2f}x)"
+        )
 
-        with open(f"{outputPath}/{pageName}", "w") as f:
-            f.write(html)
+    def CompleteBuild(self) -> None:
+        """Remove the pages of the content folder and the data files which are not part of this build and
+        save the manifest."""
+        for folder in [self.contentFilePath, self.dataFolder]:
+            for file in os.listdir(folder):
+                pagePath = os.path.normpath(os.path.join(folder, file))
+                # the compressed siblings of a page are kept with it
+                sourcePath = os.path.normpath(UncompressedPath(pagePath))
+                if sourcePath not in self.writtenPages and os.path.isfile(pagePath):
+                    logger.info(f"Remove the stale file {pagePath}")
+                    os.remove(pagePath)
+        WriteJsonAtomic(self.manifestPath, self.manifest, indent=4)
@@ -4,10 +4,155 @@ This module contains the class Task and the differents function to manipulate th
 
 """
 
+import warnings
 from dataclasses import dataclass, field
 from typing import ClassVar
 import numpy as np
 from logger import logger
+from resource_usage import RESOURCE_METRICS
+from results_store import (
+    STATUS_BY_VALUE,
+    STATUS_ERROR,
+    STATUS_MISSING,
+    STATUS_OK,
+    DecodeValue,
+)
+from sampling import StudentQuantile
+
+
+@dataclass
+class TaskStatistics:
+    """
+    Summary of the samples of a metric of a task for a target, each attribute is an array with one value
+    per argument (np.nan if the argument has no valid sample).
+
+    Attributes
+    ----------
+    count : np.ndarray of int
+        The number of valid samples.
+    mean, variance, std : np.ndarray of float
+        The mean, the variance and the standard deviation (population, ddof=0) of the samples.
+    min, max, median, p5, p10, p90, p95, p99 : np.ndarray of float
+        The minimum, the maximum, the median and the 5th, 10th, 90th, 95th and 99th percentiles of the samples.
+    mad : np.ndarray of float
+        The median absolute deviation of the samples.
+    ci : np.ndarray of float
+        The half-width of the confidence interval of the mean (inf with less than 2 samples).
+    histogram : np.ndarray of int
+        The number of samples in each of the `HISTOGRAM_BINS` bins of same width between the minimum and
+        the maximum of the samples, array of shape (nbArguments, HISTOGRAM_BINS).
+    confidence : float
+        The confidence level of the interval.
+    HISTOGRAM_BINS : int
+        Class Attribute ! The number of bins of the histograms, the size of the summary doesn't depend on the
+        number of samples.
+    """
+
+    HISTOGRAM_BINS: ClassVar[int] = 16
+
+    count: np.ndarray
+    mean: np.ndarray
+    variance: np.ndarray
+    std: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+    median: np.ndarray
+    p5: np.ndarray
+    p10: np.ndarray
+    p90: np.ndarray
+    p95: np.ndarray
+    p99: np.ndarray
+    mad: np.ndarray
+    ci: np.ndarray
+    histogram: np.ndarray
+    confidence: float = 0.95
+
+    @classmethod
+    def FromSamples(
+        cls, samples: np.ndarray, confidence: float = 0.95
+    ) -> "TaskStatistics":
+        """Compute the statistics of each row of an array of samples.
+
+        Parameters
+        ----------
+        samples : np.ndarray of float
+            Array of shape (nbArguments, nbSamples), the missing or failed samples are np.nan.
+        confidence : float, default=0.95
+            The confidence level of the confidence interval of the mean.
+
+        Returns
+        -------
+        TaskStatistics
+            The statistics of each argument.
+        """
+        samples = np.asarray(samples, dtype=np.float64)
+        if samples.ndim == 1:
+            samples = samples[:, np.newaxis]
+        if samples.shape[1] == 0:
+            samples = np.full((len(samples), 1), np.nan)
+        count = (~np.isnan(samples)).sum(axis=1)
+        with warnings.catch_warnings():
+            # the arguments without valid sample give np.nan
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            mean = np.nanmean(samples, axis=1)
+            variance = np.nanvar(samples, axis=1)
+            p5, p10, median, p90, p95, p99 = np.nanpercentile(
+                samples, [5, 10, 50, 90, 95, 99], axis=1
+            ).reshape(6, len(samples))
+            mad = np.nanmedian(np.abs(samples - median[:, np.newaxis]), axis=1)
+            minimum = np.nanmin(samples, axis=1)
+            maximum = np.nanmax(samples, axis=1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # one quantile per argument, not per sample
+            quantile = np.array(
+                [StudentQuantile(confidence, n - 1) for n in count.tolist()],
+                dtype=np.float64,
+            )
+            ci = np.where(
+                count >= 2,
+                quantile * np.sqrt(variance * count / (count - 1)) / np.sqrt(count),
+                np.inf,
+            )
+        ci[count == 0] = np.nan
+
+        return cls(
+            count=count,
+            mean=mean,
+            variance=variance,
+            std=np.sqrt(variance),
+            min=minimum,
+            max=maximum,
+            median=median,
+            p5=p5,
+            p10=p10,
+            p90=p90,
+            p95=p95,
+            p99=p99,
+            mad=mad,
+            ci=ci,
+            histogram=TaskStatistics.Histogram(samples, minimum, maximum),
+            confidence=confidence,
+        )
+
+    @staticmethod
+    def Histogram(
+        samples: np.ndarray, minimum: np.ndarray, maximum: np.ndarray
+    ) -> np.ndarray:
+        """Count the samples of each row in `HISTOGRAM_BINS` bins between the minimum and the maximum of the row."""
+        bins = TaskStatistics.HISTOGRAM_BINS
+        isValid = ~np.isnan(samples)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            span = (maximum - minimum)[:, np.newaxis]
+            position = np.where(
+                span > 0, (samples - minimum[:, np.newaxis]) / span * bins, 0
+            )
+        binIndex = np.clip(np.nan_to_num(position), 0, bins - 1).astype(np.int64)
+        # each row has its own range of bins in the flat array
+        flatIndex = (np.arange(len(samples))[:, np.newaxis] * bins + binIndex)[isValid]
+        return np.bincount(flatIndex, minlength=len(samples) * bins).reshape(
+            len(samples), bins
+        )
 
 
 @dataclass
@@ -23,10 +168,42 @@ class Task:
         The theme of the task.
     arguments : list of float
         The list of the arguments of the task. The index of the argument correspond to the index of the result.
-    results : list of float
-        The list of the results of the task. The index of the result correspond to the index of the argument.
+    runtime : dict of str and list
+        The samples of each library for each argument, as read in the results. None for a library read
+        from a result store, only its encoded runtime is kept.
+    evaluation : dict of str and list
+        The values of the evaluation functions of each library for each argument, as read in the results.
+    resources : dict of str and list
+        The resources used by each sample of each library for each argument (see `resource_usage.py`),
+        as read in the results, None for an argument without them. None for a library read from a
+        result store, only its encoded resources are kept.
+    timeline : dict of str and list
+        The timeline of memory and I/O of each sample of each library for each argument (see
+        `resource_usage.TimelineSampler`), as read in the results, None for an argument without them.
+    encoded_runtime, encoded_evaluation : dict of str and tuple
+        The runtime and evaluation of each library encoded in arrays of values and status codes
+        (see `EncodeRuntime` and `EncodeEvaluation`), all the statistics are computed from them.
+    encoded_resources : dict of str and dict
+        The resources of each library encoded in arrays (see `EncodeResources`).
+        The encoded arrays of a library read from a result store are kept by `MarkDataChanged`, there is
+        nothing to encode them again from.
+    cache_statistics : dict of tuple and TaskStatistics
+        The statistics of each (library, metric, confidence), see `GetStatistics`.
     allTasks : list of Task
         Class Atribute ! The list of all the tasks created.
+    tasksByName : dict of str and list of Task
+        Class Atribute ! Index of the tasks created by name, in the order of creation.
+    tasksByTheme : dict of str and list of Task
+        Class Atribute ! Index of the tasks created by theme, in the order of creation.
+    taskNamesByTheme : dict of str and dict of str and None
+        Class Atribute ! The names of the tasks of each theme without duplicate, in the order of creation
+        (the dictionary is used as an ordered set).
+    dataVersion : int
+        Class Atribute ! Incremented each time a task is created or the results of a task change, the values
+        computed from the results of the tasks (like the rankings) are valid as long as it doesn't change.
+    RESOURCE_METRICS : list of str
+        Class Atribute ! The metrics of the resources, the ones measured for each sample and `cpu_time`
+        (user + system time).
 
     """
 
@@ -35,14 +212,50 @@ class Task:
     arguments: list[float] = field(default_factory=list)
     runtime: dict[str, list[float]] = field(default_factory=dict)
     evaluation: dict[str, list[float]] = field(default_factory=dict)
+    resources: dict[str, list] = field(default_factory=dict)
+    timeline: dict[str, list] = field(default_factory=dict)
     arguments_label: list[str] = field(default_factory=list)
     cache_runtime: dict[str, list[float]] = field(default_factory=dict)
     cache_evaluation: dict[str, list[float]] = field(default_factory=dict)
+    encoded_runtime: dict[str, tuple] = field(default_factory=dict, repr=False)
+    encoded_evaluation: dict[str, dict] = field(default_factory=dict, repr=False)
+    encoded_resources: dict[str, dict] = field(default_factory=dict, repr=False)
+    cache_statistics: dict[tuple, "TaskStatistics"] = field(
+        default_factory=dict, repr=False
+    )
     allTasks: ClassVar[list["Task"]] = []
+    tasksByName: ClassVar[dict[str, list["Task"]]] = {}
+    tasksByTheme: ClassVar[dict[str, list["Task"]]] = {}
+    taskNamesByTheme: ClassVar[dict[str, dict[str, None]]] = {}
+    dataVersion: ClassVar[int] = 0
+    RESOURCE_METRICS: ClassVar[list[str]] = ["cpu_time"] + RESOURCE_METRICS
 
     def __post_init__(self) -> None:
         logger.debug(f"Task {self.name} created")
         Task.allTasks.append(self)
+        Task.tasksByName.setdefault(self.name, []).append(self)
+        Task.tasksByTheme.setdefault(self.theme, []).append(self)
+        Task.taskNamesByTheme.setdefault(self.theme, {})[self.name] = None
+        Task.dataVersion += 1
+
+    def MarkDataChanged(self) -> None:
+        """Must be called after the runtime or the evaluation of the task has been modified.
+
+        The cached values of the task are removed and the values computed from all the tasks are invalidated.
+        """
+        self.cache_runtime.clear()
+        self.cache_evaluation.clear()
+        for encoded, results in [
+            (self.encoded_runtime, self.runtime),
+            (self.encoded_resources, self.resources),
+        ]:
+            for target in [
+                target for target in encoded if results.get(target) is not None
+            ]:
+                del encoded[target]
+        self.encoded_evaluation.clear()
+        self.cache_statistics.clear()
+        Task.dataVersion += 1
 
     def __repr__(self) -> str:
         return f"Task({self.name})-> arguments: {self.arguments_label}"
@@ -69,11 +282,7 @@ class Task:
             The list of all the tasks name created.
 
         """
-        listTaskName = []
-        for task in cls.allTasks:
-            if task.name not in listTaskName:
-                listTaskName.append(task.name)
-        return listTaskName
+        return list(cls.tasksByName.keys())
 
     @classmethod
     def GetTaskByName(cls, taskName: str) -> "Task" or None:
@@ -90,10 +299,8 @@ class Task:
             The task with the name given in parameter.
 
         """
-        for task in cls.allTasks:
-            if task.name == taskName:
-                return task
-        return None
+        tasks = cls.tasksByName.get(taskName)
+        return tasks[0] if tasks else None
 
     @classmethod
     def GetAllTaskByName(cls, taskName: str):
@@ -110,7 +317,7 @@ class Task:
             The list of all the tasks with the same name.
 
         """
-        return (task for task in cls.allTasks if task.name == taskName)
+        return (task for task in cls.tasksByName.get(taskName, []))
 
     @classmethod
     def GetAllThemeName(cls):
@@ -122,11 +329,7 @@ class Task:
             The list of all the theme name created.
 
         """
-        listThemeName = []
-        for task in cls.GetAllTask():
-            if task.theme not in listThemeName:
-                listThemeName.append(task.theme)
-        return listThemeName
+        return list(cls.taskNamesByTheme.keys())
 
     @classmethod
     def GetTaskByThemeName(cls, themeName: str):
@@ -143,7 +346,7 @@ class Task:
             The list of all the tasks with the same theme name.
 
         """
-        return (task for task in cls.GetAllTask() if task.theme == themeName)
+        return (task for task in cls.tasksByTheme.get(themeName, []))
 
     @classmethod
     def GetTaskNameByThemeName(cls, themeName: str) -> list[str]:
@@ -160,11 +363,7 @@ class Task:
             The list of all the tasks name with the same theme name.
 
         """
-        listTaskName = []
-        for task in cls.GetTaskByThemeName(themeName):
-            if task.name not in listTaskName:
-                listTaskName.append(task.name)
-        return listTaskName
+        return list(cls.taskNamesByTheme.get(themeName, {}).keys())
 
     # @staticmethod
     # def transform_str_to_nan(array: np.ndarray) -> np.ndarray:
@@ -180,64 +379,360 @@ class Task:
     #     return array
 
     @staticmethod
-    def str_and_none_to_nan(array: np.ndarray) -> np.ndarray:
-        """transform the string and None into np.nan and transform the array into float64"""
+    def EncodeValue(value) -> tuple[float, int]:
+        """Split a value of the results into a float and a status code (see `results_store.py`).
+
+        The strings that are not numbers are the error messages of the benchmark, their value is np.nan.
+        """
+        if value is None:
+            return np.nan, STATUS_MISSING
+        try:
+            return float(value), STATUS_OK
+        except (TypeError, ValueError):
+            return np.nan, STATUS_BY_VALUE.get(value, STATUS_ERROR)
+
+    @staticmethod
+    def EncodeRuntime(runtime: list) -> tuple[np.ndarray, np.ndarray]:
+        """Encode the runtime of a target, done once when the results are loaded.
 
-        def is_float(string: str):
-            """return True if the string is a float, False otherwise"""
+        Parameters
+        ----------
+        runtime : list
+            For each argument, the list of the samples ``[beforeRun, run]`` or an error message.
+
+        Returns
+        -------
+        values : np.ndarray of float64
+            Array of shape (nbArguments, nbSamples, 2), the arguments with less samples are padded with np.nan.
+        status : np.ndarray of uint8
+            The status code of each value, the padding is `STATUS_MISSING`.
+        """
+        nbSamples = max(
+            [len(samples) for samples in runtime if not isinstance(samples, str)] + [1]
+        )
+        values = np.full((len(runtime), nbSamples, 2), np.nan)
+        status = np.full(values.shape, STATUS_MISSING, dtype=np.uint8)
+        for i, samples in enumerate(runtime):
+            if isinstance(samples, str):
+                status[i] = Task.EncodeValue(samples)[1]
+                continue
+            if len(samples) == 0:
+                continue
             try:
-                float(string)
-                return True
-            except ValueError:
-                return False
+                block = np.asarray(samples, dtype=np.float64)
+            except (TypeError, ValueError):
+                block = None
+            if block is not None and block.shape == (len(samples), 2):
+                values[i, : len(samples)] = block
+                status[i, : len(samples)] = np.where(
+                    np.isnan(block), STATUS_MISSING, STATUS_OK
+                )
+                continue
+            # some samples are error messages
+            for j, sample in enumerate(samples):
+                for k, value in enumerate(sample[:2]):
+                    values[i, j, k], status[i, j, k] = Task.EncodeValue(value)
+        return values, status
+
+    @staticmethod
+    def EncodeEvaluation(evaluation: list) -> dict[str, tuple]:
+        """Encode the evaluation of a target, done once when the results are loaded.
+
+        Parameters
+        ----------
+        evaluation : list of dict or None
+            For each argument, the values of each evaluation function.
+
+        Returns
+        -------
+        dict of str and tuple
+            For each evaluation function a tuple (values, status, lengths): the values (float64) and the
+            status codes (uint8) of shape (nbArguments, nbValues) padded with np.nan / `STATUS_MISSING`
+            and the number of values of each argument (-1 if the argument has no value for the function).
+        """
+        functions = {}
+        for element in evaluation:
+            for function in element or {}:
+                functions[function] = None
+        width = max(
+            [
+                len(element[function])
+                for element in evaluation
+                for function in element or {}
+                if isinstance(element[function], list)
+            ]
+            + [1]
+        )
+
+        encoded = {}
+        for function in functions:
+            values = np.full((len(evaluation), width), np.nan)
+            status = np.full(values.shape, STATUS_MISSING, dtype=np.uint8)
+            lengths = np.full(len(evaluation), -1)
+            for i, element in enumerate(evaluation):
+                if element is None or function not in element:
+                    continue
+                row = element[function]
+                row = row if isinstance(row, list) else [row]
+                lengths[i] = len(row)
+                for j, value in enumerate(row):
+                    values[i, j], status[i, j] = Task.EncodeValue(value)
+            encoded[function] = (values, status, lengths)
+        return encoded
+
+    @staticmethod
+    def EncodeResources(resources: list, nbSamples: int) -> dict[str, np.ndarray]:
+        """Encode the resources of a target, done once when the results are loaded.
+
+        Parameters
+        ----------
+        resources : list of list or None
+            For each argument, the resources (dict or None) of each sample.
+        nbSamples : int
+            The number of samples of the encoded runtime of the target.
 
-        return np.where(
-            np.vectorize(lambda x: x is None or not is_float(x))(array), np.nan, array
-        ).astype(np.float64)
+        Returns
+        -------
+        dict of str and np.ndarray
+            For each metric the values (float64) of shape (nbArguments, nbSamples), np.nan if missing.
+        """
+        encoded = {
+            metric: np.full((len(resources), nbSamples), np.nan)
+            for metric in RESOURCE_METRICS
+        }
+        for i, usages in enumerate(resources):
+            for j, usage in enumerate((usages or [])[:nbSamples]):
+                for metric, value in (usage or {}).items():
+                    if metric in encoded and value is not None:
+                        encoded[metric][i, j] = value
+        encoded["cpu_time"] = encoded["user_time"] + encoded["system_time"]
+        return encoded
+
+    def SetResults(
+        self,
+        target: str,
+        runtime: list,
+        evaluation: list or None,
+        resources: list or None = None,
+        timeline: list or None = None,
+        encodedRuntime: tuple = None,
+        encodedResources: dict = None,
+    ) -> None:
+        """Set the results of a target and encode them.
+
+        Parameters
+        ----------
+        target : str
+            The name of the library.
+        runtime : list
+            For each argument, the list of the samples ``[beforeRun, run]`` or an error message.
+        evaluation : list of dict or None
+            For each argument, the values of each evaluation function.
+        resources : list of list or None, optional
+            For each argument, the resources used by each sample, None if they were not measured.
+        timeline : list of list or None, optional
+            For each argument, the timeline of each sample, None if they were not sampled.
+        encodedRuntime : tuple, optional
+            The runtime already encoded (see `EncodeRuntime`), `runtime` is then None.
+        encodedResources : dict, optional
+            The resources already encoded (see `EncodeResources`), `resources` is then None.
+        """
+        self.runtime[target] = runtime
+        self.evaluation[target] = evaluation
+        self.resources[target] = resources
+        self.timeline[target] = timeline
+        self.MarkDataChanged()
+        if encodedRuntime is not None:
+            self.encoded_runtime[target] = encodedRuntime
+        if encodedResources is not None:
+            self.encoded_resources[target] = encodedResources
+        self.GetEncodedRuntime(target)
+        self.GetEncodedEvaluation(target)
+
+    def GetEncodedRuntime(self, target: str) -> tuple[np.ndarray, np.ndarray]:
+        """Getter for the encoded runtime of a target, see `EncodeRuntime`."""
+        if target not in self.encoded_runtime:
+            self.encoded_runtime[target] = Task.EncodeRuntime(self.runtime[target])
+        return self.encoded_runtime[target]
+
+    def GetEncodedEvaluation(self, target: str) -> dict[str, tuple] or None:
+        """Getter for the encoded evaluation of a target, see `EncodeEvaluation`."""
+        if self.evaluation[target] is None:
+            return None
+        if target not in self.encoded_evaluation:
+            self.encoded_evaluation[target] = Task.EncodeEvaluation(
+                self.evaluation[target]
+            )
+        return self.encoded_evaluation[target]
+
+    def HasResources(self, target: str = None) -> bool:
+        """Check if the resources of a target (or of any target if None) were measured."""
+        targets = self.resources.keys() if target is None else [target]
+        return any(
+            name in self.encoded_resources and self.resources.get(name) is None
+            for name in targets
+        ) or any(
+            usage is not None
+            for name in targets
+            for usages in self.resources.get(name) or []
+            for usage in usages or []
+        )
+
+    def GetTimeline(self, target: str, argumentIndex: int) -> dict or None:
+        """Getter for the timeline of the last sample of an argument which has one, None if there is none."""
+        timelines = (self.timeline.get(target) or [None] * (argumentIndex + 1))[
+            argumentIndex
+        ]
+        for timeline in reversed(timelines or []):
+            if timeline is not None:
+                return timeline
+        return None
+
+    def GetResourceArray(self, target: str, metric: str) -> np.ndarray:
+        """Getter for a resource (one of `RESOURCE_METRICS`) of each sample of a target.
+
+        Returns
+        -------
+        np.ndarray of float64
+            Array of shape (nbArguments, nbSamples), np.nan if the sample is missing, failed or has no resources.
+        """
+        values, status = self.GetEncodedRuntime(target)
+        if target not in self.encoded_resources:
+            if self.resources.get(target) is None:
+                return np.full(values.shape[:2], np.nan)
+            self.encoded_resources[target] = Task.EncodeResources(
+                self.resources[target], values.shape[1]
+            )
+        isValid = (status == STATUS_OK).all(axis=2)
+        return np.where(isValid, self.encoded_resources[target][metric], np.nan)
+
+    def GetRuntimeArray(self, target: str) -> np.ndarray:
+        """Getter for the runtime (run - before run) of each sample of a target.
+
+        Returns
+        -------
+        np.ndarray of float64
+            Array of shape (nbArguments, nbSamples), np.nan if the sample is missing or failed.
+        """
+        values, status = self.GetEncodedRuntime(target)
+        isValid = (status == STATUS_OK).all(axis=2)
+        return np.where(isValid, values[:, :, 1] - values[:, :, 0], np.nan)
 
     def get_runtime(self, target: str) -> list[float]:
-        # for element in self.runtime[target]:
-        #     print(len(element))
-        #     print(element)
-        # we transform the string and None into np.nan and transform the array into float64
-        runtime = Task.str_and_none_to_nan(np.array(self.runtime[target]))
-        # if there is no runtime for the target, we return a list of np.nan with the same size as the arguments
-        if (np.isnan(runtime)).all():
-            return np.vstack(runtime).tolist()
-        # we inverse the runtime to have the difference between the end and the start
-        runtime = np.hstack(np.diff(runtime, axis=2)).T
-        # runtime[:, :, 0] = -runtime[:, :, 0]
-        # runtime = runtime.sum(axis=2)
+        # the string and None are np.nan, we have the difference between the end and the start
+        runtime = self.GetRuntimeArray(target)
         logger.debug(f"Runtime for {target} in {self.name} : {runtime}")
         return runtime.tolist()
-    
+
     def get_evaluation(self, target: str) -> list[float]:
-        
-        if self.evaluation[target] is None:
+        encoded = self.GetEncodedEvaluation(target)
+        if encoded is None:
             # the evaluation is a error message
             evaluation = [float("inf")] * len(self.arguments_label)
             logger.debug(f"Evaluation for {target} in {self.name} : {evaluation}")
             return evaluation
-        evaluation = self.evaluation[target][:]
-        for i in range(len(evaluation)):
-            for function in evaluation[i].keys():
-                evaluation[i][function] = Task.str_and_none_to_nan(
-                    evaluation[i][function]
+
+        evaluation = []
+        for i, element in enumerate(self.evaluation[target]):
+            if element is None:
+                evaluation.append(float("inf"))
+                continue
+            evaluationArgument = {}
+            for function in element.keys():
+                values, status, lengths = encoded[function]
+                row = np.where(status[i] == STATUS_OK, values[i], np.nan)[: lengths[i]]
+                evaluationArgument[function] = (
+                    float("inf") if np.isnan(row).all() else row.tolist()
                 )
-                if np.isnan(evaluation[i][function]).all():
-                    evaluation[i][function] = float("inf")
-                    continue
-                evaluation[i][function] = evaluation[i][function].tolist()
+            evaluation.append(evaluationArgument)
         return evaluation
 
+    def GetMetricArray(self, target: str, metric: str = "runtime") -> np.ndarray:
+        """Getter for the samples of a metric of a target.
+
+        Parameters
+        ----------
+        target : str
+            The name of the library.
+        metric : str, default="runtime"
+            `runtime`, one of `RESOURCE_METRICS` or the name of an evaluation function.
+
+        Returns
+        -------
+        np.ndarray of float64
+            Array of shape (nbArguments, nbSamples), np.nan if the sample is missing or failed.
+        """
+        if metric == "runtime":
+            return self.GetRuntimeArray(target)
+        if metric in Task.RESOURCE_METRICS:
+            return self.GetResourceArray(target, metric)
+        encoded = self.GetEncodedEvaluation(target)
+        if encoded is None or metric not in encoded:
+            return np.full((len(self.arguments_label), 1), np.nan)
+        values, status, _ = encoded[metric]
+        return np.where(status == STATUS_OK, values, np.nan)
+
+    def GetStatistics(
+        self, target: str, metric: str = "runtime", confidence: float = 0.95
+    ) -> "TaskStatistics":
+        """Getter for the summary of the samples of a metric of a target, computed once and cached.
+
+        Parameters
+        ----------
+        target : str
+            The name of the library.
+        metric : str, default="runtime"
+            `runtime`, one of `RESOURCE_METRICS` or the name of an evaluation function.
+        confidence : float, default=0.95
+            The confidence level of the confidence interval of the mean.
+
+        Returns
+        -------
+        TaskStatistics
+            The statistics of each argument.
+        """
+        key = (target, metric, confidence)
+        if key not in self.cache_statistics:
+            self.cache_statistics[key] = TaskStatistics.FromSamples(
+                self.GetMetricArray(target, metric), confidence
+            )
+        return self.cache_statistics[key]
+
+    def EvaluationStatistic(self, target: str, statistic: str, nanValue=np.nan) -> list:
+        """Getter for a statistic (attribute of `TaskStatistics`) of each evaluation function.
+
+        Returns
+        -------
+        list of dict or float
+            For each argument the statistic of each function or inf if the argument has no evaluation.
+        """
+        encoded = self.GetEncodedEvaluation(target)
+        if encoded is None:
+            return [float("inf")] * len(self.arguments_label)
+
+        values = {
+            function: np.nan_to_num(
+                getattr(self.GetStatistics(target, function), statistic),
+                nan=nanValue,
+                posinf=np.inf,
+                neginf=-np.inf,
+            ).tolist()
+            for function in encoded.keys()
+        }
+        return [
+            float("inf")
+            if element is None
+            else {function: values[function][i] for function in element.keys()}
+            for i, element in enumerate(self.evaluation[target])
+        ]
+
     def mean_runtime(self, target: str) -> list[float]:
         if target in self.cache_runtime:
             logger.debug(
                 f"Evaluation already calculated for {target} in {self.name}, using the cached value"
             )
             return self.cache_runtime[target]
-        runtime = self.get_runtime(target)
-        runtime = np.nanmean(runtime, axis=1)
+        runtime = self.GetStatistics(target).mean.copy()
         runtime[np.isnan(runtime)] = float("inf")
         logger.debug(f"Runtime for {target} in {self.name} : {runtime}")
         # we save the runtime in the cache
@@ -250,44 +745,20 @@ class Task:
                 f"Evaluation already calculated for {target} in {self.name}, using the cached value"
             )
             return self.cache_evaluation[target]
-        evaluation = []
-        for element in self.get_evaluation(target):
-            if element == float("inf"):
-                evaluation.append(element)
-                continue
-            evaluation.append(element.copy())
-        for i in range(len(evaluation)):
-            if evaluation[i]  == float("inf"):
-                continue
-            for function in evaluation[i].keys():
-                evaluation[i][function] = np.nanmean(evaluation[i][function]).tolist()
-                if np.isnan(evaluation[i][function]):
-                    evaluation[i][function] = float("inf")
+        evaluation = self.EvaluationStatistic(target, "mean", nanValue=float("inf"))
         logger.debug(f"Evaluation for {target} in {self.name} : {evaluation}")
         # we save the evaluation in the cache
         self.cache_evaluation[target] = evaluation
         return evaluation
 
     def standard_deviation_runtime(self, target) -> list[float]:
-        return np.nanstd(self.get_runtime(target=target), axis=1).tolist()
+        return self.GetStatistics(target).std.tolist()
 
     def standard_deviation_evaluation(self, target) -> list[float]:
-        evaluation = []
-        for element in self.get_evaluation(target):
-            if element == float("inf"):
-                evaluation.append(element)
-                continue
-            evaluation.append(element.copy())
-        # evaluation = self.get_evaluation(target)[:]
-        for i in range(len(evaluation)):
-            if evaluation[i] == float("inf"):
-                continue
-            for function in evaluation[i].keys():
-                evaluation[i][function] = np.nanstd(evaluation[i][function]).tolist()
-        return evaluation
+        return self.EvaluationStatistic(target, "std")
 
     def variance(self, target) -> list[float]:
-        return np.nanvar(self.get_runtime(target=target), axis=1).tolist()
+        return self.GetStatistics(target).variance.tolist()
 
     def get_status(self, target: str) -> str:
         """Getter for the status of the task.
@@ -300,13 +771,9 @@ class Task:
         """
         mean = np.array(self.mean_runtime(target))
         if (mean == float("inf")).all():
-            if isinstance(self.runtime[target][0], str):
-                # the runtime is a error message
-                return self.runtime[target][0]
-            else:
-                # we want to find the first error message
-
-                return self.runtime[target][0][0][1]
+            # the error message of the first argument, or of its first sample
+            values, status = self.GetEncodedRuntime(target)
+            return DecodeValue(values[0, 0, 1].item(), int(status[0, 0, 1]))
         return "Run"
 
 
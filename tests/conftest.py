@@ -0,0 +1,108 @@
+"""Docstring for conftest.py module.
+
+The fixtures shared by the tests: a clean registry of the tasks and libraries, the synthetic results of
+the benchmark and a small infrastructure whose scripts run in a few milliseconds.
+
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# the modules of BenchSite are at the root of the repository
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import ranking  # noqa: E402
+from json_to_python_object import CreateObjects  # noqa: E402
+from library import Library  # noqa: E402
+from task import Task  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    """Give each test empty indexes of the tasks and libraries and an empty ranking cache."""
+    for attribute in ["allTasks", "tasksByName", "tasksByTheme", "taskNamesByTheme"]:
+        monkeypatch.setattr(Task, attribute, type(getattr(Task, attribute))())
+    for attribute in ["allLibrary", "libraryByName", "librariesByTaskName"]:
+        monkeypatch.setattr(Library, attribute, type(getattr(Library, attribute))())
+    monkeypatch.setattr(ranking, "rankingCache", ranking.RankingCache())
+    monkeypatch.setattr(
+        ranking,
+        "significanceOptions",
+        {
+            "alpha": ranking.DEFAULT_ALPHA,
+            "resamples": ranking.DEFAULT_BOOTSTRAP_RESAMPLES,
+        },
+    )
+
+
+@pytest.fixture
+def createResults():
+    """Create the tasks and libraries from synthetic runtimes.
+
+    The factory takes ``{library: {task: {argument: runtimes}}}`` where `runtimes` is the list of the
+    runtime of each sample (a sample ``[0.0, runtime]``, the runtime of a failed sample is ``"Error"``) or
+    the failure value of the argument, ``{task: theme}`` and the evaluations by library, task and argument.
+    """
+
+    def Create(runtimes: dict, themes: dict = None, evaluations: dict = None) -> dict:
+        themes = themes or {}
+        evaluations = evaluations or {}
+        results = {}
+        for libraryName, tasks in runtimes.items():
+            for taskName, arguments in tasks.items():
+                taskResults = {}
+                for arg, values in arguments.items():
+                    taskResults[arg] = {
+                        "runtime": values
+                        if isinstance(values, str)
+                        else [[0.0, value] for value in values]
+                    }
+                    evaluation = evaluations.get(libraryName, {}).get(taskName, {})
+                    if arg in evaluation:
+                        taskResults[arg]["evaluation"] = evaluation[arg]
+                results.setdefault(libraryName, {})[taskName] = {
+                    "theme": themes.get(taskName, "Theme"),
+                    "results": taskResults,
+                }
+        CreateObjects(results)
+        return results
+
+    return Create
+
+
+@pytest.fixture
+def infrastructure(tmp_path) -> Path:
+    """A benchmark infrastructure with two libraries, a task of two arguments and a task run by `libA` only.
+
+    The run scripts of `TaskA` write a file in the folder of the task, like a script saving its output.
+    """
+    root = tmp_path / "repository"
+    for libraryName in ["libA", "libB"]:
+        target = root / "targets" / libraryName
+        target.mkdir(parents=True)
+        (target / "config.ini").write_text(
+            f"[library]\nlanguage = python\nbefore_build = echo ok\n"
+            f"description = {libraryName}\n"
+        )
+
+    taskPath = root / "themes" / "ThemeX" / "TaskA"
+    taskPath.mkdir(parents=True)
+    (taskPath / "config.ini").write_text(
+        "[task]\narguments = 1,2\nnb_runs = 2\ntimeout = 10\n"
+    )
+    for libraryName in ["libA", "libB"]:
+        (taskPath / f"{libraryName}_before_run.py").write_text("import sys\n")
+        (taskPath / f"{libraryName}_run.py").write_text(
+            "import sys\n"
+            "from pathlib import Path\n"
+            f"(Path(__file__).parent / f'{libraryName}_output_{{sys.argv[1]}}.txt')"
+            ".write_text(sys.argv[1])\n"
+        )
+
+    taskPath = root / "themes" / "ThemeX" / "TaskB"
+    taskPath.mkdir(parents=True)
+    (taskPath / "config.ini").write_text("[task]\narguments = 1\nnb_runs = 1\n")
+    (taskPath / "libA_run.py").write_text("import sys\n")
+    return root
@@ -0,0 +1,39 @@
+"""Docstring for test_asset_pipeline.py module.
+
+Tests of the asset stage: the scripts are not altered without a real minifier and are still fingerprinted.
+
+"""
+
+import gzip
+
+import asset_pipeline
+from asset_pipeline import BuildAssets, MinifyJs
+
+# a comment marker and indentation which are part of the strings, not of the code
+SCRIPT = (
+    "const url = 'http://example.com';\n"
+    "const text = `first line\n"
+    "    // not a comment\n"
+    "    indented line`;\n"
+    "const pattern = /\\/\\/ *$/;\n"
+    "    const value = 1; // a comment\n"
+)
+
+
+def test_MinifyJs_keeps_the_script_without_rjsmin(monkeypatch):
+    monkeypatch.setattr(asset_pipeline, "rjsmin", None)
+    assert MinifyJs(SCRIPT) == SCRIPT
+
+
+def test_BuildAssets_fingerprints_the_script_without_rjsmin(tmp_path, monkeypatch):
+    monkeypatch.setattr(asset_pipeline, "rjsmin", None)
+    (tmp_path / "script").mkdir()
+    (tmp_path / "script" / "main.js").write_text(SCRIPT)
+
+    manifest = BuildAssets({"script": tmp_path / "script"}, tmp_path / "static")
+
+    hashedPath = tmp_path / manifest["script/main.js"]
+    assert hashedPath.name.startswith("main.") and hashedPath.name != "main.js"
+    assert hashedPath.read_text() == SCRIPT
+    compressed = hashedPath.with_name(hashedPath.name + ".gz").read_bytes()
+    assert gzip.decompress(compressed).decode() == SCRIPT
@@ -0,0 +1,151 @@
+"""Docstring for test_benchmark.py module.
+
+Tests of the benchmark on a small infrastructure: the fingerprints of the cells and the resume from a
+checkpoint.
+
+"""
+
+import json
+
+from benchmark import Benchmark
+from checkpoint import Checkpoint
+
+
+def RunBenchmark(infrastructure, **kwargs) -> Benchmark:
+    benchmark = Benchmark(pathToInfrastructure=infrastructure, **kwargs)
+    benchmark.StartAllProcedure()
+    return benchmark
+
+
+def test_fingerprints_are_stable_across_a_run(infrastructure, tmp_path):
+    benchmark = RunBenchmark(infrastructure)
+    benchmark.ConvertResultToJson(tmp_path / "results.json")
+    taskPath = infrastructure / "themes" / "ThemeX" / "TaskA"
+    # the run scripts wrote their output in the folder of the task
+    assert (taskPath / "libA_output_1.txt").is_file()
+
+    again = Benchmark(
+        pathToInfrastructure=infrastructure,
+        baseResult=tmp_path / "results.json",
+        incremental=True,
+    )
+    assert again.fingerprints == benchmark.fingerprints
+    assert all(again.IsUpToDate(*key) for key in again.fingerprints)
+
+
+def test_fingerprints_change_with_the_declared_inputs(infrastructure):
+    before = Benchmark(pathToInfrastructure=infrastructure).fingerprints
+    taskPath = infrastructure / "themes" / "ThemeX" / "TaskA"
+    (taskPath / "libA_run.py").write_text("import sys\n# a new version of the script\n")
+    (taskPath / "notes.txt").write_text("not an input of the task")
+
+    after = Benchmark(pathToInfrastructure=infrastructure).fingerprints
+    for key, fingerprint in after.items():
+        libraryName, taskName, _ = key
+        changed = libraryName == "libA" and taskName == "TaskA"
+        assert (fingerprint != before[key]) == changed
+
+
+def test_fingerprints_ignore_the_arguments_and_the_descriptions(infrastructure):
+    before = Benchmark(pathToInfrastructure=infrastructure).fingerprints
+    taskPath = infrastructure / "themes" / "ThemeX" / "TaskA"
+    (taskPath / "config.ini").write_text(
+        "[task]\narguments = 1,2,3\nnb_runs = 2\ntimeout = 10\n"
+        "description = a new description\n"
+    )
+    (infrastructure / "targets" / "libA" / "config.ini").write_text(
+        "[library]\nlanguage = python\nbefore_build = echo ok\ndescription = other\n"
+    )
+
+    after = Benchmark(pathToInfrastructure=infrastructure).fingerprints
+    # the cells already measured keep their fingerprint
+    assert {key: after[key] for key in before} == before
+    assert ("libA", "TaskA", "3") in after
+
+    (taskPath / "config.ini").write_text(
+        "[task]\narguments = 1,2\nnb_runs = 2\ntimeout = 20\n"
+    )
+    changed = Benchmark(pathToInfrastructure=infrastructure).fingerprints
+    for key, fingerprint in changed.items():
+        assert (fingerprint != before[key]) == (key[1] == "TaskA")
+
+
+def test_results_without_fingerprint_are_run_again(infrastructure, tmp_path):
+    benchmark = RunBenchmark(infrastructure)
+    # results measured before the fingerprints existed, the script was edited since
+    for task in benchmark.results["libA"].values():
+        for result in task["results"].values():
+            del result["fingerprint"]
+    (tmp_path / "results.json").write_text(json.dumps(benchmark.results))
+    taskPath = infrastructure / "themes" / "ThemeX" / "TaskA"
+    (taskPath / "libA_run.py").write_text("import sys\n# a new version of the script\n")
+
+    again = Benchmark(
+        pathToInfrastructure=infrastructure,
+        baseResult=tmp_path / "results.json",
+        incremental=True,
+    )
+    for key in again.fingerprints:
+        assert again.IsUpToDate(*key) == (key[0] == "libB")
+
+    again.StartAllProcedure()
+    # only the samples of the new run are kept
+    for arg in ["1", "2"]:
+        result = again.results["libA"]["TaskA"]["results"][arg]
+        assert len(result["runtime"]) == 2
+        assert result["fingerprint"] == again.fingerprints[("libA", "TaskA", arg)]
+    assert (
+        again.results["libB"]["TaskA"]["results"]
+        == benchmark.results["libB"]["TaskA"]["results"]
+    )
+
+
+def test_resume_from_checkpoint(infrastructure, tmp_path):
+    checkpointFilename = tmp_path / "results.json.checkpoint"
+    interrupted = Benchmark(
+        pathToInfrastructure=infrastructure, checkpointFilename=checkpointFilename
+    )
+    # the benchmark stopped after the first cell
+    completedKey = ("libA", "TaskA", "1")
+    completedResult = {
+        "runtime": [[0.0, 42.0], [0.0, 42.0]],
+        "fingerprint": interrupted.fingerprints[completedKey],
+    }
+    checkpoint = Checkpoint(checkpointFilename)
+    checkpoint.Start(interrupted.results, set())
+    checkpoint.Append(completedKey, completedResult)
+    checkpoint.Close()
+
+    resumed = Benchmark(
+        pathToInfrastructure=infrastructure,
+        checkpointFilename=checkpointFilename,
+        resume=True,
+    )
+    assert resumed.completedCells == {completedKey}
+    resumed.StartAllProcedure()
+
+    # the completed cell is not run again, the others are run
+    results = resumed.results
+    assert results["libA"]["TaskA"]["results"]["1"] == completedResult
+    for libraryName, arg in [("libA", "2"), ("libB", "1"), ("libB", "2")]:
+        runtime = results[libraryName]["TaskA"]["results"][arg]["runtime"]
+        assert len(runtime) == 2 and 42.0 not in runtime[0]
+    assert len(results["libA"]["TaskB"]["results"]["1"]["runtime"]) == 1
+    assert results["libB"]["TaskB"]["results"]["1"]["runtime"] == "NotRun"
+    # the journal is compacted at the end of the benchmark
+    assert len(checkpointFilename.read_text().splitlines()) == 1
+
+
+def test_resume_without_checkpoint_starts_over(infrastructure, tmp_path):
+    benchmark = Benchmark(
+        pathToInfrastructure=infrastructure,
+        checkpointFilename=tmp_path / "missing.checkpoint",
+        resume=True,
+    )
+    assert benchmark.completedCells == set()
+    assert all(
+        result["runtime"] == []
+        for task in benchmark.results.values()
+        for taskResults in task.values()
+        for result in taskResults["results"].values()
+    )
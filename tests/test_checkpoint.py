@@ -0,0 +1,78 @@
+"""Docstring for test_checkpoint.py module.
+
+Tests of the checkpoint journal of a running benchmark.
+
+"""
+
+import json
+
+from checkpoint import Checkpoint, WriteJsonAtomic
+
+
+def CreateResults() -> dict:
+    return {
+        "libA": {
+            "TaskA": {
+                "theme": "ThemeX",
+                "results": {"1": {"runtime": []}, "2": {"runtime": []}},
+            }
+        }
+    }
+
+
+def test_WriteJsonAtomic_replaces_the_file(tmp_path):
+    path = tmp_path / "results.json"
+    WriteJsonAtomic(path, {"a": 1})
+    WriteJsonAtomic(path, {"a": 2})
+
+    assert json.loads(path.read_text()) == {"a": 2}
+    # no temporary file is left
+    assert [file.name for file in tmp_path.iterdir()] == ["results.json"]
+
+
+def test_Checkpoint_round_trip(tmp_path):
+    checkpoint = Checkpoint(tmp_path / "results.json.checkpoint")
+    assert not checkpoint.Exists()
+
+    checkpoint.Start(CreateResults(), set())
+    checkpoint.Append(("libA", "TaskA", "1"), {"runtime": [[0.1, 0.5]]})
+    checkpoint.Append(("libA", "TaskA", "2"), {"runtime": "Timeout"})
+    checkpoint.Close()
+
+    # a snapshot and a record by cell
+    assert len(checkpoint.path.read_text().splitlines()) == 3
+    results, completedCells = Checkpoint(checkpoint.path).Load()
+    assert completedCells == {("libA", "TaskA", "1"), ("libA", "TaskA", "2")}
+    assert results["libA"]["TaskA"]["results"] == {
+        "1": {"runtime": [[0.1, 0.5]]},
+        "2": {"runtime": "Timeout"},
+    }
+
+
+def test_Checkpoint_ignores_a_truncated_record(tmp_path):
+    checkpoint = Checkpoint(tmp_path / "results.json.checkpoint")
+    checkpoint.Start(CreateResults(), [("libA", "TaskA", "1")])
+    checkpoint.Append(("libA", "TaskA", "2"), {"runtime": [[0.1, 0.5]]})
+    checkpoint.Close()
+    # the benchmark stopped while writing a record
+    with open(checkpoint.path, "a") as file:
+        file.write('{"cell": ["libA", "TaskA", "3"], "res')
+
+    results, completedCells = checkpoint.Load()
+    assert completedCells == {("libA", "TaskA", "1"), ("libA", "TaskA", "2")}
+    assert results["libA"]["TaskA"]["results"]["2"] == {"runtime": [[0.1, 0.5]]}
+
+
+def test_Checkpoint_compact_keeps_the_state(tmp_path):
+    checkpoint = Checkpoint(tmp_path / "results.json.checkpoint")
+    checkpoint.Start(CreateResults(), set())
+    checkpoint.Append(("libA", "TaskA", "1"), {"runtime": [[0.1, 0.5]]})
+    before = checkpoint.Load()
+
+    checkpoint.Compact(*before)
+
+    assert len(checkpoint.path.read_text().splitlines()) == 1
+    assert checkpoint.Load() == before
+
+    checkpoint.Remove()
+    assert not checkpoint.Exists()
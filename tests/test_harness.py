@@ -0,0 +1,45 @@
+"""Docstring for test_harness.py module.
+
+Tests of the timing harness: the scripts timed around their run function or as a whole.
+
+"""
+
+import sys
+
+import pytest
+
+from harness import HARNESS_MARKER, MeasureScript, ParseHarnessAnswer
+
+
+@pytest.fixture(autouse=True)
+def environment(monkeypatch):
+    """The harness sets the arguments and the path of the script, they are restored after each test."""
+    monkeypatch.setattr(sys, "argv", list(sys.argv))
+    monkeypatch.setattr(sys, "path", list(sys.path))
+
+
+def test_MeasureScript_times_the_run_function(tmp_path):
+    script = tmp_path / "lib_run.py"
+    script.write_text("import sys\n\n\ndef run(argument):\n    return int(argument)\n")
+    answer = {}
+
+    assert MeasureScript(script, "1", answer=answer) >= 0
+    assert "whole_script" not in answer
+
+
+def test_MeasureScript_without_run_flags_the_whole_script(tmp_path):
+    script = tmp_path / "lib_run.py"
+    script.write_text("import sys\n\nint(sys.argv[1])\n")
+    answer = {}
+
+    assert MeasureScript(script, "1", answer=answer) >= 0
+    assert answer["whole_script"] is True
+
+
+def test_ParseHarnessAnswer_reads_the_last_answer():
+    output = (
+        f"output of the script\n{HARNESS_MARKER}"
+        + '{"samples": [12], "whole_script": true}\n'
+    )
+    assert ParseHarnessAnswer(output) == {"samples": [12], "whole_script": True}
+    assert ParseHarnessAnswer("no answer\n") == {}
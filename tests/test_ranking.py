@@ -0,0 +1,326 @@
+"""Docstring for test_ranking.py module.
+
+Tests of the rankings: LexMax, the Pareto ranking, the significant ranks and the speedups.
+
+"""
+
+import numpy as np
+import pytest
+
+import ranking
+from ranking import (
+    BootstrapMeans,
+    ComputeRankStability,
+    LexMax,
+    LexMaxRanks,
+    LexMaxWithThreshold,
+    NormalizedMetrics,
+    ParetoConfig,
+    ParetoFronts,
+    SignificantRanks,
+    SpeedupByTask,
+    SpeedupByTheme,
+    SpeedupGlobal,
+)
+
+
+def PreviousLexMax(dictionnary: dict[str, list[float]]) -> dict[str, int]:
+    """The LexMax implementation before it was vectorized, the reference of its results."""
+    rankMatrix = np.zeros((len(dictionnary.keys()), len(list(dictionnary.values())[0])))
+    for i, key in enumerate(dictionnary.keys()):
+        for j, value in enumerate(dictionnary[key]):
+            rankMatrix[i, j] = value
+
+    for column in range(rankMatrix.shape[1]):
+        rankMatrix[:, column] = [
+            sorted(rankMatrix[:, column].tolist()).index(element)
+            for element in rankMatrix[:, column].tolist()
+        ]
+
+    VectorLibrary = {}
+    for i, key in enumerate(dictionnary.keys()):
+        VectorLibrary[key] = sorted(rankMatrix[i, :].tolist())
+
+    sortedListRank = sorted(VectorLibrary.items(), key=lambda item: item[1])
+    rk = 0
+    elementRank = {}
+    for i in range(len(sortedListRank)):
+        elementRank[sortedListRank[i][0]] = rk
+        if (
+            i < len(sortedListRank) - 1
+            and sortedListRank[i][1] != sortedListRank[i + 1][1]
+        ):
+            rk += 1
+    return elementRank
+
+
+def test_LexMax_docstring_example():
+    dictionnary = {
+        "Library1": [52.2, 42.1, 39.4],
+        "Library2": [45.2, 12.0, 80.2],
+        "Library3": [34.7, 15.8, 2.42],
+    }
+    assert LexMax(dictionnary) == {"Library3": 0, "Library2": 1, "Library1": 2}
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_LexMax_same_ranks_as_previous_implementation(seed):
+    rng = np.random.default_rng(seed)
+    nbElements, nbArguments = rng.integers(1, 8), rng.integers(1, 6)
+    # few distinct values so the ties inside a column and between elements are frequent
+    values = rng.integers(0, 3, (nbElements, nbArguments)).astype(float)
+    dictionnary = {f"Library{i}": values[i].tolist() for i in range(nbElements)}
+    assert LexMax(dictionnary) == PreviousLexMax(dictionnary)
+
+
+def test_LexMax_float_values_same_ranks_as_previous_implementation():
+    rng = np.random.default_rng(0)
+    values = rng.random((6, 10))
+    values[values > 0.9] = np.inf
+    dictionnary = {f"Library{i}": row.tolist() for i, row in enumerate(values)}
+    assert LexMax(dictionnary) == PreviousLexMax(dictionnary)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_LexMaxRanks_same_ranks_as_LexMax(seed):
+    rng = np.random.default_rng(seed)
+    values = rng.integers(0, 3, (50, 5, 4)).astype(float)
+    values[values == 2] = np.inf
+
+    ranks = LexMaxRanks(values)
+
+    for ranking, rankingRanks in zip(values, ranks):
+        dictionnary = {f"Library{i}": row.tolist() for i, row in enumerate(ranking)}
+        expected = LexMax(dictionnary)
+        assert rankingRanks.tolist() == [expected[key] for key in dictionnary]
+
+
+@pytest.mark.parametrize("threshold", [0, 1, 5])
+def test_ComputeRankStability_same_ranks_as_each_resample(createResults, threshold):
+    rng = np.random.default_rng(0)
+    createResults(
+        {
+            libraryName: {
+                "TaskA": {
+                    str(arg): (scale * (1.0 + 0.2 * rng.standard_normal(5))).tolist()
+                    for arg in range(3)
+                }
+            }
+            for libraryName, scale in [("libA", 1.0), ("libB", 1.05), ("libC", 2.0)]
+        }
+    )
+    stability = ComputeRankStability("TaskA", threshold)
+
+    # the ranking of each resample computed one by one
+    libraryNames, means = ranking.rankingCache.GetBootstrap("TaskA")
+    arguments = ranking.Task.GetTaskByName("TaskA").arguments
+    taskRanks = np.array(
+        [
+            [
+                LexMaxWithThreshold(
+                    dict(zip(libraryNames, means[:, resample])), arguments, threshold
+                )[libraryName]
+                for libraryName in libraryNames
+            ]
+            for resample in range(means.shape[1])
+        ]
+    )
+    for i, libraryName in enumerate(libraryNames):
+        np.testing.assert_array_equal(
+            stability[libraryName]["probabilities"],
+            np.bincount(taskRanks[:, i], minlength=len(libraryNames)) / len(taskRanks),
+        )
+    # the close libraries swap their rank in some resamples
+    assert 0 < stability["libA"]["probabilities"][0] < 1
+
+
+def test_ParetoFronts_docstring_example():
+    values = np.array([[1.0, 3.0], [2.0, 2.0], [3.0, 1.0], [3.0, 3.0]])
+    assert ParetoFronts(values).tolist() == [0, 0, 0, 1]
+
+
+def test_ParetoFronts_nan_is_the_worst_and_duplicates_share_a_front():
+    values = np.array([[1.0, 1.0], [1.0, 1.0], [np.nan, 0.0], [2.0, np.nan]])
+    # [nan, 0] is not dominated (best on the second metric), [2, nan] is dominated by [1, 1]
+    assert ParetoFronts(values).tolist() == [0, 0, 0, 1]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_ParetoFronts_same_fronts_as_pairwise_peeling(seed):
+    rng = np.random.default_rng(seed)
+    values = rng.integers(0, 4, (12, 3)).astype(float)
+
+    remaining = set(range(len(values)))
+    expected = np.zeros(len(values), dtype=int)
+    front = 0
+    while remaining:
+        current = {
+            i
+            for i in remaining
+            if not any(
+                (values[j] <= values[i]).all() and (values[j] < values[i]).any()
+                for j in remaining
+            )
+        }
+        expected[list(current)] = front
+        remaining -= current
+        front += 1
+
+    assert ParetoFronts(values).tolist() == expected.tolist()
+
+
+def test_NormalizedMetrics_scales_between_best_and_worst(createResults):
+    createResults(
+        {
+            "libA": {"TaskA": {"1": [1.0], "2": [1.0]}},
+            "libB": {"TaskA": {"1": [3.0], "2": [2.0]}},
+            "libC": {"TaskA": {"1": [2.0], "2": "Error"}},
+        },
+        evaluations={
+            "libA": {"TaskA": {"1": {"score": [0.0]}, "2": {"score": [0.0]}}},
+            "libB": {"TaskA": {"1": {"score": [10.0]}, "2": {"score": [10.0]}}},
+            "libC": {"TaskA": {"1": {"score": [5.0]}, "2": {"score": [5.0]}}},
+        },
+    )
+    config = ParetoConfig(metrics=("runtime", "score"), maximize=("score",))
+    normalized = NormalizedMetrics("TaskA", ["libA", "libB", "libC"], config)
+
+    # runtime : libA is the best on both arguments, libC failed on the second one (the worst value)
+    np.testing.assert_allclose(normalized[:, 0], [0.0, 1.0, 0.75])
+    # score : the highest is the best
+    np.testing.assert_allclose(normalized[:, 1], [1.0, 0.0, 0.5])
+
+
+def test_BootstrapMeans_ignores_the_nan_padding():
+    samples = np.array(
+        [
+            [1.0, 3.0, np.nan, np.nan],
+            [np.nan, np.nan, np.nan, np.nan],
+            [5.0, np.nan, np.nan, np.nan],
+            [1.0, 2.0, 3.0, 4.0],
+        ]
+    )
+    means = BootstrapMeans(samples, 2000, np.random.default_rng(0))
+
+    assert means.shape == (2000, 4)
+    # the resamples of two samples are the mean of two draws among them
+    assert set(np.unique(means[:, 0])) <= {1.0, 2.0, 3.0}
+    assert means[:, 0].mean() == pytest.approx(2.0, abs=0.05)
+    assert np.isnan(means[:, 1]).all()
+    assert (means[:, 2] == 5.0).all()
+    assert means[:, 3].min() >= 1.0 and means[:, 3].max() <= 4.0
+    assert means[:, 3].mean() == pytest.approx(2.5, abs=0.05)
+
+
+def test_BootstrapMeans_is_reproducible():
+    samples = np.array([[1.0, 2.0, np.nan], [3.0, 4.0, 5.0]])
+    first = BootstrapMeans(samples, 100, np.random.default_rng(1))
+    second = BootstrapMeans(samples, 100, np.random.default_rng(1))
+    np.testing.assert_array_equal(first, second)
+
+
+def test_SignificantRanks_within_noise_share_the_rank(createResults):
+    rng = np.random.default_rng(0)
+    noise = lambda: (1.0 + 0.01 * rng.standard_normal(10)).tolist()  # noqa: E731
+    createResults(
+        {
+            "libA": {"TaskA": {"1": noise(), "2": noise()}},
+            # less samples than the others, the runtimes of libB are padded with nan
+            "libB": {"TaskA": {"1": noise()[:5], "2": noise()[:5]}},
+            "libC": {
+                "TaskA": {
+                    "1": [10 * x for x in noise()],
+                    "2": [10 * x for x in noise()],
+                }
+            },
+            "libD": {"TaskA": {"1": ["Error"], "2": "Error"}},
+        }
+    )
+    # the failures of libD are slower than any runtime
+    ranks = SignificantRanks("TaskA")
+
+    assert ranks["libA"].tolist() == [0, 0]
+    assert ranks["libB"].tolist() == [0, 0]
+    assert ranks["libC"].tolist() == [2, 2]
+    assert ranks["libD"].tolist() == [3, 3]
+
+
+def test_SignificantRanks_different_runtimes_are_ordered(createResults):
+    createResults(
+        {
+            "libA": {"TaskA": {"1": [1.0, 1.1, 0.9, 1.0]}},
+            "libB": {"TaskA": {"1": [2.0, 2.1, 1.9, 2.0]}},
+        }
+    )
+    ranks = SignificantRanks("TaskA")
+    assert ranks["libA"].tolist() == [0]
+    assert ranks["libB"].tolist() == [1]
+
+
+def test_ComputeSpeedups_marks_the_partial_coverage(createResults):
+    createResults(
+        {
+            "libA": {
+                "Task1": {"1": [1.0, 1.0], "2": [1.0, 1.0]},
+                "Task2": {"1": [1.0, 1.0]},
+            },
+            "libB": {
+                "Task1": {"1": [0.5, 0.5], "2": [0.5, 0.5]},
+                "Task2": {"1": [0.5, 0.5]},
+            },
+            "libC": {
+                "Task1": {"1": [2.0, 2.0], "2": "Error"},
+                "Task2": {"1": "Error"},
+            },
+        },
+        themes={"Task1": "ThemeX", "Task2": "ThemeX"},
+    )
+
+    byTask = SpeedupByTask("libA")
+    assert byTask["Task1"]["libA"]["speedup"] == pytest.approx(1.0)
+    assert byTask["Task1"]["libB"]["speedup"] == pytest.approx(2.0)
+    assert byTask["Task1"]["libB"]["interval"] == pytest.approx([2.0, 2.0])
+    assert (byTask["Task1"]["libB"]["count"], byTask["Task1"]["libB"]["total"]) == (
+        2,
+        2,
+    )
+    # libC is compared on the argument it succeeded only
+    assert byTask["Task1"]["libC"]["speedup"] == pytest.approx(0.5)
+    assert (byTask["Task1"]["libC"]["count"], byTask["Task1"]["libC"]["total"]) == (
+        1,
+        2,
+    )
+    assert np.isnan(byTask["Task2"]["libC"]["speedup"])
+    assert byTask["Task2"]["libC"]["count"] == 0
+
+    byTheme = SpeedupByTheme("libA")
+    assert byTheme["ThemeX"]["libB"]["speedup"] == pytest.approx(2.0)
+    assert (byTheme["ThemeX"]["libB"]["count"], byTheme["ThemeX"]["libB"]["total"]) == (
+        2,
+        2,
+    )
+    assert (byTheme["ThemeX"]["libC"]["count"], byTheme["ThemeX"]["libC"]["total"]) == (
+        1,
+        2,
+    )
+
+    globalSpeedups = SpeedupGlobal("libA")
+    assert globalSpeedups["libB"]["speedup"] == pytest.approx(2.0)
+    assert globalSpeedups["libC"]["speedup"] == pytest.approx(0.5)
+
+
+def test_ComputeSpeedups_is_cached_until_the_data_change(createResults):
+    createResults(
+        {
+            "libA": {"TaskA": {"1": [1.0]}},
+            "libB": {"TaskA": {"1": [0.25]}},
+        }
+    )
+    first = SpeedupByTask("libA")
+    assert SpeedupByTask("libA") is first
+
+    createResults({"libC": {"TaskA": {"1": [0.5]}}})
+    assert SpeedupByTask("libA") is not first
+    assert ranking.SpeedupByTask("libA")["TaskA"]["libB"]["speedup"] == pytest.approx(
+        4.0
+    )
@@ -0,0 +1,73 @@
+"""Docstring for test_resource_usage.py module.
+
+Tests of the measure of the resources of a command and of the downsampling of the memory and I/O timelines.
+
+"""
+
+import sys
+
+import numpy as np
+
+from resource_usage import RESOURCE_METRICS, TIMELINE_SERIES, Downsample, RunCommand
+
+
+def CreateTimeline(nbSamples: int) -> dict[str, list]:
+    """A timeline sampled every 10 ms, the memory grows slowly with a spike, the I/O are cumulative."""
+    rss = [1000 + i for i in range(nbSamples)]
+    rss[nbSamples // 3] = 10**6
+    return {
+        "time": [0.01 * i for i in range(nbSamples)],
+        "rss": rss,
+        "read": [10 * i for i in range(nbSamples)],
+        "write": [5 * i for i in range(nbSamples)],
+    }
+
+
+def test_Downsample_short_timeline_is_unchanged():
+    samples = CreateTimeline(10)
+    downsampled = Downsample(samples, 10)
+    assert downsampled == samples
+    # a copy, the samples of the sampler can still grow
+    assert downsampled["time"] is not samples["time"]
+
+
+def test_Downsample_reduces_to_max_points():
+    samples = CreateTimeline(1000)
+    downsampled = Downsample(samples, 64)
+
+    assert set(downsampled) == set(TIMELINE_SERIES)
+    assert all(len(values) == 64 for values in downsampled.values())
+    # the memory spike is kept
+    assert max(downsampled["rss"]) == 10**6
+    # the last sample is kept for the cumulative series
+    assert downsampled["time"][-1] == samples["time"][-1]
+    assert downsampled["read"][-1] == samples["read"][-1]
+    assert downsampled["write"][-1] == samples["write"][-1]
+    assert np.all(np.diff(downsampled["time"]) > 0)
+
+
+def test_Downsample_bucket_values():
+    samples = {
+        "time": [0.0, 1.0, 2.0, 3.0, 4.0, 5.0],
+        "rss": [1, 5, 2, 2, 8, 3],
+        "read": [0, 1, 2, 3, 4, 5],
+        "write": [0, 0, 0, 1, 1, 1],
+    }
+    downsampled = Downsample(samples, 3)
+
+    # the buckets are [0, 1], [2, 3] and [4, 5]
+    assert downsampled["rss"] == [5, 2, 8]
+    assert downsampled["time"] == [1.0, 3.0, 5.0]
+    assert downsampled["read"] == [1, 3, 5]
+    assert downsampled["write"] == [0, 1, 1]
+
+
+def test_RunCommand_measures_a_child_process():
+    # the child allocates about 50 MB and burns some CPU
+    script = "data = bytearray(50 * 1024**2); sum(range(10**6))"
+    completed = RunCommand(f'{sys.executable} -c "{script}"', timeout=30)
+
+    assert completed.returncode == 0
+    assert set(completed.resources) == set(RESOURCE_METRICS)
+    assert completed.resources["max_rss"] > 50 * 1024**2
+    assert completed.resources["user_time"] + completed.resources["system_time"] > 0
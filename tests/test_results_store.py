@@ -0,0 +1,202 @@
+"""Docstring for test_results_store.py module.
+
+Tests of the result store: the results of the json format are kept when they go through the store.
+
+"""
+
+import json
+
+import numpy as np
+
+from json_to_python_object import CreateObjects
+from library import Library
+from results_store import FileReaderStore, ResultStore
+from task import Task
+
+
+def CreateResults() -> dict:
+    """Results of two runs of the benchmark (`nb_samples`), with a failed sample and failed arguments."""
+    return {
+        "libA": {
+            "TaskA": {
+                "theme": "ThemeX",
+                "results": {
+                    "1": {
+                        "runtime": [[0.1, 0.5], [0.1, 0.6], [0.2, 0.7]],
+                        "fingerprint": "f1",
+                        "nb_samples": [2, 1],
+                        "evaluation": {"score": [1.5, 2.5]},
+                        "resources": [
+                            {"user_time": 0.3, "max_rss": 1024.0},
+                            None,
+                            {"user_time": 0.4, "max_rss": 2048.0},
+                        ],
+                        "timeline": [
+                            {"time": [0.0, 0.1], "rss": [1, 2]},
+                            None,
+                            None,
+                        ],
+                    },
+                    "2": {
+                        "runtime": [[0.1, "Error"]],
+                        "fingerprint": "f2",
+                        "nb_samples": [1],
+                    },
+                    "3": {"runtime": "Timeout", "fingerprint": "f3"},
+                },
+            }
+        },
+        "libB": {
+            "TaskA": {
+                "theme": "ThemeX",
+                "results": {
+                    "1": {"runtime": "NotRun", "fingerprint": "f1"},
+                    "2": {"runtime": "NotRun", "fingerprint": "f2"},
+                    "3": {"runtime": "NotRun", "fingerprint": "f3"},
+                },
+            }
+        },
+    }
+
+
+def test_ResultStore_import_export_round_trip(tmp_path):
+    results = CreateResults()
+    store = ResultStore(tmp_path / "results.db")
+    assert store.IsEmpty()
+    store.ImportResults(results)
+    store.ExportJson(tmp_path / "results.json")
+    store.Close()
+
+    assert json.loads((tmp_path / "results.json").read_text()) == results
+
+
+def test_ResultStore_import_results_without_nb_samples(tmp_path):
+    # the results written before nb_samples existed, the benchmark was run twice then three times
+    results = {
+        "libA": {
+            "TaskA": {
+                "theme": "ThemeX",
+                "results": {
+                    "1": {
+                        "runtime": [[0.1, 0.5], [0.1, 0.6], [0.2, 0.7], [0.2, 0.8]],
+                        "evaluation": {"score": [1.5, 2.5]},
+                    },
+                    "2": {
+                        "runtime": [[0.1, 0.5], [0.1, 0.6], [0.2, 0.7]],
+                        "evaluation": {"score": [1.0, 2.0], "size": [3, 3]},
+                    },
+                },
+            }
+        }
+    }
+    store = ResultStore(tmp_path / "results.db")
+    store.ImportResults(results)
+    exported = store.ToDict()["libA"]["TaskA"]["results"]
+    store.Close()
+
+    legacy = results["libA"]["TaskA"]["results"]
+    for arg, nbSamples in [("1", [2, 2]), ("2", [2, 1])]:
+        assert exported[arg]["runtime"] == legacy[arg]["runtime"]
+        assert exported[arg]["evaluation"] == legacy[arg]["evaluation"]
+        assert exported[arg]["nb_samples"] == nbSamples
+
+
+def test_ResultStore_reopened_appends_a_new_sweep(tmp_path):
+    store = ResultStore(tmp_path / "results.db")
+    store.ImportResults(CreateResults())
+    store.Close()
+
+    store = ResultStore(tmp_path / "results.db")
+    assert not store.IsEmpty()
+    store.AppendCell("libA", "TaskA", "1", "f1", [[0.1, 0.8]])
+    result = store.ToDict()["libA"]["TaskA"]["results"]["1"]
+    store.Close()
+
+    assert result["nb_samples"] == [2, 1, 1]
+    assert result["runtime"][-1] == [0.1, 0.8]
+
+
+def test_ResultStore_samples_of_another_fingerprint_are_not_read(tmp_path):
+    store = ResultStore(tmp_path / "results.db")
+    store.ImportResults(CreateResults())
+    # the inputs of the cell changed, its previous samples are obsolete
+    store.SetCell("libA", "TaskA", "1", 0, "ThemeX", "f1-changed")
+    result = store.ToDict()["libA"]["TaskA"]["results"]["1"]
+    store.Close()
+
+    assert result == {"runtime": [], "fingerprint": "f1-changed"}
+
+
+def test_ResultStore_unknown_status_is_an_error(tmp_path):
+    results = CreateResults()
+    results["libB"]["TaskA"]["results"]["1"]["runtime"] = "Segfault"
+    store = ResultStore(tmp_path / "results.db")
+    store.ImportResults(results)
+    result = store.ToDict()["libB"]["TaskA"]["results"]["1"]
+    store.Close()
+
+    assert result["runtime"] == "Error"
+
+
+def test_ResultStore_read_only(tmp_path):
+    store = ResultStore(tmp_path / "results.db")
+    store.ImportResults(CreateResults())
+    store.Close()
+
+    store = ResultStore(tmp_path / "results.db", readOnly=True)
+    assert store.ToDict() == CreateResults()
+    store.Close()
+
+
+def ReadTasks() -> dict:
+    """The arguments and the arrays of each (task, library) created, to compare two readers."""
+    tasks = {}
+    for task in Task.GetAllTask():
+        for libraryName in task.runtime:
+            tasks[(task.name, libraryName)] = {
+                "arguments": task.arguments_label,
+                "runtime": task.GetEncodedRuntime(libraryName),
+                "metrics": {
+                    metric: task.GetMetricArray(libraryName, metric)
+                    for metric in Task.RESOURCE_METRICS + ["score"]
+                },
+                "evaluation": task.evaluation[libraryName],
+                "timeline": task.timeline[libraryName],
+                "has_resources": task.HasResources(libraryName),
+                "status": task.get_status(libraryName),
+            }
+    return tasks
+
+
+def test_FileReaderStore_same_tasks_as_the_json_format(tmp_path, monkeypatch):
+    results = CreateResults()
+    # a sample added by a new sweep after the import
+    store = ResultStore(tmp_path / "results.db")
+    store.ImportResults(results)
+    store.AppendCell(
+        "libA", "TaskA", "1", "f1", [[0.1, 0.8]], {"score": 3.5}, [{"user_time": 0.5}]
+    )
+    exported = store.ToDict()
+    store.Close()
+
+    CreateObjects(exported)
+    expected = ReadTasks()
+    for attribute in ["allTasks", "tasksByName", "tasksByTheme", "taskNamesByTheme"]:
+        monkeypatch.setattr(Task, attribute, type(getattr(Task, attribute))())
+    for attribute in ["allLibrary", "libraryByName", "librariesByTaskName"]:
+        monkeypatch.setattr(Library, attribute, type(getattr(Library, attribute))())
+    FileReaderStore(tmp_path / "results.db")
+    read = ReadTasks()
+
+    assert [library.name for library in Library.allLibrary] == ["libA", "libB"]
+    assert read.keys() == expected.keys()
+    for key, target in read.items():
+        for name in ["arguments", "evaluation", "timeline", "has_resources", "status"]:
+            assert target[name] == expected[key][name], (key, name)
+        for array, expectedArray in zip(target["runtime"], expected[key]["runtime"]):
+            np.testing.assert_array_equal(array, expectedArray)
+        for metric, values in target["metrics"].items():
+            np.testing.assert_array_equal(values, expected[key]["metrics"][metric])
+    # the runtime of libA/TaskA/1 is the imported samples and the new one
+    values, _ = read[("TaskA", "libA")]["runtime"]
+    assert values[0, :, 1].tolist() == [0.5, 0.6, 0.7, 0.8]
@@ -0,0 +1,41 @@
+"""Docstring for test_sampling.py module.
+
+Tests of the statistical functions of the adaptive sampling.
+
+"""
+
+import math
+
+import pytest
+
+from sampling import RelativeConfidenceInterval, StudentQuantile
+
+# two-sided quantiles of the Student's t-distribution from the statistical tables
+T_QUANTILES = [
+    (0.95, 2, 4.302653),
+    (0.95, 3, 3.182446),
+    (0.95, 5, 2.570582),
+    (0.99, 2, 9.924843),
+    (0.99, 5, 4.032143),
+    (0.90, 3, 2.353363),
+    (0.95, 30, 2.042272),
+    (0.95, 100, 1.983972),
+]
+
+
+@pytest.mark.parametrize("confidence, degreesOfFreedom, expected", T_QUANTILES)
+def test_StudentQuantile_matches_the_tables(confidence, degreesOfFreedom, expected):
+    assert StudentQuantile(confidence, degreesOfFreedom) == pytest.approx(
+        expected, rel=1e-5
+    )
+
+
+def test_StudentQuantile_without_degrees_of_freedom_is_infinite():
+    assert StudentQuantile(0.95, 0) == math.inf
+
+
+def test_RelativeConfidenceInterval_of_three_samples():
+    # mean 2, standard deviation 1, the half-width is t(0.95, 2) / sqrt(3)
+    assert RelativeConfidenceInterval([1.0, 2.0, 3.0]) == pytest.approx(
+        4.302653 / math.sqrt(3) / 2, rel=1e-5
+    )
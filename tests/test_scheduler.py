@@ -0,0 +1,131 @@
+"""Docstring for test_scheduler.py module.
+
+Tests of the scheduler running the jobs of the cells on a pool of workers: the admission rules of
+the tasks, the merge of the samples finished out of order and the jobs raising an exception.
+
+"""
+
+import threading
+import time
+from pathlib import Path
+
+from scheduler import Cell, Scheduler, TaskPolicy
+
+
+def CreateCells(taskName: str, nbCells: int = 2, nbRuns: int = 2) -> list[Cell]:
+    return [
+        Cell("libA", taskName, str(arg), Path("."), timeout=10, nbRuns=nbRuns)
+        for arg in range(nbCells)
+    ]
+
+
+def RunJob(cell: Cell, job) -> list:
+    return [0.0, float(job.runId)]
+
+
+class RunningJobs:
+    """Run the jobs for a short time and record the tasks of the jobs running at the same time."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.running = []
+        self.concurrent = []
+
+    def __call__(self, cell: Cell, job) -> list:
+        with self.lock:
+            self.running.append(cell.taskName)
+            self.concurrent.append(list(self.running))
+        time.sleep(0.02)
+        with self.lock:
+            self.running.remove(cell.taskName)
+        return [0.0, float(job.runId)]
+
+
+def test_Scheduler_runs_every_job():
+    cells = CreateCells("TaskA")
+    doneCells = []
+    Scheduler().Run(cells, RunJob, onCellDone=doneCells.append)
+
+    assert doneCells == cells
+    assert all(cell.GetSamples() == [[0.0, 0.0], [0.0, 1.0]] for cell in cells)
+
+
+def test_Scheduler_can_run_several_times():
+    # the benchmark runs the cells of each task with the same scheduler, its workers are pinned again
+    scheduler = Scheduler()
+    for taskName in ["TaskA", "TaskB", "TaskC"]:
+        cells = CreateCells(taskName)
+        scheduler.Run(cells, RunJob)
+        assert all(len(cell.GetSamples()) == 2 for cell in cells)
+
+
+def test_Scheduler_max_parallel_caps_the_jobs_of_a_task():
+    runJob = RunningJobs()
+    cells = CreateCells("TaskA", nbCells=6, nbRuns=1) + CreateCells("TaskB", 2, 1)
+    Scheduler(nbWorkers=4).Run(
+        cells, runJob, taskPolicy={"TaskA": TaskPolicy(maxParallel=2)}
+    )
+
+    assert max(running.count("TaskA") for running in runJob.concurrent) == 2
+    # the free workers run the jobs of the other task meanwhile
+    assert max(len(running) for running in runJob.concurrent) == 4
+    assert all(len(cell.GetSamples()) == 1 for cell in cells)
+
+
+def test_Scheduler_exclusive_task_runs_alone():
+    runJob = RunningJobs()
+    cells = (
+        CreateCells("TaskA", nbCells=3)
+        + CreateCells("TaskB", nbCells=2)
+        + CreateCells("TaskC", nbCells=3)
+    )
+    Scheduler(nbWorkers=3).Run(
+        cells, runJob, taskPolicy={"TaskB": TaskPolicy(exclusive=True)}
+    )
+
+    assert any(len(running) > 1 for running in runJob.concurrent)
+    for running in runJob.concurrent:
+        assert "TaskB" not in running or running == ["TaskB"]
+    assert sum(running == ["TaskB"] for running in runJob.concurrent) == 4
+
+
+def test_Scheduler_merges_the_samples_by_run_id():
+    # the repetitions finish in the reverse order, each one once the scheduler got the next one
+    collected = {runId: threading.Event() for runId in range(4)}
+    collected[3].set()
+    doneOrder = []
+
+    def ReverseOrder(cell: Cell, job) -> list:
+        collected[job.runId + 1].wait(5)
+        return [0.0, "Error" if job.runId == 1 else float(job.runId)]
+
+    def JobDone(cell: Cell, job, sample: list) -> None:
+        doneOrder.append(job.runId)
+        collected[job.runId].set()
+
+    cell = CreateCells("TaskA", nbCells=1, nbRuns=3)[0]
+    Scheduler(nbWorkers=3).Run(
+        [cell],
+        ReverseOrder,
+        taskPolicy={"TaskA": TaskPolicy(parallelRuns=True)},
+        onJobDone=JobDone,
+    )
+
+    assert doneOrder == [2, 1, 0]
+    # the samples are kept up to the first failure by run id, whatever the order they finished in
+    assert cell.GetSamples() == [[0.0, 0.0], [0.0, "Error"]]
+
+
+def test_Scheduler_job_raising_an_exception_only_stops_its_cell():
+    def FailingJob(cell: Cell, job) -> list:
+        if cell.argument == "1":
+            raise OSError("the script can't be started")
+        return RunJob(cell, job)
+
+    cells = CreateCells("TaskA", nbCells=3)
+    doneCells = []
+    Scheduler(nbWorkers=2).Run(cells, FailingJob, onCellDone=doneCells.append)
+
+    assert sorted(cell.argument for cell in doneCells) == ["0", "1", "2"]
+    assert cells[1].GetSamples() == [["Error", "Error"]]
+    assert cells[0].GetSamples() == cells[2].GetSamples() == [[0.0, 0.0], [0.0, 1.0]]
@@ -0,0 +1,205 @@
+"""Docstring for test_static_site_generator.py module.
+
+Tests of the incremental build of the site: only the pages whose inputs changed are rendered again, the
+stale pages and data files are removed, the assets are fingerprinted and the highlighted code is cached.
+
+"""
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+import collectCode
+import static_site_generator
+from collectCode import CollectCode
+from static_site_generator import RenderJob, StaticSiteGenerator
+
+
+@pytest.fixture
+def sources(tmp_path) -> Path:
+    """The templates and the assets of a small site, the site is built in `tmp_path / "site"`."""
+    templates = tmp_path / "templates"
+    templates.mkdir()
+    (templates / "header.html").write_text("<header>{{ name }}</header>")
+    (templates / "page.html").write_text(
+        '<script type="module" src="../script/main.js"></script>'
+        '<h1>{{ title }}</h1><div data-file="{{ dataFile }}"></div>'
+    )
+    for folder in ["script", "style", "assets", "site", "cache"]:
+        (tmp_path / folder).mkdir()
+    (tmp_path / "script" / "main.js").write_text(
+        "import { Plot } from './plot.js';\n\n// draw the page\n    Plot();\n"
+    )
+    (tmp_path / "script" / "plot.js").write_text("export function Plot() {}\n")
+    (tmp_path / "style" / "main.css").write_text("body {\n    color: red;\n}\n")
+    return tmp_path
+
+
+@pytest.fixture
+def writtenFiles(monkeypatch) -> list[Path]:
+    """The files written by the pages and the data files of the builds."""
+    written = []
+
+    def WriteFile(path, content) -> None:
+        written.append(Path(path))
+        writeFile(path, content)
+
+    writeFile = static_site_generator.WriteFile
+    monkeypatch.setattr(static_site_generator, "WriteFile", WriteFile)
+    return written
+
+
+def Build(root: Path, data: dict[str, list]) -> StaticSiteGenerator:
+    """Build a page and a data file for each entry of `data`, as BenchSite does."""
+    generator = StaticSiteGenerator(
+        str(root / "script"),
+        str(root / "templates"),
+        str(root / "assets"),
+        str(root / "site" / "content"),
+        str(root / "style"),
+        templateCachePath=str(root / "cache"),
+        dataFilePath=str(root / "site" / "data"),
+    )
+    generator.BuildAssets()
+    jobs = []
+    for name, values in data.items():
+        arguments = {
+            "title": name,
+            "dataFile": generator.CreateDataFile(name, values),
+            # changes at every build without changing the page
+            "dataGenerationDate": time.time(),
+        }
+        jobs.append(
+            RenderJob(
+                f"{name}.html",
+                generator.contentFilePath,
+                ["header", ("page.html", arguments)],
+            )
+        )
+    generator.RenderPages(
+        jobs, {"header": ("header.html", {"name": "BenchSite"})}, nbWorkers=1
+    )
+    generator.CompleteBuild()
+    return generator
+
+
+def Files(folder: Path) -> set[str]:
+    return {path.name for path in folder.iterdir()}
+
+
+def test_RenderPages_only_the_changed_page_is_written(sources, writtenFiles):
+    Build(sources, {"TaskA": [1.0, 2.0], "TaskB": [3.0]})
+    content, data = sources / "site" / "content", sources / "site" / "data"
+    firstData = Files(data)
+    assert Files(content) == {
+        "TaskA.html",
+        "TaskA.html.gz",
+        "TaskB.html",
+        "TaskB.html.gz",
+    }
+
+    writtenFiles.clear()
+    Build(sources, {"TaskA": [1.0, 2.0], "TaskB": [3.0]})
+    assert writtenFiles == []
+
+    Build(sources, {"TaskA": [1.0, 5.0], "TaskB": [3.0]})
+    (newData,) = [path for path in writtenFiles if path.parent == data]
+    assert newData.name.startswith("TaskA.") and newData.name not in firstData
+    assert writtenFiles == [newData, content / "TaskA.html"]
+    assert newData.name in (content / "TaskA.html").read_text()
+    # the previous data file of TaskA and its compressed sibling are removed
+    assert Files(data) == {name for name in firstData if name.startswith("TaskB.")} | {
+        newData.name,
+        newData.name + ".gz",
+    }
+
+
+def test_RenderPages_template_change_renders_all_the_pages(sources, writtenFiles):
+    Build(sources, {"TaskA": [1.0], "TaskB": [3.0]})
+    writtenFiles.clear()
+
+    (sources / "templates" / "header.html").write_text("<header>{{ name }}!</header>")
+    Build(sources, {"TaskA": [1.0], "TaskB": [3.0]})
+
+    content = sources / "site" / "content"
+    assert writtenFiles == [content / "TaskA.html", content / "TaskB.html"]
+    assert "<header>BenchSite!</header>" in (content / "TaskB.html").read_text()
+
+
+def test_CompleteBuild_removes_the_stale_pages(sources):
+    Build(sources, {"TaskA": [1.0], "TaskB": [3.0]})
+    generator = Build(sources, {"TaskA": [1.0]})
+
+    assert Files(sources / "site" / "content") == {"TaskA.html", "TaskA.html.gz"}
+    assert all(name.startswith("TaskA.") for name in Files(sources / "site" / "data"))
+    manifest = json.loads(Path(generator.manifestPath).read_text())
+    assert list(manifest) == [str(Path("content") / "TaskA.html")]
+
+
+def test_BuildAssets_pages_refer_to_the_hashed_assets(sources, writtenFiles):
+    generator = Build(sources, {"TaskA": [1.0]})
+    static = sources / "site" / "static"
+    mainPath = static / generator.assetManifest["script/main.js"].split("/", 1)[1]
+    plotName = Path(generator.assetManifest["script/plot.js"]).name
+
+    page = (sources / "site" / "content" / "TaskA.html").read_text()
+    assert f'src="../{generator.assetManifest["script/main.js"]}"' in page
+    # the import of the script is replaced by the hashed name
+    assert f"from './{plotName}'" in mainPath.read_text()
+    assert len(list((static / "style").glob("main.*.css"))) == 1
+    assert json.loads((static / "manifest.json").read_text()) == generator.assetManifest
+
+    # an imported script changes the hash of the scripts which import it and of the pages
+    writtenFiles.clear()
+    (sources / "script" / "plot.js").write_text(
+        "export function Plot() { return 1; }\n"
+    )
+    newGenerator = Build(sources, {"TaskA": [1.0]})
+
+    assert (
+        newGenerator.assetManifest["script/main.js"]
+        != generator.assetManifest["script/main.js"]
+    )
+    assert not mainPath.exists() and not (static / "script" / plotName).exists()
+    assert writtenFiles == [sources / "site" / "content" / "TaskA.html"]
+    assert (
+        newGenerator.assetManifest["script/main.js"]
+        in (sources / "site" / "content" / "TaskA.html").read_text()
+    )
+
+
+def test_CollectCode_highlights_only_the_changed_scripts(
+    infrastructure, tmp_path, monkeypatch
+):
+    highlighted = []
+
+    def HighlightCode(code: str, language: str, filename: str) -> str:
+        highlighted.append(filename)
+        return highlightCode(code, language, filename)
+
+    highlightCode = collectCode.HighlightCode
+    monkeypatch.setattr(collectCode, "HighlightCode", HighlightCode)
+    libraryConfig = {"libA": {"language": "python"}, "libB": {"language": "python"}}
+
+    def Collect() -> CollectCode:
+        return CollectCode(
+            infrastructure, libraryConfig=libraryConfig, cachePath=tmp_path / "code"
+        )
+
+    first = Collect()
+    nbScripts = len(highlighted)
+    assert nbScripts > 0
+
+    highlighted.clear()
+    second = Collect()
+    assert highlighted == []
+    assert second.CodeHTML == first.CodeHTML
+
+    script = infrastructure / "themes" / "ThemeX" / "TaskA" / "libA_run.py"
+    script.write_text(script.read_text() + "print('changed')\n")
+    third = Collect()
+    assert highlighted == ["libA_run.py"]
+    assert third.get_code_HTML("libA", "TaskA") != first.get_code_HTML("libA", "TaskA")
+    assert third.get_code_HTML("libB", "TaskA") == first.get_code_HTML("libB", "TaskA")
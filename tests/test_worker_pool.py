@@ -0,0 +1,89 @@
+"""Docstring for test_worker_pool.py module.
+
+Tests of the warm workers running the jobs of a library in a long-lived harness process.
+
+"""
+
+import sys
+
+import pytest
+
+from resource_usage import RESOURCE_METRICS
+from worker_pool import RecyclePolicy, WarmWorkerPool
+
+LANGUAGE = sys.executable
+
+
+@pytest.fixture
+def pool():
+    pool = WarmWorkerPool()
+    yield pool
+    pool.Close()
+
+
+def CreateTask(root, taskName: str, run: str) -> str:
+    """A task folder with a helper module `utils` whose value is the name of the task."""
+    taskPath = root / taskName
+    taskPath.mkdir()
+    (taskPath / "utils.py").write_text(f"VALUE = {taskName!r}\n")
+    (taskPath / "libA_run.py").write_text(run)
+    return str(taskPath / "libA_run.py")
+
+
+def test_WarmWorkerPool_tasks_with_the_same_helper_name(tmp_path, pool):
+    run = (
+        "from pathlib import Path\n\nimport utils\n\n\n"
+        "def run(argument):\n"
+        "    assert utils.VALUE == Path(__file__).parent.name, utils.VALUE\n"
+    )
+    scripts = [CreateTask(tmp_path, taskName, run) for taskName in ["TaskA", "TaskB"]]
+
+    answers = [
+        pool.Run("libA", LANGUAGE, script, "1", timeout=10)
+        for script in scripts + scripts
+    ]
+
+    assert [answer["status"] for answer in answers] == [0, 0, 0, 0]
+    # all the jobs ran on the same worker
+    assert len(pool.workers) == 1
+
+
+def test_WarmWorkerPool_status_of_the_script(tmp_path, pool):
+    unsupported = CreateTask(tmp_path, "TaskA", "import sys\n\nsys.exit(2)\n")
+    failing = CreateTask(
+        tmp_path, "TaskB", "def run(argument):\n    raise ValueError\n"
+    )
+
+    assert pool.Run("libA", LANGUAGE, unsupported, "1", timeout=10)["status"] == 2
+    answer = pool.Run("libA", LANGUAGE, failing, "1", timeout=10)
+    assert answer["status"] == 1 and "ValueError" in answer["error"]
+
+
+def test_WarmWorkerPool_recycles_the_worker(tmp_path, pool):
+    script = CreateTask(tmp_path, "TaskA", "def run(argument):\n    pass\n")
+    policy = RecyclePolicy(maxJobs=2)
+
+    pool.Run("libA", LANGUAGE, script, "1", timeout=10, policy=policy)
+    (worker,) = pool.workers.values()
+    pool.Run("libA", LANGUAGE, script, "1", timeout=10, policy=policy)
+
+    assert pool.workers == {}
+    assert not worker.IsAlive()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="no resource module")
+def test_WarmWorkerPool_measures_each_job(tmp_path, pool):
+    script = CreateTask(
+        tmp_path,
+        "TaskA",
+        "def run(argument):\n    sum(range(int(argument)))\n",
+    )
+
+    small = pool.Run("libA", LANGUAGE, script, "1", timeout=10)
+    large = pool.Run("libA", LANGUAGE, script, "10000000", timeout=10)
+
+    for answer in [small, large]:
+        assert set(answer["resources"]) == set(RESOURCE_METRICS)
+        assert answer["resources"]["max_rss"] > 0
+    # the CPU times are measured per job, not since the start of the worker
+    assert large["resources"]["user_time"] > small["resources"]["user_time"]
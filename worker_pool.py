@@ -0,0 +1,222 @@
+"""Docstring for worker_pool.py module.
+
+This module contains the classes WarmWorker and WarmWorkerPool. A warm worker is a long-lived
+`harness.py --serve` process that run the jobs of a library, the interpreter startup and the imports
+of the library are then paid once for many jobs instead of once per job.
+
+"""
+
+import json
+import queue
+import shlex
+import subprocess
+import threading
+from dataclasses import dataclass
+
+import psutil
+
+from harness import HARNESS_MARKER, HARNESS_PATH
+from logger import logger
+
+
+@dataclass
+class RecyclePolicy:
+    """When a warm worker has to be restarted.
+
+    Attributes
+    ----------
+    maxJobs : int or None
+        The worker is restarted after this number of jobs, None for no limit.
+    maxMemoryGrowth : int or None
+        The worker is restarted when its memory (in bytes) grew more than this value since its first job,
+        None for no limit.
+    """
+
+    maxJobs: int = None
+    maxMemoryGrowth: int = None
+
+
+class WarmWorker:
+    """A long-lived harness process.
+
+    Attributes
+    ----------
+    process : subprocess.Popen
+        The harness process.
+    nbJobs : int
+        The number of jobs run by the worker.
+    baseMemory : int or None
+        The memory used by the worker after its first job.
+    """
+
+    def __init__(self, language: str) -> None:
+        self.process = subprocess.Popen(
+            shlex.split(language) + [str(HARNESS_PATH), "--serve"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        self.nbJobs = 0
+        self.baseMemory = None
+        self._answers = queue.Queue()
+        # the answers are read in a thread so we can wait for them with a timeout on every platform
+        threading.Thread(target=self._ReadAnswers, daemon=True).start()
+        logger.debug(f"Warm worker started with the pid {self.process.pid}")
+
+    def _ReadAnswers(self) -> None:
+        for line in self.process.stdout:
+            if line.startswith(HARNESS_MARKER):
+                self._answers.put(json.loads(line[len(HARNESS_MARKER) :]))
+        # the process is dead
+        self._answers.put(None)
+
+    def Run(self, scriptPath: str, argument: str, timeout: float) -> dict:
+        """Send a job to the worker and wait for its answer.
+
+        Parameters
+        ----------
+        scriptPath : str
+            The path to the script to run.
+        argument : str
+            The argument given to the script.
+        timeout : float
+            The time in seconds to wait for the answer.
+
+        Returns
+        -------
+        dict
+            The answer of the worker ``{"samples": [<nanoseconds>], "status": <exit code>}``.
+
+        Raises
+        ------
+        subprocess.TimeoutExpired
+            If the worker didn't answer in time, the worker is then killed.
+        """
+        self.nbJobs += 1
+        try:
+            self.process.stdin.write(
+                json.dumps({"script": str(scriptPath), "argument": argument}) + "\n"
+            )
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            return {"samples": [], "status": 1, "error": "The warm worker is dead"}
+
+        try:
+            answer = self._answers.get(timeout=timeout)
+        except queue.Empty:
+            self.Close()
+            raise subprocess.TimeoutExpired(str(scriptPath), timeout)
+
+        if answer is None:
+            return {"samples": [], "status": 1, "error": "The warm worker is dead"}
+        return answer
+
+    def IsAlive(self) -> bool:
+        return self.process.poll() is None
+
+    def MemoryUsage(self) -> int:
+        """The resident memory in bytes of the worker and its children."""
+        try:
+            process = psutil.Process(self.process.pid)
+            return process.memory_info().rss + sum(
+                child.memory_info().rss for child in process.children(recursive=True)
+            )
+        except psutil.Error:
+            return 0
+
+    def MustBeRecycled(self, policy: RecyclePolicy) -> bool:
+        """Check if the worker has to be restarted according to the recycle policy."""
+        if not self.IsAlive():
+            return True
+        if policy.maxJobs is not None and self.nbJobs >= policy.maxJobs:
+            logger.debug(
+                f"Warm worker {self.process.pid} recycled after {self.nbJobs} jobs"
+            )
+            return True
+        if policy.maxMemoryGrowth is not None:
+            memory = self.MemoryUsage()
+            if self.baseMemory is None:
+                self.baseMemory = memory
+            elif memory - self.baseMemory > policy.maxMemoryGrowth:
+                logger.debug(
+                    f"Warm worker {self.process.pid} recycled, its memory grew from {self.baseMemory} to {memory} bytes"
+                )
+                return True
+        return False
+
+    def Close(self) -> None:
+        """Stop the worker."""
+        if self.IsAlive():
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=1)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+
+
+class WarmWorkerPool:
+    """The warm workers of each library.
+
+    A worker is never shared between two threads of the scheduler, this way the worker stay on the cores
+    of the thread that started it and there is only one job at a time in a worker.
+    """
+
+    def __init__(self) -> None:
+        self.workers = {}
+        self._lock = threading.Lock()
+
+    def Run(
+        self,
+        libraryName: str,
+        language: str,
+        scriptPath: str,
+        argument: str,
+        timeout: float,
+        policy: RecyclePolicy = RecyclePolicy(),
+    ) -> dict:
+        """Run a job on the warm worker of a library, the worker is started if needed.
+
+        Parameters
+        ----------
+        libraryName : str
+            The name of the library.
+        language : str
+            The command of the interpreter of the library.
+        scriptPath : str
+            The path to the script to run.
+        argument : str
+            The argument given to the script.
+        timeout : float
+            The time in seconds to wait for the answer.
+        policy : RecyclePolicy, optional
+            When the worker has to be restarted.
+
+        Returns
+        -------
+        dict
+            The answer of the worker, see `WarmWorker.Run`.
+        """
+        key = (libraryName, threading.get_ident())
+        with self._lock:
+            worker = self.workers.get(key)
+        if worker is None or not worker.IsAlive():
+            worker = WarmWorker(language)
+            with self._lock:
+                self.workers[key] = worker
+
+        answer = worker.Run(scriptPath, argument, timeout)
+
+        if worker.MustBeRecycled(policy):
+            worker.Close()
+            with self._lock:
+                del self.workers[key]
+        return answer
+
+    def Close(self) -> None:
+        """Stop all the workers."""
+        with self._lock:
+            workers, self.workers = list(self.workers.values()), {}
+        for worker in workers:
+            worker.Close()